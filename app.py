@@ -1,59 +1,132 @@
+import multiprocessing
 import os
-from flask import Flask, render_template
-from mod_radio.routes import bp_radio
-from mod_auth.routes import bp_auth
-from mod_admin.routes import bp_admin
-from mod_config import bp_config
-from mod_config.models import ConfigSistema
-from mod_radio.audio_cache import inicializar_cache_local  # ✅ correto
+import threading
+import time
 
+_T0 = time.perf_counter()
 
+from flask import Flask, render_template
 from dotenv import load_dotenv
 load_dotenv()
 
 MEDIA_DRIVE_DIR = os.path.join(os.getcwd(), "media_drive")
 os.makedirs(MEDIA_DRIVE_DIR, exist_ok=True)
 
+
 # ============================================================
-# 🎛️ Criação da aplicação Flask
+# ⏱️ RELATÓRIO DE INICIALIZAÇÃO
 # ============================================================
-app = Flask(__name__)
+def _relatorio_inicializacao(tempos):
+    """Imprime o tempo de cada fase da inicialização (em ms)."""
+    total = sum(tempos.values())
+    fases = " | ".join(f"{fase} {ms:.0f}" for fase, ms in tempos.items())
+    print(f"⏱️ Inicialização em {total:.0f} ms ({fases})")
 
-app.config["SECRET_KEY"] = (
-    os.getenv("SECRET_KEY")
-    or (ConfigSistema.get().get("secret_key") or "dev-secret")
-)
 
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///usuarios.db"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+def _iniciar_servicos():
+    """Agendador, observador, picos e compactação do índice (em segundo plano)."""
+    from mod_radio.agendador_cache import iniciar_agendador
+    from mod_radio.observador_audios import iniciar_observador
+    from mod_radio.audio_db import iniciar_compactacao
+    from mod_radio.picos import iniciar_gerador_picos
+
+    iniciar_gerador_picos()
+    iniciar_agendador()
+    iniciar_observador()
+    iniciar_compactacao()
 
-# ============================================================
-# 🔗 REGISTRO DOS BLUEPRINTS
-# ============================================================
-app.register_blueprint(bp_radio)
-app.register_blueprint(bp_auth)
-app.register_blueprint(bp_admin)
-app.register_blueprint(bp_config)
 
-# Inicializa cache local ao iniciar o servidor
-inicializar_cache_local()
+def iniciar_servicos():
+    """Inicia os serviços de cache — chamada explícita do entrypoint (wsgi.py ou __main__).
+
+    Importar este módulo nunca inicia nada. Entre vários processos (workers
+    do gunicorn) só o que ficar com a trava `servicos` varre e observa as
+    pastas; os demais só acompanham as mudanças gravadas no índice.
+    Subprocessos (multiprocessing) e CACHE_AGENDADOR=0 não iniciam nada.
+    """
+    from mod_radio import travas
+    from mod_radio.audio_cache import iniciar_sincronizacao
+
+    if os.getenv("CACHE_AGENDADOR", "1") == "0" or multiprocessing.parent_process() is not None:
+        return False
+    if not travas.adquirir("servicos"):
+        print(f"🔗 [SERVIÇOS] Outro processo já atualiza o cache; PID {os.getpid()} só acompanha o índice.")
+        iniciar_sincronizacao()
+        return False
+    threading.Thread(target=_iniciar_servicos, name="servicos-cache", daemon=True).start()
+    return True
+
 
 # ============================================================
-# ⚠️ HANDLERS DE ERRO COMUM
+# 🎛️ Criação da aplicação Flask
 # ============================================================
-@app.errorhandler(403)
-def e403(_e):
-    return render_template("error_403.html"), 403
+def create_app(servicos=False):
+    """Cria a aplicação. O cache de cada rádio é lido do índice no primeiro acesso."""
+    tempos = {"flask": (time.perf_counter() - _T0) * 1000}
+    t = time.perf_counter()
+
+    from mod_radio.routes import bp_radio
+    from mod_auth.routes import bp_auth
+    from mod_admin.routes import bp_admin
+    from mod_config import bp_config
+    from mod_config.models import ConfigSistema
+    from mod_radio.audio_cache import inicializar_cache_local
+
+    tempos["imports"] = (time.perf_counter() - t) * 1000
+    t = time.perf_counter()
+
+    app = Flask(__name__)
+
+    app.config["SECRET_KEY"] = (
+        os.getenv("SECRET_KEY")
+        or (ConfigSistema.get().get("secret_key") or "dev-secret")
+    )
+
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///usuarios.db"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+
+    # 🔗 REGISTRO DOS BLUEPRINTS
+    app.register_blueprint(bp_radio)
+    app.register_blueprint(bp_auth)
+    app.register_blueprint(bp_admin)
+    app.register_blueprint(bp_config)
+
+    # ⚠️ HANDLERS DE ERRO COMUM
+    @app.errorhandler(403)
+    def e403(_e):
+        return render_template("error_403.html"), 403
+
+    tempos["app"] = (time.perf_counter() - t) * 1000
+    t = time.perf_counter()
+
+    # Índice preparado; as rádios entram na memória sob demanda
+    inicializar_cache_local(lazy=True)
+    tempos["cache"] = (time.perf_counter() - t) * 1000
+
+    # Atualização periódica do cache e observador de arquivos: só sob pedido
+    if servicos:
+        iniciar_servicos()
+
+    app.config["TEMPOS_INICIALIZACAO"] = tempos
+    _relatorio_inicializacao(tempos)
+    return app
+
+
+# Sem serviços: importar o módulo (ex.: `gunicorn app:app`, subprocessos) não varre
+# nada. Em produção use `gunicorn wsgi:app`, que os inicia em um único worker.
+app = create_app()
 
 
 # ============================================================
 # 🚀 ENTRYPOINT PRINCIPAL
 # ============================================================
 if __name__ == "__main__":
-    # Inicializa o cache (carrega local + Drive persistente)
-
     print("🚀 Sistema iniciado com sucesso! Acesse: http://127.0.0.1:5000")
 
+    # Com o reloader do Werkzeug, só o processo filho (WERKZEUG_RUN_MAIN) inicia os serviços
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        iniciar_servicos()
+
     app.run(
         host="0.0.0.0",
         port=5000,
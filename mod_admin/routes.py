@@ -115,17 +115,22 @@ from mod_config.models import carregar_radios_config
 def status_cache():
     """Exibe o status do cache de áudios."""
     from datetime import datetime
-    from mod_radio.audio_cache import CACHE_AUDIOS, CACHE_TIMESTAMP, carregar_cache
+    from mod_radio import audio_db
+    from mod_radio.agendador_cache import status_agendador, intervalo_minutos
 
-    carregar_cache()  # 🔄 recarrega dados salvos do disco
+    # 🔄 contagens e horários direto do índice (sem recarregar os itens)
+    contagens = audio_db.contar_por_radio()
+    timestamps = audio_db.carregar_status()
+    duracoes = audio_db.carregar_duracoes()
+    agendador = status_agendador()
 
     radios_cfg = carregar_radios_config()
     agora = datetime.now()
     status = []
 
     for radio_key, cfg in radios_cfg.items():
-        qtd = len(CACHE_AUDIOS.get(radio_key, []))
-        ultima = CACHE_TIMESTAMP.get(radio_key)
+        qtd = contagens.get(radio_key, 0)
+        ultima = timestamps.get(radio_key)
         minutos_desde = "—"
 
         if ultima and isinstance(ultima, str):
@@ -135,12 +140,104 @@ def status_cache():
             except Exception:
                 pass
 
+        agenda = agendador.get(radio_key, {})
+        proxima = agenda.get("proxima")
+
         status.append({
             "radio": radio_key,
             "nome": cfg.get("nome", "—"),
             "arquivos": qtd,
             "ultima_atualizacao": ultima or "— aguardando —",
             "minutos_desde": f"{minutos_desde} min" if isinstance(minutos_desde, int) else minutos_desde,
+            "em_andamento": agenda.get("em_andamento", False),
+            "proxima": proxima.strftime("%H:%M:%S") if proxima else "—",
+            "duracao_varredura": f"{duracoes[radio_key]:.2f} s" if duracoes.get(radio_key) is not None else "—",
         })
 
-    return render_template("status_cache.html", status=status, intervalo="Manual / Local")
+    intervalo = f"Automático a cada {intervalo_minutos()} min" if agendador else "Manual / Local"
+    return render_template("status_cache.html", status=status, intervalo=intervalo,
+                           histogramas=metricas.resumo_histogramas(),
+                           contadores=metricas.valores_contadores())
+
+
+# -------------------------------------------------------------------------
+# 🩺 COBERTURA DAS GRAVAÇÕES (lacunas e sobreposições)
+# -------------------------------------------------------------------------
+from flask import jsonify
+
+def _relatorio_cobertura():
+    """(mes, {radio: dias}) do mês pedido em ?mes=AAAA-MM (padrão: mês atual) e ?radio= opcional."""
+    from time import perf_counter
+    from mod_radio import cobertura
+    from mod_radio.audio_cache import obter_cache
+    from mod_radio.audio_indice import SEGUNDOS_DIA
+    from mod_radio.audio_utils import datetime_para_epoch
+
+    mes = request.args.get("mes") or datetime.now().strftime("%Y-%m")
+    inicio = datetime.strptime(mes, "%Y-%m")  # ValueError se inválido
+    proximo = inicio.replace(year=inicio.year + inicio.month // 12, month=inicio.month % 12 + 1)
+    dia_ini = datetime_para_epoch(inicio) // SEGUNDOS_DIA
+    dia_fim = datetime_para_epoch(proximo) // SEGUNDOS_DIA - 1
+
+    radios_cfg = carregar_radios_config()
+    chaves = [request.args["radio"]] if request.args.get("radio") else list(radios_cfg)
+    relatorio = {}
+    t = perf_counter()
+    for radio_key in chaves:
+        if radio_key not in radios_cfg:
+            raise KeyError(radio_key)
+        relatorio[radio_key] = cobertura.relatorio(obter_cache(radio_key), dia_ini, dia_fim)
+    print(f"🩺 [COBERTURA] {mes}: {len(chaves)} rádio(s) em {(perf_counter() - t) * 1000:.1f} ms")
+    return mes, relatorio
+
+
+@bp_admin.route("/admin/cobertura")
+@admin_required
+def cobertura_gravacoes():
+    """Relatório de cobertura por rádio e dia (lacunas e sobreposições)."""
+    erro = None
+    try:
+        mes, relatorio = _relatorio_cobertura()
+    except (ValueError, KeyError):
+        mes, relatorio, erro = request.args.get("mes", ""), {}, "Mês ou rádio inválido."
+    return render_template("cobertura.html", mes=mes, relatorio=relatorio, erro=erro,
+                           radios=carregar_radios_config(), radio=request.args.get("radio", ""))
+
+
+@bp_admin.route("/admin/cobertura/data")
+@admin_required
+def cobertura_data():
+    """Mesmo relatório em JSON."""
+    try:
+        mes, relatorio = _relatorio_cobertura()
+    except ValueError:
+        return jsonify({"erro": "Use ?mes=AAAA-MM."}), 400
+    except KeyError:
+        return jsonify({"erro": "Rádio não encontrada"}), 404
+    return jsonify({"mes": mes, "radios": relatorio})
+
+
+# -------------------------------------------------------------------------
+# 📈 MÉTRICAS (formato texto do Prometheus)
+# -------------------------------------------------------------------------
+import hmac
+import os
+from flask import Response, abort
+from mod_radio import metricas
+
+# Endereços liberados sem login (ex.: "10.0.0.5,::1"). Vazio por padrão: atrás de
+# um proxy reverso local toda requisição chega de 127.0.0.1.
+METRICS_IPS = {ip.strip() for ip in os.getenv("METRICS_IPS", "").split(",") if ip.strip()}
+
+@bp_admin.route("/metrics")
+def metrics():
+    """Métricas do processo. Acesso: admin logado, `Bearer $METRICS_TOKEN` ou IP em $METRICS_IPS."""
+    token = os.getenv("METRICS_TOKEN")
+    autorizado = (
+        (session.get("user") or {}).get("tipo") == "admin"
+        or (token and hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"))
+        or request.remote_addr in METRICS_IPS
+    )
+    if not autorizado:
+        abort(403)
+    return Response(metricas.exportar_texto(), mimetype="text/plain; version=0.0.4; charset=utf-8")
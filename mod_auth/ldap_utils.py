@@ -1,11 +1,18 @@
 from typing import Tuple, Dict, Optional
 from mod_config.models import ConfigLDAP
 
-# Opcional: se ldap3 estiver instalado e configurado no projeto
-try:
-    from ldap3 import Server, Connection, ALL, Tls
-except Exception:  # fallback se não houver ldap3
-    Server = Connection = ALL = Tls = None
+# Opcional: ldap3 só é importado no primeiro uso do LDAP (inicialização rápida)
+Server = Connection = ALL = Tls = None
+
+
+def _carregar_ldap3() -> bool:
+    global Server, Connection, ALL, Tls
+    if Server is None:
+        try:
+            from ldap3 import Server, Connection, ALL, Tls
+        except Exception:  # fallback se não houver ldap3
+            return False
+    return True
 
 def obter_config_ldap_ativa() -> Optional[Dict]:
     cfg = ConfigLDAP.get_ativa()
@@ -27,7 +34,7 @@ def autenticar_ldap(usuario: str, senha: str) -> Tuple[bool, str]:
     if not cfg:
         return False, "LDAP não configurado/ativo."
 
-    if Server is None or Connection is None:
+    if not _carregar_ldap3():
         return False, "Dependência ldap3 não disponível no ambiente."
 
     try:
@@ -45,7 +52,7 @@ def autenticar_ldap(usuario: str, senha: str) -> Tuple[bool, str]:
         return False, f"Erro LDAP: {e}"
 
 def testar_conexao_ldap(data_form: Dict) -> Tuple[bool, str]:
-    if Server is None or Connection is None:
+    if not _carregar_ldap3():
         return False, "Dependência ldap3 não disponível no ambiente."
 
     servidor = data_form.get("servidor")
@@ -7,10 +7,6 @@ from .models import (
 )
 from mod_auth.utils import admin_required
 from mod_auth.ldap_utils import testar_conexao_ldap
-from mod_config.google_drive_utils import (
-    create_flow, build_drive_service, sincronizar_pasta_drive_para_local
-)
-import requests
 
 
 # ============================================================
@@ -69,8 +65,10 @@ def ldap_test():
 @bp_config.route('/radios')
 @admin_required
 def radios():
+    from mod_radio.parsers_nome import PARSERS
+
     radios = ConfigRadio.select_all()
-    return render_template('config_radios.html', radios=radios)
+    return render_template('config_radios.html', radios=radios, parsers=sorted(PARSERS))
 
 
 @bp_config.route('/radios/add', methods=['POST'])
@@ -183,6 +181,8 @@ def google_drive_connect():
         flash("Configure o Client ID e Secret antes de conectar.", "warning")
         return redirect(url_for("bp_config.config_google_drive"))
 
+    from mod_config.google_drive_utils import create_flow
+
     redirect_uri = url_for(".google_drive_callback", _external=True)
     print("🔗 redirect_uri:", redirect_uri)
 
@@ -206,6 +206,8 @@ def google_drive_callback():
         flash("Configuração do Google Drive não encontrada.", "danger")
         return redirect(url_for("bp_config.config_google_drive"))
 
+    from mod_config.google_drive_utils import create_flow
+
     redirect_uri = url_for(".google_drive_callback", _external=True)
     flow = create_flow(config["client_id"], config["client_secret"], redirect_uri)
     flow.fetch_token(authorization_response=request.url)
@@ -244,6 +246,8 @@ def google_drive_folders():
     if not config or not config.get("access_token"):
         return jsonify({"ok": False, "pastas": [], "msg": "Google Drive não conectado."}), 400
 
+    from mod_config.google_drive_utils import build_drive_service
+
     try:
         service = build_drive_service(config)
         results = service.files().list(
@@ -263,6 +267,8 @@ def google_drive_folders():
 @admin_required
 def sincronizar_drive(id_radio):
     """Sincroniza os arquivos da pasta do Google Drive com o diretório local."""
+    from mod_config.google_drive_utils import build_drive_service, sincronizar_pasta_drive_para_local
+
     try:
         radio = ConfigRadio.by_id(id_radio)
         if not radio:
@@ -0,0 +1,121 @@
+# mod_radio/agendador_cache.py
+"""Atualização periódica do cache em segundo plano (um trabalhador por rádio)."""
+import queue
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+from mod_radio import audio_cache
+from mod_config.models import carregar_radios_config, ConfigSistema
+
+# Estado por rádio
+_LOCK = threading.Lock()
+_FILAS = {}          # radio_key -> queue.Queue de pedidos
+_EM_ANDAMENTO = {}   # radio_key -> (Future, completo) da última varredura pedida
+_PROXIMA = {}        # radio_key -> datetime da próxima atualização automática
+_ATIVO = threading.Event()
+
+
+def intervalo_minutos():
+    """Intervalo configurado em ConfigSistema (ou o padrão do cache)."""
+    try:
+        cfg = ConfigSistema.get() or {}
+        return max(1, int(cfg.get("cache_intervalo_min") or audio_cache.CACHE_INTERVALO_MINUTOS))
+    except Exception:
+        return audio_cache.CACHE_INTERVALO_MINUTOS
+
+
+# -------------------------------------------------------------------------
+# 📨 PEDIDOS DE ATUALIZAÇÃO (single-flight)
+# -------------------------------------------------------------------------
+def solicitar_atualizacao(radio_key, radio_cfg=None, completo=False):
+    """Enfileira a atualização da rádio e retorna um Future.
+
+    Pedidos concorrentes para a mesma rádio compartilham a mesma varredura
+    enquanto ela não termina — exceto um pedido completo durante uma
+    incremental, que entra na fila para rodar logo depois dela. Quem chama
+    não espera pelo disco, a menos que chame `.result()` no Future.
+    """
+    with _LOCK:
+        futuro, em_curso_completo = _EM_ANDAMENTO.get(radio_key, (None, False))
+        if futuro is not None and not futuro.done() and (em_curso_completo or not completo):
+            return futuro
+
+        futuro = Future()
+        _EM_ANDAMENTO[radio_key] = (futuro, completo)
+        fila = _garantir_trabalhador(radio_key)
+    fila.put((futuro, radio_cfg, completo))
+    return futuro
+
+
+def _garantir_trabalhador(radio_key):
+    """Cria (se preciso) a fila e a thread da rádio. Chamar com _LOCK."""
+    fila = _FILAS.get(radio_key)
+    if fila is None:
+        fila = _FILAS[radio_key] = queue.Queue()
+        threading.Thread(
+            target=_trabalhador, args=(radio_key, fila),
+            name=f"cache-{radio_key}", daemon=True
+        ).start()
+    return fila
+
+
+# -------------------------------------------------------------------------
+# 🔁 TRABALHADOR POR RÁDIO
+# -------------------------------------------------------------------------
+def _trabalhador(radio_key, fila):
+    while True:
+        espera = intervalo_minutos() * 60
+        _PROXIMA[radio_key] = datetime.now() + timedelta(seconds=espera)
+        try:
+            futuro, radio_cfg, completo = fila.get(timeout=espera)
+        except queue.Empty:
+            if not _ATIVO.is_set():
+                continue
+            # Disparo periódico: passa pelo mesmo caminho dos pedidos manuais
+            radio_cfg = carregar_radios_config().get(radio_key)
+            if radio_cfg is None:
+                with _LOCK:
+                    if not fila.empty():
+                        continue
+                    _FILAS.pop(radio_key, None)
+                    _PROXIMA.pop(radio_key, None)
+                print(f"ℹ️ [AGENDADOR] Rádio '{radio_key}' inativa; encerrando trabalhador.")
+                return
+            solicitar_atualizacao(radio_key, radio_cfg)
+            continue
+
+        try:
+            audio_cache.atualizar_cache(radio_key, radio_cfg, completo=completo)
+            futuro.set_result(True)
+        except Exception as e:
+            print(f"⚠️ [AGENDADOR] Falha ao atualizar '{radio_key}':", e)
+            futuro.set_exception(e)
+
+
+# -------------------------------------------------------------------------
+# 🚀 INICIALIZAÇÃO E STATUS
+# -------------------------------------------------------------------------
+def iniciar_agendador():
+    """Inicia um trabalhador por rádio ativa e agenda a primeira varredura."""
+    if _ATIVO.is_set():
+        return
+    _ATIVO.set()
+
+    radios_cfg = carregar_radios_config()
+    for radio_key, radio_cfg in radios_cfg.items():
+        solicitar_atualizacao(radio_key, radio_cfg)
+    print(f"⏱️ [AGENDADOR] {len(radios_cfg)} rádios a cada {intervalo_minutos()} min.")
+
+
+def status_agendador():
+    """Situação de cada rádio: varredura em curso e próxima execução."""
+    with _LOCK:
+        status = {}
+        for radio_key in _FILAS:
+            futuro, _completo = _EM_ANDAMENTO.get(radio_key, (None, False))
+            status[radio_key] = {
+                "em_andamento": futuro is not None and not futuro.done(),
+                "proxima": _PROXIMA.get(radio_key),
+            }
+        return status
@@ -1,46 +1,132 @@
 # mod_radio/audio_cache.py
 import os
-import json
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from mod_radio.audio_utils import listar_audios
-from mod_config.models import carregar_radios_config
+from mod_radio.audio_utils import listar_audios_incremental, montar_item
+from mod_radio import audio_db, eventos, metadados, metricas, picos, resumo_dias
+from mod_radio.audio_indice import IndiceAudios, CAMPOS_META, meta_do_item
+from mod_radio.parsers_nome import obter_parser, nome_parser
+from mod_config.models import carregar_radios_config, get_media_drive_dir
 
-# Caminho do cache local
+# Caminho do cache local (JSON legado, importado uma vez para o índice)
 CACHE_PATH = os.path.join(os.getcwd(), "cache_local.json")
 
 # Estruturas em memória
-CACHE_AUDIOS = {}
+CACHE_AUDIOS = {}  # radio_key -> IndiceAudios (colunas ordenadas por horário)
 CACHE_TIMESTAMP = {}
+CACHE_PASTAS = {}  # mtime de cada subpasta varrida, por rádio
+CACHE_VARREDURA = {}  # estatísticas da última varredura (duração, pastas, ...)
+CACHE_VERSAO = {}  # radio_key -> versão do índice persistente refletida na memória
 CACHE_INTERVALO_MINUTOS = 10  # intervalo padrão
 
+# Os índices de CACHE_AUDIOS são substituídos (nunca alterados no lugar)
+# sob este lock: varreduras e o observador de arquivos escrevem em paralelo.
+_LOCK_CACHE = threading.RLock()
+
 
 # -------------------------------------------------------------------------
 # FUNÇÕES AUXILIARES
 # -------------------------------------------------------------------------
-def carregar_cache():
-    """Carrega cache do arquivo JSON para memória."""
-    global CACHE_AUDIOS, CACHE_TIMESTAMP
-    if os.path.exists(CACHE_PATH):
+def _carregar_radio(radio_key):
+    """Traz uma rádio do índice persistente para a memória."""
+    # Versão lida antes das linhas: numa gravação concorrente ela fica para trás
+    # (o próximo pedido dá 200 e a sincronização relê), nunca à frente
+    versao = audio_db.versao_radio(radio_key)
+    with _LOCK_CACHE:
+        _trocar_indice(radio_key, audio_db.carregar_indice(radio_key))
+        CACHE_VERSAO[radio_key] = versao
+    CACHE_PASTAS[radio_key] = audio_db.carregar_pastas(radio_key)
+
+
+def _confirmar_versao(radio_key, versao):
+    """Adota a versão devolvida pela gravação do índice da rádio."""
+    with _LOCK_CACHE:
+        if versao is not None and versao > CACHE_VERSAO.get(radio_key, 0):
+            CACHE_VERSAO[radio_key] = versao
+
+
+def _trocar_indice(radio_key, novo):
+    """Substitui o índice da rádio; resumo por dia e eventos só se o conteúdo mudou."""
+    anterior = CACHE_AUDIOS.get(radio_key)
+    CACHE_AUDIOS[radio_key] = novo
+    if anterior is None or not (
+        anterior.epochs == novo.epochs and anterior.subpaths == novo.subpaths
+        and anterior.tamanhos == novo.tamanhos and anterior.metas == novo.metas
+    ):
         try:
-            with open(CACHE_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                CACHE_AUDIOS = data.get("audios", {})
-                CACHE_TIMESTAMP = data.get("timestamp", {})
-            print(f"📦 Cache local carregado: {len(CACHE_AUDIOS)} rádios.")
+            resumo_dias.atualizar(radio_key, anterior, novo)
         except Exception as e:
-            print("⚠️ Erro ao carregar cache local:", e)
-    else:
-        print("ℹ️ Nenhum cache local encontrado.")
+            print(f"⚠️ [CACHE] Erro ao atualizar o resumo por dia de {radio_key}:", e)
+        try:
+            eventos.publicar_troca(radio_key, anterior, novo, versao_cache(radio_key))
+        except Exception as e:
+            print(f"⚠️ [CACHE] Erro ao publicar eventos de {radio_key}:", e)
+
+
+def versao_cache(radio_key):
+    """Versão do índice da rádio, como texto para ETags.
+
+    Vem do índice persistente (tb_audio_status.versao): todos os processos
+    que leram o mesmo índice dão a mesma ETag.
+    """
+    return str(CACHE_VERSAO.get(radio_key, 0))
 
 
-def salvar_cache():
-    """Salva o cache em disco."""
+def carregar_cache(lazy=False):
+    """Carrega o índice persistente (SQLite) para memória.
+
+    Com `lazy=True` só os horários de atualização são lidos; cada rádio é
+    trazida do índice no primeiro acesso (`obter_cache`).
+    """
     try:
-        data = {"audios": CACHE_AUDIOS, "timestamp": CACHE_TIMESTAMP}
-        with open(CACHE_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print("💾 Cache salvo com sucesso.")
+        audio_db.inicializar_banco()
+        importados = audio_db.importar_json_legado(CACHE_PATH)
+        if importados:
+            print(f"🔁 Cache JSON legado importado para o índice: {importados} arquivos.")
+
+        # Atualiza os dicionários no lugar: outros módulos guardam referência a eles
+        CACHE_TIMESTAMP.clear()
+        CACHE_TIMESTAMP.update(audio_db.carregar_status())
+        if lazy:
+            print(f"📦 Cache local sob demanda: {len(CACHE_TIMESTAMP)} rádios no índice.")
+            return
+        for radio_key in CACHE_TIMESTAMP:
+            _carregar_radio(radio_key)
+        print(f"📦 Cache local carregado: {len(CACHE_AUDIOS)} rádios.")
+    except Exception as e:
+        print("⚠️ Erro ao carregar cache local:", e)
+
+
+def salvar_cache(radio_key, itens_anteriores, pastas_anteriores, duracao_varredura=None,
+                 parser=None):
+    """Grava no índice só o que mudou na rádio desde a última varredura."""
+    inicio = time.perf_counter()
+    try:
+        anteriores = {it["subpath"]: it for it in itens_anteriores if it.get("subpath")}
+        atuais = CACHE_AUDIOS.get(radio_key, [])
+
+        atualizados = []
+        for it in atuais:
+            ant = anteriores.pop(it["subpath"], None)
+            if (ant is None or ant.get("epoch") != it["epoch"] or ant.get("bytes") != it["bytes"]
+                    or meta_do_item(ant) != meta_do_item(it)):
+                atualizados.append(it)
+
+        pastas = CACHE_PASTAS.get(radio_key, {})
+        pastas_alteradas = {p: v for p, v in pastas.items() if pastas_anteriores.get(p) != v}
+        pastas_removidas = [p for p in pastas_anteriores if p not in pastas]
+
+        versao = audio_db.salvar_radio(radio_key, atualizados, list(anteriores), pastas_alteradas,
+                                       pastas_removidas, CACHE_TIMESTAMP.get(radio_key),
+                                       duracao_varredura, parser)
+        _confirmar_versao(radio_key, versao)
+        metricas.SALVAR_SEGUNDOS.observar(time.perf_counter() - inicio, radio=radio_key)
+        metricas.SALVAR_ITENS.inc(len(atualizados), radio=radio_key, operacao="gravado")
+        metricas.SALVAR_ITENS.inc(len(anteriores), radio=radio_key, operacao="removido")
+        picos.agendar_itens(atualizados)
+        print(f"💾 Cache salvo: +{len(atualizados)} / -{len(anteriores)} arquivos em '{radio_key}'.")
     except Exception as e:
         print("⚠️ Erro ao salvar cache:", e)
 
@@ -48,18 +134,8 @@ def salvar_cache():
 # -------------------------------------------------------------------------
 # CACHE PRINCIPAL
 # -------------------------------------------------------------------------
-def atualizar_cache(radio_key, radio_cfg=None):
-    """Atualiza o cache local da rádio (Drive sincronizado ou local)."""
-    from mod_config.models import carregar_radios_config
-
-    if not radio_cfg:
-        radios_cfg = carregar_radios_config()
-        radio_cfg = radios_cfg.get(radio_key)
-
-    if not radio_cfg:
-        print(f"⚠️ [CACHE] Rádio '{radio_key}' não encontrada nas configurações.")
-        return
-
+def resolver_pasta_radio(radio_key, radio_cfg):
+    """Pasta local a varrer para a rádio (Drive sincronizado ou local)."""
     base_dir = radio_cfg.get("pasta_base") or ""
     tipo = radio_cfg.get("tipo_pasta") or "local"
     extensao = radio_cfg.get("extensao", ".mp3")
@@ -87,46 +163,202 @@ def atualizar_cache(radio_key, radio_cfg=None):
 
         if not sync_path:
             print(f"⚠️ [CACHE] Nenhuma pasta sincronizada encontrada para '{radio_key}' em {MEDIA_DIR}")
-            CACHE_AUDIOS[radio_key] = []
-            return
+            return None
 
         base_dir = str(sync_path)
         print(f"💾 [CACHE] Usando pasta sincronizada local: {base_dir}")
 
-    # -----------------------------------------------------------------
-    # 🔎 Varre os arquivos e atualiza o cache
-    # -----------------------------------------------------------------
     if not os.path.exists(base_dir):
         print(f"⚠️ [CACHE] Caminho inexistente: {base_dir}")
-        CACHE_AUDIOS[radio_key] = []
+        return None
+    return base_dir
+
+
+def atualizar_cache(radio_key, radio_cfg=None, completo=False):
+    """Atualiza o cache local da rádio (Drive sincronizado ou local).
+
+    Por padrão a varredura é incremental: só as pastas com mtime alterado
+    são relistadas. Com `completo=True` toda a árvore é relida.
+    """
+    with metricas.cronometrar(metricas.ATUALIZACAO_SEGUNDOS, radio=radio_key):
+        return _atualizar_cache(radio_key, radio_cfg, completo)
+
+
+def _atualizar_cache(radio_key, radio_cfg, completo):
+    from mod_config.models import carregar_radios_config
+
+    if not radio_cfg:
+        radios_cfg = carregar_radios_config()
+        radio_cfg = radios_cfg.get(radio_key)
+
+    if not radio_cfg:
+        print(f"⚠️ [CACHE] Rádio '{radio_key}' não encontrada nas configurações.")
         return
 
-    print(f"🎧 [CACHE] Iniciando varredura recursiva em: {base_dir}")
+    extensao = radio_cfg.get("extensao", ".mp3")
+    base_dir = resolver_pasta_radio(radio_key, radio_cfg)
+    if not base_dir:
+        _trocar_indice(radio_key, IndiceAudios())
+        return
+
+    # -----------------------------------------------------------------
+    # 🔎 Varre os arquivos e atualiza o cache
+    # -----------------------------------------------------------------
     radio_cfg_local = {
         "pasta_base": base_dir,
         "extensao": extensao,
         "chave": radio_key,
-        "nome": radio_cfg.get("nome", radio_key)
+        "nome": radio_cfg.get("nome", radio_key),
+        "parse_nome": radio_cfg.get("parse_nome"),
     }
 
-    audios = listar_audios(radio_cfg_local)
-    CACHE_AUDIOS[radio_key] = audios
-    CACHE_TIMESTAMP[radio_key] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if radio_key not in CACHE_AUDIOS:
+        _carregar_radio(radio_key)
+    itens_anteriores = CACHE_AUDIOS[radio_key]
+    pastas_anteriores = CACHE_PASTAS.get(radio_key) or {}
+
+    # Horários do índice foram calculados com outro parser: relê tudo uma vez
+    parser = nome_parser(radio_cfg.get("parse_nome"))
+    if pastas_anteriores and audio_db.carregar_parsers().get(radio_key) != parser:
+        print(f"🔁 [CACHE] Parser de nomes de '{radio_key}' mudou para '{parser}'.")
+        completo = True
 
-    salvar_cache()
+    modo = "completa" if completo or not pastas_anteriores else "incremental"
+    print(f"🎧 [CACHE] Iniciando varredura {modo} em: {base_dir}")
+
+    audios, pastas, estatisticas = listar_audios_incremental(
+        radio_cfg_local, None if completo else pastas_anteriores, itens_anteriores
+    )
+    inicio_meta = time.perf_counter()
+    lidos = metadados.preencher(audios, itens_anteriores)
+    if lidos:
+        print(f"🏷️ [CACHE] Metadados lidos de {lidos} arquivos em "
+              f"{time.perf_counter() - inicio_meta:.2f}s ('{radio_key}').")
+    with _LOCK_CACHE:
+        atuais = CACHE_AUDIOS.get(radio_key)
+        if atuais is not itens_anteriores:
+            # Arquivos registrados pelo observador durante a varredura
+            vistos = {it["subpath"] for it in audios} | {it["subpath"] for it in itens_anteriores}
+            extras = [it for it in atuais or [] if it["subpath"] not in vistos]
+            audios = audios + extras
+
+        _trocar_indice(radio_key, IndiceAudios(audios))
+        CACHE_PASTAS[radio_key] = pastas
+        CACHE_VARREDURA[radio_key] = estatisticas
+        CACHE_TIMESTAMP[radio_key] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    salvar_cache(radio_key, itens_anteriores, pastas_anteriores, estatisticas["duracao"], parser)
     print(f"✅ [CACHE] Cache atualizado para '{radio_key}' ({len(audios)} arquivos).")
 
 
 def obter_cache(radio_key):
-    """Obtém os áudios do cache em memória."""
-    return CACHE_AUDIOS.get(radio_key, [])
+    """Obtém os áudios do cache em memória (lidos do índice no primeiro acesso)."""
+    if radio_key in CACHE_AUDIOS:
+        metricas.CACHE_CONSULTAS.inc(resultado="hit")
+    else:
+        metricas.CACHE_CONSULTAS.inc(resultado="miss")
+        try:
+            _carregar_radio(radio_key)
+        except Exception as e:
+            print(f"⚠️ [CACHE] Erro ao ler índice de '{radio_key}':", e)
+            return IndiceAudios()
+    return CACHE_AUDIOS.get(radio_key) or IndiceAudios()
+
+
+def obter_cache_versionado(radio_key):
+    """(versão, índice) da rádio lidos juntos, já carregada: a ETag nunca fica à frente do conteúdo."""
+    indice = obter_cache(radio_key)
+    with _LOCK_CACHE:
+        return versao_cache(radio_key), CACHE_AUDIOS.get(radio_key) or indice
+
+
+# -------------------------------------------------------------------------
+# ✏️ ATUALIZAÇÃO PONTUAL (observador de arquivos)
+# -------------------------------------------------------------------------
+def registrar_arquivo(radio_key, caminho, parse_nome=None):
+    """Insere (ou atualiza) um único arquivo no cache em memória e no índice."""
+    nome = os.path.basename(caminho)
+    if not nome.lower().endswith((".mp3", ".wav")):
+        return None
+    try:
+        item = montar_item(caminho, nome, get_media_drive_dir(), parser=obter_parser(parse_nome))
+    except OSError:
+        return None
+    item.update(zip(CAMPOS_META, metadados.ler_metadados(caminho)))
+
+    with _LOCK_CACHE:
+        _trocar_indice(radio_key, obter_cache(radio_key).com_item(item))
+        CACHE_TIMESTAMP[radio_key] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        atualizado_em = CACHE_TIMESTAMP[radio_key]
+
+    _confirmar_versao(radio_key, audio_db.salvar_radio(radio_key, [item], [], {}, [], atualizado_em))
+    return item
+
+
+def remover_arquivo(radio_key, caminho):
+    """Remove um único arquivo do cache em memória e do índice."""
+    subpath = Path(os.path.relpath(caminho, get_media_drive_dir())).as_posix()
+    with _LOCK_CACHE:
+        indice = obter_cache(radio_key)
+        restante = indice.sem_subpath(subpath)
+        if restante is indice:
+            return False
+        _trocar_indice(radio_key, restante)
+        atualizado_em = CACHE_TIMESTAMP.get(radio_key)
+
+    _confirmar_versao(radio_key, audio_db.salvar_radio(radio_key, [], [subpath], {}, [], atualizado_em))
+    return True
+
+
+# -------------------------------------------------------------------------
+# 🔗 SINCRONIZAÇÃO ENTRE PROCESSOS
+# -------------------------------------------------------------------------
+SINCRONIZACAO_SEG = int(os.getenv("CACHE_SINCRONIZACAO_SEG", "5"))
+_SINCRONIZANDO = threading.Event()
+
+
+def sincronizar_do_indice():
+    """Relê do índice as rádios em memória que outro processo atualizou.
+
+    Compara a versão do índice (contador gravado junto com as alterações),
+    não o horário: duas gravações no mesmo segundo também são percebidas.
+    """
+    versoes = audio_db.carregar_versoes()
+    status = audio_db.carregar_status()
+    relidas = 0
+    for radio_key in list(CACHE_AUDIOS):
+        versao = versoes.get(radio_key)
+        if versao is not None and versao != CACHE_VERSAO.get(radio_key):
+            with _LOCK_CACHE:
+                _carregar_radio(radio_key)
+            relidas += 1
+        if status.get(radio_key):
+            CACHE_TIMESTAMP[radio_key] = status[radio_key]
+    return relidas
+
+
+def _ciclo_sincronizacao():
+    while True:
+        time.sleep(SINCRONIZACAO_SEG)
+        try:
+            sincronizar_do_indice()
+        except Exception as e:
+            print("⚠️ [CACHE] Erro ao sincronizar com o índice:", e)
+
+
+def iniciar_sincronizacao():
+    """Processos sem o agendador acompanham as varreduras de outro processo pelo índice."""
+    if _SINCRONIZANDO.is_set():
+        return
+    _SINCRONIZANDO.set()
+    threading.Thread(target=_ciclo_sincronizacao, name="cache-sincronizacao", daemon=True).start()
 
 
 # -------------------------------------------------------------------------
 # INICIALIZAÇÃO AUTOMÁTICA
 # -------------------------------------------------------------------------
-def inicializar_cache_local():
-    """Carrega cache local na inicialização."""
+def inicializar_cache_local(lazy=False):
+    """Carrega cache local na inicialização (ou só o prepara, se `lazy`)."""
     print("🧩 Inicializando sistema de cache local...")
-    carregar_cache()
+    carregar_cache(lazy=lazy)
     print("✅ Cache local pronto.")
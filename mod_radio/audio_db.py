@@ -0,0 +1,406 @@
+# mod_radio/audio_db.py
+"""Índice persistente de áudios (SQLite dedicado, ao lado do cache local)."""
+import os
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Iterable, Optional
+
+from mod_radio.audio_utils import datahora_para_epoch
+from mod_radio.audio_indice import IndiceAudios
+
+# Banco dedicado ao índice: não disputa locks com usuarios.db
+INDEX_DB_PATH = os.path.join(os.getcwd(), "audio_index.db")
+
+# O journal WAL recebe as alterações em modo append; o checkpoint que as
+# consolida no arquivo principal roda em segundo plano (compactar()).
+WAL_AUTOCHECKPOINT_PAGINAS = 10000
+COMPACTACAO_INTERVALO_MIN = int(os.getenv("INDEX_COMPACTACAO_MIN", "30"))
+
+_BANCO_PRONTO = False
+_PREFIXOS = {}  # prefixo de pasta -> id em tb_audio_prefixos
+_LOCK_PREFIXOS = threading.Lock()
+
+
+def _conn():
+    global _BANCO_PRONTO
+    conn = sqlite3.connect(INDEX_DB_PATH, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA wal_autocheckpoint={WAL_AUTOCHECKPOINT_PAGINAS}")
+    if not _BANCO_PRONTO:
+        _criar_tabelas(conn)
+        _BANCO_PRONTO = True
+    return conn
+
+
+@contextmanager
+def _transacao():
+    """Conexão com commit (ou rollback, em erro) ao sair do bloco — e sempre fechada.
+
+    O `with conn:` do sqlite3 só faz commit/rollback; sem o close, cada
+    chamada deixaria a conexão (e seus handles do WAL) aberta até o GC.
+    """
+    conn = _conn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def inicializar_banco():
+    """Garante que as tabelas do índice existam."""
+    _conn().close()
+
+
+def _criar_tabelas(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    with conn as c:
+        _migrar_subpath_para_prefixo(c)
+        c.executescript("""
+            -- Pastas internadas: cada item guarda só o id da pasta e o nome
+            CREATE TABLE IF NOT EXISTS tb_audio_prefixos (
+                id INTEGER PRIMARY KEY,
+                prefixo TEXT NOT NULL UNIQUE
+            );
+
+            CREATE TABLE IF NOT EXISTS tb_audio_index (
+                radio TEXT NOT NULL,
+                pasta_id INTEGER NOT NULL,
+                nome TEXT NOT NULL,
+                epoch INTEGER NOT NULL,
+                tamanho INTEGER NOT NULL,
+                PRIMARY KEY (radio, pasta_id, nome)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_audio_index_radio_epoch
+                ON tb_audio_index (radio, epoch);
+
+            CREATE TABLE IF NOT EXISTS tb_audio_pastas (
+                radio TEXT NOT NULL,
+                pasta TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                subpastas TEXT NOT NULL,
+                PRIMARY KEY (radio, pasta)
+            );
+
+            CREATE TABLE IF NOT EXISTS tb_audio_status (
+                radio TEXT PRIMARY KEY,
+                atualizado_em TEXT
+            );
+
+            -- Tabela de busca dos MP3 (offsets por segundo), válida para (tamanho, mtime)
+            CREATE TABLE IF NOT EXISTS tb_mp3_busca (
+                subpath TEXT PRIMARY KEY,
+                tamanho INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                amostras INTEGER NOT NULL,
+                taxa INTEGER NOT NULL,
+                quadros INTEGER NOT NULL,
+                fim INTEGER NOT NULL,
+                passo INTEGER NOT NULL,
+                pontos BLOB NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        _garantir_coluna(c, "tb_audio_status", "duracao_varredura", "REAL")
+        _garantir_coluna(c, "tb_audio_status", "parser", "TEXT")
+        # Cresce a cada gravação que muda os arquivos da rádio (ETags e sincronização)
+        _garantir_coluna(c, "tb_audio_status", "versao", "INTEGER NOT NULL DEFAULT 0")
+        # Metadados lidos dos cabeçalhos (NULL = ainda não lidos)
+        for coluna, tipo in (("duracao", "REAL"), ("bitrate", "INTEGER"), ("taxa", "INTEGER"),
+                             ("canais", "INTEGER")):
+            _garantir_coluna(c, "tb_audio_index", coluna, tipo)
+
+
+def _migrar_subpath_para_prefixo(conn):
+    """Converte o formato antigo (subpath completo por linha) em prefixos."""
+    colunas = {r["name"] for r in conn.execute("PRAGMA table_info(tb_audio_index)")}
+    if "subpath" not in colunas:
+        return
+
+    print("🔁 [ÍNDICE] Convertendo subpaths para prefixos de pasta...")
+    linhas = conn.execute("SELECT radio, epoch, nome, tamanho, subpath FROM tb_audio_index").fetchall()
+    conn.execute("DROP TABLE tb_audio_index")
+    conn.execute("CREATE TABLE tb_audio_prefixos (id INTEGER PRIMARY KEY, prefixo TEXT NOT NULL UNIQUE)")
+    conn.execute("""
+        CREATE TABLE tb_audio_index (
+            radio TEXT NOT NULL, pasta_id INTEGER NOT NULL, nome TEXT NOT NULL,
+            epoch INTEGER NOT NULL, tamanho INTEGER NOT NULL,
+            PRIMARY KEY (radio, pasta_id, nome)
+        ) WITHOUT ROWID
+    """)
+    novas = []
+    for r in linhas:
+        prefixo, nome = _dividir_subpath(r["subpath"])
+        novas.append((r["radio"], _id_prefixo(conn, prefixo), nome, r["epoch"], r["tamanho"]))
+    conn.executemany(
+        "INSERT OR REPLACE INTO tb_audio_index (radio, pasta_id, nome, epoch, tamanho) VALUES (?, ?, ?, ?, ?)",
+        novas
+    )
+
+
+def _garantir_coluna(conn, tabela, coluna, tipo):
+    """Adiciona a coluna em bancos criados antes dela existir."""
+    colunas = {r["name"] for r in conn.execute(f"PRAGMA table_info({tabela})")}
+    if coluna not in colunas:
+        conn.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+
+
+# ============================================================
+# 🗂️ PREFIXOS DE PASTA
+# ============================================================
+def _dividir_subpath(subpath: str):
+    prefixo, _, nome = subpath.rpartition("/")
+    return prefixo, nome
+
+
+def _id_prefixo(conn, prefixo: str) -> int:
+    """Id do prefixo (criado na primeira vez), com cache em memória."""
+    with _LOCK_PREFIXOS:
+        pid = _PREFIXOS.get(prefixo)
+        if pid is None:
+            conn.execute("INSERT OR IGNORE INTO tb_audio_prefixos (prefixo) VALUES (?)", (prefixo,))
+            pid = conn.execute("SELECT id FROM tb_audio_prefixos WHERE prefixo=?", (prefixo,)).fetchone()[0]
+            _PREFIXOS[prefixo] = pid
+        return pid
+
+
+# ============================================================
+# 📥 LEITURA
+# ============================================================
+def carregar_indice(radio: str) -> IndiceAudios:
+    """Índice ordenado de uma rádio, montado direto das colunas do banco."""
+    with _transacao() as c:
+        cur = c.execute("""
+            SELECT i.epoch, i.nome, i.tamanho, p.prefixo, i.duracao, i.bitrate, i.taxa, i.canais
+            FROM tb_audio_index i JOIN tb_audio_prefixos p ON p.id = i.pasta_id
+            WHERE i.radio=? ORDER BY i.epoch, i.nome
+        """, (radio,))
+        linhas = cur.fetchall()
+    return IndiceAudios.de_colunas(
+        (r[0] for r in linhas), (r[1] for r in linhas), (r[2] for r in linhas),
+        (f"{r[3]}/{r[1]}" if r[3] else r[1] for r in linhas),
+        (tuple(r[4:8]) if r[4] is not None else None for r in linhas),
+    )
+
+
+def carregar_pastas(radio: str) -> Dict[str, Dict]:
+    with _transacao() as c:
+        cur = c.execute("SELECT pasta, mtime, subpastas FROM tb_audio_pastas WHERE radio=?", (radio,))
+        return {
+            r["pasta"]: {"mtime": r["mtime"], "subpastas": json.loads(r["subpastas"])}
+            for r in cur.fetchall()
+        }
+
+
+def carregar_status() -> Dict[str, str]:
+    with _transacao() as c:
+        cur = c.execute("SELECT radio, atualizado_em FROM tb_audio_status")
+        return {r["radio"]: r["atualizado_em"] for r in cur.fetchall()}
+
+
+def carregar_versoes() -> Dict[str, int]:
+    """Versão do índice de cada rádio (muda a cada gravação com alterações)."""
+    with _transacao() as c:
+        cur = c.execute("SELECT radio, versao FROM tb_audio_status")
+        return {r["radio"]: r["versao"] for r in cur.fetchall()}
+
+
+def versao_radio(radio: str) -> int:
+    """Versão do índice da rádio (0 se ainda não indexada)."""
+    with _transacao() as c:
+        linha = c.execute("SELECT versao FROM tb_audio_status WHERE radio=?", (radio,)).fetchone()
+        return linha["versao"] if linha else 0
+
+
+def carregar_duracoes() -> Dict[str, Optional[float]]:
+    """Duração (s) da última varredura de cada rádio."""
+    with _transacao() as c:
+        cur = c.execute("SELECT radio, duracao_varredura FROM tb_audio_status")
+        return {r["radio"]: r["duracao_varredura"] for r in cur.fetchall()}
+
+
+def carregar_parsers() -> Dict[str, Optional[str]]:
+    """Parser de nomes usado na última varredura de cada rádio."""
+    with _transacao() as c:
+        cur = c.execute("SELECT radio, parser FROM tb_audio_status")
+        return {r["radio"]: r["parser"] for r in cur.fetchall()}
+
+
+def carregar_busca_mp3(subpath: str) -> Optional[sqlite3.Row]:
+    """Tabela de busca gravada para o MP3 (ou None)."""
+    with _transacao() as c:
+        return c.execute("SELECT * FROM tb_mp3_busca WHERE subpath=?", (subpath,)).fetchone()
+
+
+def contar_por_radio() -> Dict[str, int]:
+    with _transacao() as c:
+        cur = c.execute("SELECT radio, COUNT(*) AS qtd FROM tb_audio_index GROUP BY radio")
+        return {r["radio"]: r["qtd"] for r in cur.fetchall()}
+
+
+def radios_indexadas() -> List[str]:
+    with _transacao() as c:
+        cur = c.execute("SELECT radio FROM tb_audio_status")
+        return [r["radio"] for r in cur.fetchall()]
+
+
+# ============================================================
+# 💾 ESCRITA (upsert por rádio)
+# ============================================================
+def salvar_radio(radio: str, atualizados: Iterable[Dict], removidos: Iterable[str],
+                 pastas_alteradas: Dict[str, Dict], pastas_removidas: Iterable[str],
+                 atualizado_em: Optional[str], duracao_varredura: Optional[float] = None,
+                 parser: Optional[str] = None):
+    """Grava, numa única transação, apenas o que mudou na rádio.
+
+    Retorna a versão do índice da rádio depois da gravação.
+    """
+    try:
+        return _salvar_radio(radio, atualizados, removidos, pastas_alteradas, pastas_removidas,
+                      atualizado_em, duracao_varredura, parser)
+    except Exception:
+        # Prefixos criados numa transação desfeita não existem no banco
+        with _LOCK_PREFIXOS:
+            _PREFIXOS.clear()
+        raise
+
+
+def _salvar_radio(radio, atualizados, removidos, pastas_alteradas, pastas_removidas,
+                  atualizado_em, duracao_varredura, parser):
+    with _transacao() as c:
+        linhas = []
+        for it in atualizados:
+            prefixo, nome = _dividir_subpath(it["subpath"])
+            linhas.append((radio, _id_prefixo(c, prefixo), nome, it["epoch"], it["bytes"],
+                           it.get("duracao"), it.get("bitrate"), it.get("taxa"), it.get("canais")))
+        c.executemany("""
+            INSERT INTO tb_audio_index (radio, pasta_id, nome, epoch, tamanho, duracao, bitrate, taxa, canais)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(radio, pasta_id, nome) DO UPDATE SET
+              epoch=excluded.epoch, tamanho=excluded.tamanho, duracao=excluded.duracao,
+              bitrate=excluded.bitrate, taxa=excluded.taxa, canais=excluded.canais
+        """, linhas)
+
+        remocoes = []
+        for s in removidos:
+            prefixo, nome = _dividir_subpath(s)
+            remocoes.append((radio, _id_prefixo(c, prefixo), nome))
+        c.executemany("DELETE FROM tb_audio_index WHERE radio=? AND pasta_id=? AND nome=?", remocoes)
+        c.executemany("DELETE FROM tb_mp3_busca WHERE subpath=?", [(s,) for s in removidos])
+
+        c.executemany("""
+            INSERT INTO tb_audio_pastas (radio, pasta, mtime, subpastas)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(radio, pasta) DO UPDATE SET
+              mtime=excluded.mtime, subpastas=excluded.subpastas
+        """, [(radio, p, v["mtime"], json.dumps(v["subpastas"], ensure_ascii=False))
+              for p, v in pastas_alteradas.items()])
+        c.executemany("DELETE FROM tb_audio_pastas WHERE radio=? AND pasta=?",
+                      [(radio, p) for p in pastas_removidas])
+
+        c.execute("""
+            INSERT INTO tb_audio_status (radio, atualizado_em, duracao_varredura, parser, versao)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(radio) DO UPDATE SET
+              atualizado_em=excluded.atualizado_em,
+              duracao_varredura=COALESCE(excluded.duracao_varredura, duracao_varredura),
+              parser=COALESCE(excluded.parser, parser),
+              versao=versao + excluded.versao
+        """, (radio, atualizado_em, duracao_varredura, parser, 1 if linhas or remocoes else 0))
+        return c.execute("SELECT versao FROM tb_audio_status WHERE radio=?", (radio,)).fetchone()[0]
+
+
+def salvar_busca_mp3(subpath: str, tamanho: int, mtime_ns: int, amostras: int, taxa: int,
+                     quadros: int, fim: int, passo: int, pontos: bytes):
+    """Grava (ou substitui) a tabela de busca de um MP3."""
+    with _transacao() as c:
+        c.execute("""
+            INSERT OR REPLACE INTO tb_mp3_busca
+              (subpath, tamanho, mtime_ns, amostras, taxa, quadros, fim, passo, pontos)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (subpath, tamanho, mtime_ns, amostras, taxa, quadros, fim, passo, pontos))
+
+
+# ============================================================
+# 🔁 MIGRAÇÃO DO cache_local.json
+# ============================================================
+def _item_legado(it: Dict) -> Optional[Dict]:
+    """Normaliza um item do JSON antigo (que podia ter só `path`)."""
+    subpath = it.get("subpath")
+    if not subpath and it.get("path"):
+        caminho = it["path"].replace("\\", "/")
+        if "/media_drive/" in caminho:
+            subpath = caminho.split("/media_drive/", 1)[1]
+    if not subpath:
+        return None
+    try:
+        epoch = it.get("epoch") or datahora_para_epoch(it["datahora"])
+    except (KeyError, ValueError):
+        return None
+    tamanho = it.get("bytes")
+    if tamanho is None:
+        tamanho = int(round(float(it.get("tamanho") or 0) * 1024))
+    return {"nome": it.get("nome") or subpath.rsplit("/", 1)[-1], "epoch": epoch,
+            "bytes": tamanho, "subpath": subpath}
+
+
+def importar_json_legado(caminho: str) -> int:
+    """Importa o cache_local.json para o índice, se o índice estiver vazio."""
+    if not os.path.exists(caminho) or radios_indexadas():
+        return 0
+
+    with open(caminho, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    total = 0
+    timestamps = data.get("timestamp", {})
+    for radio, itens in data.get("audios", {}).items():
+        normalizados = [n for n in (_item_legado(it) for it in itens) if n]
+        salvar_radio(radio, normalizados, [], data.get("pastas", {}).get(radio, {}), [],
+                     timestamps.get(radio))
+        total += len(normalizados)
+    return total
+
+
+# ============================================================
+# 🧹 COMPACTAÇÃO EM SEGUNDO PLANO
+# ============================================================
+def compactar():
+    """Consolida o WAL no arquivo principal e recupera páginas livres.
+
+    Um processo de cada vez (trava em arquivo): se outro já está compactando,
+    retorna False sem fazer nada.
+    """
+    from mod_radio import travas
+
+    with travas.exclusivo("indice-manutencao") as minha_vez:
+        if not minha_vez:
+            return False
+        conn = _conn()
+        try:
+            livres = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            total = conn.execute("PRAGMA page_count").fetchone()[0]
+            if total and livres / total > 0.25:
+                conn.execute("VACUUM")
+            conn.execute("PRAGMA optimize")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+        return True
+
+
+def _ciclo_compactacao():
+    while True:
+        time.sleep(COMPACTACAO_INTERVALO_MIN * 60)
+        try:
+            compactar()
+        except Exception as e:
+            print("⚠️ [ÍNDICE] Erro na compactação:", e)
+
+
+def iniciar_compactacao():
+    """Agenda a compactação periódica do índice."""
+    threading.Thread(target=_ciclo_compactacao, name="indice-compactacao", daemon=True).start()
@@ -0,0 +1,246 @@
+# mod_radio/audio_indice.py
+"""Cache de uma rádio em colunas paralelas ordenadas por horário.
+
+Os filtros de data/hora viram duas buscas binárias sobre `epochs` e a
+paginação é uma fatia dessa faixa — nenhum item é convertido de texto.
+"""
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+from mod_radio.audio_utils import epoch_para_datahora, chave_ordenacao
+
+SEGUNDOS_DIA = 86400
+CAMPOS_META = ("duracao", "bitrate", "taxa", "canais")
+
+
+def meta_do_item(item):
+    """Tupla de metadados do item (ou None, se ainda não lidos)."""
+    if item.get("duracao") is None:
+        return None
+    return tuple(item.get(c) for c in CAMPOS_META)
+
+
+class IndiceAudios:
+    """Colunas (epoch, nome, bytes, subpath, metadados) em ordem crescente de horário.
+
+    `metas` guarda (duracao, bitrate, taxa, canais) de cada arquivo, ou None
+    se ainda não foram lidos.
+
+    Imutável: inserções e remoções devolvem um novo índice, o que permite
+    trocar o cache de uma rádio atomicamente enquanto requisições o leem.
+    Iterar devolve os itens como dicionários, do mais recente ao mais antigo
+    (mesmo formato das listas antigas do cache).
+    """
+
+    __slots__ = ("epochs", "nomes", "tamanhos", "subpaths", "metas")
+
+    def __init__(self, itens=()):
+        ordenados = sorted(itens, key=chave_ordenacao)
+        self.epochs = array("q", (it["epoch"] for it in ordenados))
+        self.nomes = [it["nome"] for it in ordenados]
+        self.tamanhos = array("q", (it["bytes"] for it in ordenados))
+        self.subpaths = [it["subpath"] for it in ordenados]
+        self.metas = [meta_do_item(it) for it in ordenados]
+
+    @classmethod
+    def de_colunas(cls, epochs, nomes, tamanhos, subpaths, metas=None):
+        """Monta o índice a partir de colunas já em ordem crescente."""
+        indice = cls.__new__(cls)
+        indice.epochs = array("q", epochs)
+        indice.nomes = list(nomes)
+        indice.tamanhos = array("q", tamanhos)
+        indice.subpaths = list(subpaths)
+        indice.metas = list(metas) if metas is not None else [None] * len(indice.epochs)
+        return indice
+
+    # ------------------------------------------------------------------
+    # Acesso
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return len(self.epochs)
+
+    def __iter__(self):
+        for i in range(len(self.epochs) - 1, -1, -1):
+            yield self.item(i)
+
+    def item(self, i):
+        tamanho = self.tamanhos[i]
+        item = {
+            "nome": self.nomes[i],
+            "datahora": epoch_para_datahora(self.epochs[i]),
+            "tamanho": round(tamanho / 1024, 2),
+            "subpath": self.subpaths[i],
+            "epoch": self.epochs[i],
+            "bytes": tamanho,
+        }
+        if self.metas[i] is not None:
+            item.update(zip(CAMPOS_META, self.metas[i]))
+        return item
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def faixa(self, ini=None, fim=None):
+        """Posições [lo, hi) dos itens com ini <= epoch <= fim."""
+        lo = 0 if ini is None else bisect_left(self.epochs, ini)
+        hi = len(self.epochs) if fim is None else bisect_right(self.epochs, fim)
+        return lo, max(lo, hi)
+
+    def faixas_por_horario(self, seg_ini, seg_fim, dia=None, dia_fim=None):
+        """Faixas de cada dia (só de `dia`, ou de `dia` a `dia_fim`) entre os segundos do dia dados."""
+        if not self.epochs:
+            return []
+        primeiro, ultimo = self.epochs[0] // SEGUNDOS_DIA, self.epochs[-1] // SEGUNDOS_DIA
+        if dia is not None and dia_fim is None:
+            dias = [dia]
+        else:
+            de = primeiro if dia is None else max(dia, primeiro)
+            ate = ultimo if dia_fim is None else min(dia_fim, ultimo)
+            dias = range(de, ate + 1)
+
+        faixas = []
+        for d in dias:
+            base = d * SEGUNDOS_DIA
+            lo, hi = self.faixa(base + seg_ini, base + seg_fim)
+            if hi > lo:
+                faixas.append((lo, hi))
+        return faixas
+
+    def pagina(self, faixas, inicio, quantidade):
+        """Itens `inicio..inicio+quantidade` das faixas, mais recentes primeiro."""
+        itens = []
+        for lo, hi in reversed(faixas):
+            tam = hi - lo
+            if inicio >= tam:
+                inicio -= tam
+                continue
+            i = hi - 1 - inicio
+            while i >= lo and len(itens) < quantidade:
+                itens.append(self.item(i))
+                i -= 1
+            inicio = 0
+            if len(itens) >= quantidade:
+                break
+        return itens
+
+    def posicoes_desc(self, faixas, ate=None):
+        """Posições das faixas em ordem decrescente, abaixo de `ate` (gerador preguiçoso)."""
+        for lo, hi in reversed(faixas):
+            i = (hi if ate is None else min(hi, ate)) - 1
+            while i >= lo:
+                yield i
+                i -= 1
+
+    def posicao_chave(self, epoch, nome):
+        """Primeira posição cuja chave (epoch, nome) é >= a chave dada."""
+        lo, hi = self.faixa(epoch, epoch)
+        while lo < hi and self.nomes[lo] < nome:
+            lo += 1
+        return lo
+
+    def pagina_cursor(self, faixas, quantidade, antes=None, depois=None):
+        """Página por chave (keyset), mais recentes primeiro.
+
+        `antes`/`depois` são chaves (epoch, nome) exclusivas: a página traz os
+        itens imediatamente mais antigos que `antes` (ou os mais recentes de
+        todos) ou imediatamente mais novos que `depois`. O custo é
+        O(quantidade + faixas) e a página não muda quando chegam arquivos
+        fora dela. Retorna (itens, ha_mais_antigos, ha_mais_recentes).
+        """
+        posicoes = []
+        if depois is not None:
+            p = self.posicao_chave(*depois)
+            if p < len(self.epochs) and (self.epochs[p], self.nomes[p]) == tuple(depois):
+                p += 1
+            for lo, hi in faixas:
+                i = max(lo, p)
+                while i < hi and len(posicoes) < quantidade:
+                    posicoes.append(i)
+                    i += 1
+            posicoes.reverse()
+        else:
+            p = len(self.epochs) if antes is None else self.posicao_chave(*antes)
+            for lo, hi in reversed(faixas):
+                i = min(hi, p) - 1
+                while i >= lo and len(posicoes) < quantidade:
+                    posicoes.append(i)
+                    i -= 1
+
+        if not posicoes:
+            return [], False, False
+        mais_antigos = any(lo < min(hi, posicoes[-1]) for lo, hi in faixas)
+        mais_recentes = any(max(lo, posicoes[0] + 1) < hi for lo, hi in faixas)
+        return [self.item(i) for i in posicoes], mais_antigos, mais_recentes
+
+    # ------------------------------------------------------------------
+    # Alterações (copy-on-write)
+    # ------------------------------------------------------------------
+    def posicao(self, subpath):
+        try:
+            return self.subpaths.index(subpath)
+        except ValueError:
+            return None
+
+    def sem_subpath(self, subpath):
+        """Novo índice sem o arquivo (ou o próprio, se ele não existir)."""
+        i = self.posicao(subpath)
+        if i is None:
+            return self
+        novo = self.de_colunas(self.epochs, self.nomes, self.tamanhos, self.subpaths, self.metas)
+        del novo.epochs[i], novo.nomes[i], novo.tamanhos[i], novo.subpaths[i], novo.metas[i]
+        return novo
+
+    def com_item(self, item):
+        """Novo índice com o arquivo inserido (ou atualizado) na posição certa."""
+        novo = self.sem_subpath(item["subpath"])
+        if novo is self:
+            novo = self.de_colunas(self.epochs, self.nomes, self.tamanhos, self.subpaths, self.metas)
+
+        chave = chave_ordenacao(item)
+        lo, hi = novo.faixa(item["epoch"], item["epoch"])
+        i = lo + sum(1 for j in range(lo, hi) if novo.nomes[j] <= chave[1])
+        novo.epochs.insert(i, item["epoch"])
+        novo.nomes.insert(i, item["nome"])
+        novo.tamanhos.insert(i, item["bytes"])
+        novo.subpaths.insert(i, item["subpath"])
+        novo.metas.insert(i, meta_do_item(item))
+        return novo
+
+
+# ----------------------------------------------------------------------
+# 🔀 CONSULTA EM VÁRIAS RÁDIOS
+# ----------------------------------------------------------------------
+def mesclar_radios(fontes, quantidade, antes=None):
+    """Página única de várias rádios, mais recentes primeiro.
+
+    `fontes` = [(radio_key, indice, faixas)]. Cada rádio vira um fluxo
+    decrescente de (epoch, nome, radio) e os fluxos são intercalados por
+    `heapq.merge`: só os itens da página (mais um, para saber se há
+    continuação) são lidos — nenhuma lista completa é montada. `antes` é a
+    chave (epoch, nome, radio) exclusiva do fim da página anterior.
+
+    Retorna (itens com a chave "radio", chave do último item ou None se acabou).
+    """
+    def fluxo(radio_key, indice, faixas):
+        ate = None
+        if antes is not None:
+            epoch, nome, radio_antes = antes
+            ate = indice.posicao_chave(epoch, nome)
+            # Mesmo (epoch, nome) em rádio "menor" ainda vem depois do cursor
+            if (radio_key < radio_antes and ate < len(indice)
+                    and indice.epochs[ate] == epoch and indice.nomes[ate] == nome):
+                ate += 1
+        for i in indice.posicoes_desc(faixas, ate):
+            yield (indice.epochs[i], indice.nomes[i], radio_key), indice, i
+
+    mescla = heapq.merge(*(fluxo(*f) for f in fontes), key=lambda x: x[0], reverse=True)
+    lidos = list(islice(mescla, quantidade + 1))
+    itens = []
+    for chave, indice, i in lidos[:quantidade]:
+        item = indice.item(i)
+        item["radio"] = chave[2]
+        itens.append(item)
+    proxima = lidos[quantidade - 1][0] if len(lidos) > quantidade else None
+    return itens, proxima
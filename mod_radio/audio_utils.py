@@ -1,16 +1,63 @@
 from pathlib import Path
 from mod_config.models import get_media_drive_dir
 import os
-import re
-from datetime import datetime
+import time
+import posixpath
+import threading
+import calendar
+from datetime import datetime, timedelta
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+from mod_radio import metricas
+
+# Pastas alteradas há menos tempo que isso são sempre relistadas: o arquivo
+# que está sendo gravado cresce sem alterar o mtime da pasta.
+JANELA_PASTA_RECENTE = 15 * 60  # segundos
+
+# Gravações que começaram há mais que isso já foram fechadas: ao relistar a
+# pasta, o tamanho conhecido é reaproveitado sem um novo stat.
+JANELA_ARQUIVO_ABERTO = 6 * 3600  # segundos
+
+
+FORMATO_DATAHORA = "%d/%m/%Y %H:%M:%S"
+_EPOCH_ZERO = datetime(1970, 1, 1)
 
 
 # -------------------------------------------------------------------------
-# 🔍 FUNÇÃO PRINCIPAL: LISTAR ÁUDIOS
+# 🕒 CONVERSÃO DE DATA/HORA
 # -------------------------------------------------------------------------
-def listar_audios(radio_cfg, data=None, hora_ini=None, hora_fim=None):
+# Os horários das gravações são de parede (sem fuso). O "epoch" usado no
+# índice trata esse horário como UTC, o que evita ambiguidades de horário de
+# verão e faz com que `epoch // 86400` seja o dia da gravação.
+def datetime_para_epoch(dt):
+    return calendar.timegm(dt.timetuple())
+
+
+def epoch_para_datetime(epoch):
+    return _EPOCH_ZERO + timedelta(seconds=int(epoch))
+
+
+def datahora_para_epoch(datahora):
+    """Converte "dd/mm/YYYY HH:MM:SS" em epoch de parede."""
+    return datetime_para_epoch(datetime.strptime(datahora, FORMATO_DATAHORA))
+
+
+def epoch_para_datahora(epoch):
+    return epoch_para_datetime(epoch).strftime(FORMATO_DATAHORA)
+
+
+def chave_ordenacao(item):
+    """Ordem cronológica dos itens do cache (desempate pelo nome)."""
+    return item["epoch"], item["nome"]
+
+
+# -------------------------------------------------------------------------
+# 🧩 AUXILIARES DE VARREDURA
+# -------------------------------------------------------------------------
+def _resolver_pasta_base(radio_cfg):
+    """Resolve a pasta base da rádio (inclusive caminhos simbólicos do Drive)."""
     pasta_base = radio_cfg.get("pasta_base")
-    extensao = radio_cfg.get("extensao", ".mp3").lower()
 
     # 🔧 Correção automática de caminho simbólico (ex: "[Google Drive] Radio Clube")
     if pasta_base and not os.path.isabs(pasta_base):
@@ -18,42 +65,227 @@ def listar_audios(radio_cfg, data=None, hora_ini=None, hora_fim=None):
 
     if not pasta_base or not os.path.isdir(pasta_base):
         print(f"⚠️ [LISTAR] Pasta base inválida: {pasta_base}")
-        return []
+        return None
+    return pasta_base
 
-    audios = []
 
-    for root, dirs, files in os.walk(pasta_base):
-        for nome_arquivo in files:
-            if not nome_arquivo.lower().endswith((".mp3", ".wav")):
-                continue
+def montar_item(caminho, nome_arquivo, base_drive, entry=None, parser=None, tamanho=None):
+    """Monta o registro de cache de um arquivo de áudio.
+
+    O horário vem do caminho, pelo `parser` da rádio; o stat só é feito para
+    obter o tamanho (se `tamanho` não for informado) ou quando o nome não
+    segue o padrão e o mtime é o único horário disponível. Com `entry`
+    (os.DirEntry da varredura), reaproveita o stat já obtido.
+    """
+    subpath = Path(os.path.relpath(caminho, base_drive)).as_posix()
+    epoch = parser(subpath) if parser is not None else None
+
+    st = None
+    if tamanho is None or epoch is None:
+        st = entry.stat() if entry is not None else os.stat(caminho)
+        if tamanho is None:
+            tamanho = st.st_size
+    if epoch is None:
+        epoch = datetime_para_epoch(datetime.fromtimestamp(st.st_mtime))
+
+    return {
+        "nome": nome_arquivo,
+        "datahora": epoch_para_datahora(epoch),
+        "tamanho": round(tamanho / 1024, 2),
+        "subpath": subpath,
+        "epoch": epoch,
+        "bytes": tamanho,
+    }
+
+
+def _listar_pasta(pasta, base_drive, parser=None, conhecidos=None):
+    """Lista uma única pasta: retorna (áudios, nomes das subpastas).
+
+    `conhecidos` ({nome: bytes}) traz o tamanho de gravações já fechadas.
+    """
+    conhecidos = conhecidos or {}
+    audios, subpastas = [], []
+    with os.scandir(pasta) as it:
+        for entry in it:
+            if entry.is_dir():
+                subpastas.append(entry.name)
+            elif entry.name.lower().endswith((".mp3", ".wav")):
+                audios.append(montar_item(entry.path, entry.name, base_drive, entry,
+                                          parser, conhecidos.get(entry.name)))
+    return audios, sorted(subpastas)
+
+
+# -------------------------------------------------------------------------
+# ⚙️ MOTOR DE VARREDURA (pool de threads + limite por montagem)
+# -------------------------------------------------------------------------
+def _ler_limites(texto):
+    """Lê "/mnt/clube_fm=2,/mnt/massa_fm=2" em {ponto_de_montagem: limite}."""
+    limites = {}
+    for parte in texto.split(","):
+        if "=" in parte:
+            ponto, limite = parte.rsplit("=", 1)
+            limites[os.path.realpath(ponto.strip())] = int(limite)
+    return limites
+
+
+SCAN_MAX_WORKERS = int(os.getenv("SCAN_MAX_WORKERS", "8"))
+SCAN_LIMITE_MONTAGEM = int(os.getenv("SCAN_LIMITE_MONTAGEM", "4"))
+SCAN_LIMITES = _ler_limites(os.getenv("SCAN_LIMITES", ""))
+
+_POOL = None
+_SEMAFOROS = {}
+_LOCK_MOTOR = threading.Lock()
 
-            caminho = os.path.join(root, nome_arquivo)
 
+def _pool():
+    global _POOL
+    with _LOCK_MOTOR:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS, thread_name_prefix="varredura")
+        return _POOL
+
+
+@lru_cache(maxsize=1)
+def numpy_opcional():
+    """numpy, importado só no primeiro cálculo vetorizado (None se não instalado)."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@lru_cache(maxsize=None)
+def ponto_de_montagem(caminho):
+    """Ponto de montagem que contém `caminho` (ex.: /mnt/clube_fm)."""
+    atual = os.path.realpath(caminho)
+    while not os.path.ismount(atual):
+        pai = os.path.dirname(atual)
+        if pai == atual:
+            break
+        atual = pai
+    return atual
+
+
+def _semaforo(pasta):
+    """Semáforo compartilhado por todas as varreduras da mesma montagem."""
+    ponto = ponto_de_montagem(str(pasta))
+    with _LOCK_MOTOR:
+        sem = _SEMAFOROS.get(ponto)
+        if sem is None:
+            sem = _SEMAFOROS[ponto] = threading.BoundedSemaphore(
+                SCAN_LIMITES.get(ponto, SCAN_LIMITE_MONTAGEM)
+            )
+        return sem
+
+
+def _processar_pasta(pasta, anterior, semaforo, base_drive, agora, parser=None, conhecidos=None):
+    """Confere o mtime da pasta e a relista se mudou (None = reaproveitar)."""
+    with semaforo:
+        mtime = os.stat(pasta).st_mtime
+        if anterior and anterior.get("mtime") == mtime and agora - mtime > JANELA_PASTA_RECENTE:
+            return mtime, None, anterior.get("subpastas", [])
+        arquivos, subpastas = _listar_pasta(pasta, base_drive, parser, conhecidos)
+        return mtime, arquivos, subpastas
+
+
+# -------------------------------------------------------------------------
+# 🔍 FUNÇÃO PRINCIPAL: LISTAR ÁUDIOS
+# -------------------------------------------------------------------------
+def listar_audios(radio_cfg, data=None, hora_ini=None, hora_fim=None):
+    audios, _pastas, _estat = listar_audios_incremental(radio_cfg)
+    return audios
+
+
+# -------------------------------------------------------------------------
+# ♻️ VARREDURA INCREMENTAL (por mtime de pasta)
+# -------------------------------------------------------------------------
+def listar_audios_incremental(radio_cfg, pastas_anteriores=None, itens_anteriores=None):
+    """Relista apenas as pastas cujo mtime mudou desde a última varredura.
+
+    `pastas_anteriores` é o estado devolvido pela chamada anterior
+    ({subpasta: {"mtime", "subpastas"}}, com chaves relativas a media_drive,
+    como o `subpath` dos itens). Pastas inalteradas reaproveitam os itens de
+    `itens_anteriores` sem listar o conteúdo. Sem estado anterior, a
+    varredura é completa.
+
+    As pastas de um mesmo nível são processadas em paralelo no pool de
+    varredura, respeitando o limite de concorrência da montagem. O horário
+    de cada arquivo vem do parser escolhido por `radio_cfg["parse_nome"]`.
+
+    Retorna (audios, pastas, estatisticas).
+    """
+    from mod_radio.parsers_nome import obter_parser
+
+    inicio = time.perf_counter()
+    pasta_base = _resolver_pasta_base(radio_cfg)
+    if not pasta_base:
+        return [], {}, {"duracao": 0.0, "pastas": 0, "relistadas": 0, "arquivos": 0}
+
+    base_drive = get_media_drive_dir()
+    pastas_anteriores = pastas_anteriores or {}
+    semaforo = _semaforo(pasta_base)
+    pool = _pool()
+    parser = obter_parser(radio_cfg.get("parse_nome"))
+
+    # Itens já conhecidos, agrupados pela pasta de origem
+    por_pasta = {}
+    for it in itens_anteriores or []:
+        if it.get("subpath"):
+            por_pasta.setdefault(posixpath.dirname(it["subpath"]), []).append(it)
+
+    agora = time.time()
+    # Numa varredura incremental, gravações fechadas não precisam de novo stat
+    fechadas_ate = datetime_para_epoch(datetime.now()) - JANELA_ARQUIVO_ABERTO
+    conhecidos = {}
+    if pastas_anteriores:
+        for chave, itens in por_pasta.items():
+            conhecidos[chave] = {it["nome"]: it["bytes"] for it in itens if it["epoch"] < fechadas_ate}
+
+    audios, pastas = [], {}
+    relistadas = 0
+    nivel = [str(pasta_base)]
+
+    while nivel:
+        chaves = [Path(os.path.relpath(p, base_drive)).as_posix() for p in nivel]
+        futuros = [
+            pool.submit(_processar_pasta, p, pastas_anteriores.get(c), semaforo, base_drive, agora,
+                        parser, conhecidos.get(c))
+            for p, c in zip(nivel, chaves)
+        ]
+
+        proximo = []
+        for atual, chave, futuro in zip(nivel, chaves, futuros):
             try:
-                nome_limpo = os.path.splitext(nome_arquivo)[0]
-                m = re.search(r"(\d{14})", nome_limpo)
-                if m:
-                    datahora = datetime.strptime(m.group(1), "%Y%m%d%H%M%S")
-                else:
-                    stat = os.stat(caminho)
-                    datahora = datetime.fromtimestamp(stat.st_mtime)
-            except Exception:
-                stat = os.stat(caminho)
-                datahora = datetime.fromtimestamp(stat.st_mtime)
-
-            base_drive = get_media_drive_dir()
-            subpath = Path(os.path.relpath(caminho, base_drive)).as_posix()
-            tamanho_kb = round(os.path.getsize(caminho) / 1024, 2)
-
-            audios.append({
-                "nome": nome_arquivo,
-                "datahora": datahora.strftime("%d/%m/%Y %H:%M:%S"),
-                "tamanho": tamanho_kb,
-                "subpath": subpath
-            })
-
-    print(f"✅ [CACHE] {len(audios)} arquivos encontrados em {pasta_base}")
-    return sorted(audios, key=lambda x: x["datahora"], reverse=True)
+                mtime, arquivos, subpastas = futuro.result()
+            except OSError as e:
+                print(f"⚠️ [LISTAR] Falha ao listar {atual}: {e}")
+                continue
+
+            if arquivos is None:
+                audios.extend(por_pasta.get(chave, []))
+            else:
+                audios.extend(arquivos)
+                relistadas += 1
+
+            pastas[chave] = {"mtime": mtime, "subpastas": subpastas}
+            proximo.extend(os.path.join(atual, s) for s in subpastas)
+        nivel = proximo
+
+    estatisticas = {
+        "duracao": round(time.perf_counter() - inicio, 3),
+        "pastas": len(pastas),
+        "relistadas": relistadas,
+        "arquivos": len(audios),
+    }
+    radio = radio_cfg.get("chave") or radio_cfg.get("nome") or str(pasta_base)
+    metricas.VARREDURA_SEGUNDOS.observar(estatisticas["duracao"], radio=radio)
+    metricas.VARREDURA_ARQUIVOS.inc(len(audios), radio=radio)
+    metricas.VARREDURA_PASTAS.inc(relistadas, radio=radio, situacao="relistada")
+    metricas.VARREDURA_PASTAS.inc(len(pastas) - relistadas, radio=radio, situacao="reaproveitada")
+    print(f"✅ [CACHE] {len(audios)} arquivos em {pasta_base} "
+          f"({relistadas}/{len(pastas)} pastas relistadas, {estatisticas['duracao']}s)")
+    return sorted(audios, key=chave_ordenacao, reverse=True), pastas, estatisticas
 
 
 # -------------------------------------------------------------------------
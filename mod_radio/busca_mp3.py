@@ -0,0 +1,127 @@
+# mod_radio/busca_mp3.py
+"""Tabela de busca dos MP3: tempo → offset em bytes sem varrer o arquivo.
+
+Construída uma vez por versão do arquivo (tamanho, mtime) percorrendo só os
+cabeçalhos dos quadros. Guarda o offset de um quadro a cada segundo
+(deltas comprimidos em `tb_mp3_busca`, no banco do índice) mais a contagem
+de quadros e o fim do áudio; o quadro exato é achado a partir do ponto
+anterior, lendo no máximo um segundo do arquivo. Recorte, busca por horário,
+linha contínua e duração usam a tabela em vez de reescanear o MP3.
+"""
+import os
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+from mod_config.models import get_media_drive_dir
+from mod_radio import audio_db
+from mod_radio.recorte import ler_quadro_mp3, percorrer_quadros, quadros_mp3
+
+GRANULARIDADE_SEG = 1.0  # um ponto da tabela por segundo de áudio
+ARQUIVO_ESTAVEL_SEG = 60  # arquivos ainda gravando não vão para o banco
+MAX_TABELAS_MEMORIA = 512
+
+_LOCK = threading.Lock()
+_MEMORIA = OrderedDict()  # (caminho, tamanho, mtime_ns) -> TabelaMp3 (LRU)
+
+
+class TabelaMp3:
+    """Pontos de busca de um MP3: offset do quadro `k * passo` para cada k."""
+
+    __slots__ = ("pontos", "passo", "quadros", "fim", "amostras", "taxa")
+
+    def __init__(self, pontos, passo, quadros, fim, amostras, taxa):
+        self.pontos = pontos
+        self.passo = passo
+        self.quadros = quadros
+        self.fim = fim
+        self.amostras = amostras
+        self.taxa = taxa
+
+    @property
+    def seg_quadro(self):
+        return self.amostras / self.taxa
+
+    @property
+    def duracao(self):
+        return self.quadros * self.seg_quadro
+
+    def offset(self, caminho, quadro):
+        """Offset do início do quadro (ou o fim do áudio, se além do último)."""
+        if quadro >= self.quadros:
+            return self.fim
+        k, resto = divmod(max(0, quadro), self.passo)
+        inicio = self.pontos[k]
+        if not resto:
+            return inicio
+        ate = self.pontos[k + 1] if k + 1 < len(self.pontos) else self.fim
+        with open(caminho, "rb") as f:
+            f.seek(inicio)
+            dados = f.read(ate - inicio)
+        assinatura = ler_quadro_mp3(dados[0], dados[1], dados[2])[3]
+        for i, (pos, _t, _a, _x) in enumerate(percorrer_quadros(dados, 0, len(dados), assinatura)):
+            if i == resto:
+                return inicio + pos
+        return ate
+
+
+def _construir(caminho):
+    offsets, fim, amostras, taxa = quadros_mp3(caminho)
+    passo = max(1, round(GRANULARIDADE_SEG * taxa / amostras))
+    return TabelaMp3(array("q", offsets[::passo]), passo, len(offsets), fim, amostras, taxa)
+
+
+def _comprimir(pontos):
+    deltas = array("q", (b - a for a, b in zip((0, *pontos), pontos)))
+    return zlib.compress(deltas.tobytes())
+
+
+def _descomprimir(blob):
+    deltas = array("q")
+    deltas.frombytes(zlib.decompress(blob))
+    pontos, pos = array("q"), 0
+    for d in deltas:
+        pos += d
+        pontos.append(pos)
+    return pontos
+
+
+def tabela_mp3(caminho):
+    """Tabela de busca do arquivo: memória → banco → varredura dos quadros."""
+    caminho = str(caminho)
+    st = os.stat(caminho)
+    chave = (caminho, st.st_size, st.st_mtime_ns)
+    with _LOCK:
+        tabela = _MEMORIA.get(chave)
+        if tabela is not None:
+            _MEMORIA.move_to_end(chave)
+            return tabela
+
+    subpath = Path(os.path.relpath(caminho, get_media_drive_dir())).as_posix()
+    try:
+        linha = audio_db.carregar_busca_mp3(subpath)
+    except Exception as e:
+        print(f"⚠️ [BUSCA MP3] Erro ao ler tabela de {subpath}:", e)
+        linha = None
+
+    if linha is not None and (linha["tamanho"], linha["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+        tabela = TabelaMp3(_descomprimir(linha["pontos"]), linha["passo"], linha["quadros"],
+                           linha["fim"], linha["amostras"], linha["taxa"])
+    else:
+        tabela = _construir(caminho)
+        if time.time() - st.st_mtime >= ARQUIVO_ESTAVEL_SEG:
+            try:
+                audio_db.salvar_busca_mp3(subpath, st.st_size, st.st_mtime_ns, tabela.amostras,
+                                          tabela.taxa, tabela.quadros, tabela.fim, tabela.passo,
+                                          _comprimir(tabela.pontos))
+            except Exception as e:
+                print(f"⚠️ [BUSCA MP3] Erro ao gravar tabela de {subpath}:", e)
+
+    with _LOCK:
+        _MEMORIA[chave] = tabela
+        while len(_MEMORIA) > MAX_TABELAS_MEMORIA:
+            _MEMORIA.popitem(last=False)
+    return tabela
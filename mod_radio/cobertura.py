@@ -0,0 +1,155 @@
+# mod_radio/cobertura.py
+"""Cobertura das gravações: trechos no ar sem áudio (lacunas) e sobreposições.
+
+Cada gravação cobre [início, início + duração). A duração vem dos metadados
+do índice; sem ela, vale a cadência esperada dos arquivos (10 min). Com as
+gravações em ordem, o alcance acumulado (máximo dos fins até cada arquivo)
+diz se o próximo começa depois dele (lacuna) ou antes (sobreposição).
+
+O cálculo é vetorizado com numpy quando disponível; sem ele, o mesmo
+algoritmo roda em Python puro. Um mês de arquivos de 10 min (~4,5 mil por
+rádio) leva poucos milissegundos em ambos.
+"""
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import accumulate
+
+from mod_radio.audio_indice import SEGUNDOS_DIA
+from mod_radio.audio_utils import datetime_para_epoch, epoch_para_datetime, numpy_opcional
+
+CADENCIA_SEG = int(os.getenv("COBERTURA_CADENCIA_SEG", "600"))  # duração presumida sem metadados
+TOLERANCIA_SEG = float(os.getenv("COBERTURA_TOLERANCIA_SEG", "5"))  # folgas menores são ignoradas
+MAX_DIAS_COBERTURA = 92
+
+
+# -------------------------------------------------------------------------
+# 🧮 NÚCLEO (vetorizado)
+# -------------------------------------------------------------------------
+def _folgas_numpy(np, inicios, duracoes, tolerancia):
+    ini = np.asarray(inicios, dtype=np.float64)
+    fim = ini + np.asarray(duracoes, dtype=np.float64)
+    alcance = np.maximum.accumulate(fim)
+    folga = ini[1:] - alcance[:-1]
+    i_lac = np.flatnonzero(folga > tolerancia)
+    i_sob = np.flatnonzero(folga < -tolerancia)
+    lacunas = list(zip(alcance[i_lac].tolist(), ini[i_lac + 1].tolist()))
+    sob_fim = np.minimum(alcance[i_sob], fim[i_sob + 1])
+    sobreposicoes = list(zip(ini[i_sob + 1].tolist(), sob_fim.tolist()))
+    return lacunas, sobreposicoes, float(alcance[-1])
+
+
+def _folgas_python(inicios, duracoes, tolerancia):
+    fins = [i + d for i, d in zip(inicios, duracoes)]
+    alcance = list(accumulate(fins, max))
+    lacunas, sobreposicoes = [], []
+    for k in range(len(inicios) - 1):
+        folga = inicios[k + 1] - alcance[k]
+        if folga > tolerancia:
+            lacunas.append((alcance[k], inicios[k + 1]))
+        elif folga < -tolerancia:
+            sobreposicoes.append((inicios[k + 1], min(alcance[k], fins[k + 1])))
+    return lacunas, sobreposicoes, alcance[-1]
+
+
+def folgas(inicios, duracoes, tolerancia=TOLERANCIA_SEG):
+    """(lacunas, sobreposições, alcance final) de gravações em ordem de início.
+
+    Lacunas e sobreposições são pares (início, fim) em epoch.
+    """
+    if not inicios:
+        return [], [], None
+    np = numpy_opcional()  # importado só aqui: a importação das rotas fica leve
+    if np is not None:
+        return _folgas_numpy(np, inicios, duracoes, tolerancia)
+    return _folgas_python(list(inicios), list(duracoes), tolerancia)
+
+
+# -------------------------------------------------------------------------
+# 📅 RELATÓRIO POR DIA
+# -------------------------------------------------------------------------
+def _hora(epoch, fim=False):
+    if fim and epoch % SEGUNDOS_DIA == 0:
+        return "24:00:00"  # fim do dia, não começo do seguinte
+    return epoch_para_datetime(epoch).strftime("%H:%M:%S")
+
+
+def _trecho(ini, fim):
+    return {"inicio": _hora(ini), "fim": _hora(fim, fim=True), "segundos": round(fim - ini, 1)}
+
+
+def lacunas_periodo(indice, t0, t1, cadencia=CADENCIA_SEG, tolerancia=TOLERANCIA_SEG):
+    """(lacunas, sobreposições) do índice em [t0, t1), incluindo as das pontas."""
+    epochs = indice.epochs
+    # A gravação em curso no início do período e as do dia anterior, que
+    # podem ser longas: o resultado de um dia não depende de onde a consulta começa
+    lo = min(max(0, bisect_right(epochs, t0) - 1), bisect_left(epochs, t0 - SEGUNDOS_DIA))
+    hi = bisect_left(epochs, t1)
+    inicios = epochs[lo:hi]
+    duracoes = [m[0] if m and m[0] > 0 else cadencia for m in indice.metas[lo:hi]]
+
+    lacunas, sobreposicoes, alcance = folgas(inicios, duracoes, tolerancia)
+    if alcance is None:
+        return [(t0, t1)], []
+    if inicios[0] > t0 + tolerancia:
+        lacunas.insert(0, (t0, inicios[0]))
+    if alcance < t1 - tolerancia:
+        lacunas.append((alcance, t1))
+    lacunas = [(max(ini, t0), fim) for ini, fim in lacunas if fim > t0]
+    return lacunas, [(ini, fim) for ini, fim in sobreposicoes if ini >= t0]
+
+
+def relatorio(indice, dia_ini, dia_fim, agora=None, cadencia=CADENCIA_SEG, tolerancia=TOLERANCIA_SEG):
+    """Cobertura de cada dia (número de dias desde 1970) de `dia_ini` a `dia_fim`.
+
+    O período termina em `agora` (epoch; padrão: relógio atual); dias
+    futuros não entram. Levanta ValueError se o período for inválido.
+    """
+    if dia_fim < dia_ini:
+        raise ValueError("O fim do período deve ser depois do início.")
+    if dia_fim - dia_ini + 1 > MAX_DIAS_COBERTURA:
+        raise ValueError(f"Período maior que {MAX_DIAS_COBERTURA} dias.")
+    if agora is None:
+        agora = datetime_para_epoch(datetime.now())
+    t0 = dia_ini * SEGUNDOS_DIA
+    t1 = min((dia_fim + 1) * SEGUNDOS_DIA, agora)
+    if t1 <= t0:
+        return []
+
+    epochs = indice.epochs
+    lacunas, sobreposicoes = lacunas_periodo(indice, t0, t1, cadencia, tolerancia)
+
+    dias = {}
+    for d in range(dia_ini, t1 // SEGUNDOS_DIA + (1 if t1 % SEGUNDOS_DIA else 0)):
+        base = d * SEGUNDOS_DIA
+        esperado = min(base + SEGUNDOS_DIA, t1) - base
+        a, b = bisect_left(epochs, base), bisect_left(epochs, base + SEGUNDOS_DIA)
+        dias[d] = {
+            "data": epoch_para_datetime(base).strftime("%Y-%m-%d"),
+            "arquivos": b - a,
+            "esperado_seg": esperado,
+            "sem_audio_seg": 0.0,
+            "lacunas": [],
+            "sobreposicoes": [],
+        }
+
+    # Lacunas que atravessam a meia-noite são divididas entre os dias
+    for ini, fim in lacunas:
+        ini, fim = max(ini, t0), min(fim, t1)
+        while ini < fim:
+            d = int(ini // SEGUNDOS_DIA)
+            corte = min(fim, (d + 1) * SEGUNDOS_DIA)
+            dias[d]["lacunas"].append(_trecho(ini, corte))
+            dias[d]["sem_audio_seg"] += corte - ini
+            ini = corte
+    for ini, fim in sobreposicoes:
+        d = int(ini // SEGUNDOS_DIA)
+        if d in dias:
+            dias[d]["sobreposicoes"].append(_trecho(ini, fim))
+
+    for dia in dias.values():
+        coberto = dia["esperado_seg"] - dia["sem_audio_seg"]
+        dia["coberto_seg"] = round(coberto, 1)
+        dia["sem_audio_seg"] = round(dia["sem_audio_seg"], 1)
+        dia["cobertura"] = round(100 * coberto / dia["esperado_seg"], 2)
+    return list(dias.values())
@@ -0,0 +1,156 @@
+# mod_radio/continuo.py
+"""Linha do tempo contínua: várias gravações seguidas como um único áudio.
+
+Os arquivos que cobrem o intervalo pedido saem do índice da rádio; de cada um
+só entra o trecho dentro do intervalo (quadros MP3 inteiros ou a fatia de
+amostras do WAV), cortado no início da gravação seguinte. O recurso é
+virtual: uma lista de trechos com seus deslocamentos acumulados, lida sob
+demanda — nada é juntado em disco e o Range funciona sobre o todo.
+
+`localizar` faz o caminho inverso para um único instante: horário de
+transmissão → gravação, offset em bytes e segundos dentro do arquivo.
+"""
+import hashlib
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+from mod_config.models import get_media_drive_dir
+from mod_radio.recorte import cabecalho_wav, montar_cabecalho_wav, posicao_no_tempo, trecho_mp3, trecho_wav
+from mod_radio.streaming import ler_trecho
+
+MAX_INTERVALO_CONTINUO = 24 * 3600  # segundos por requisição
+
+
+class LinhaContinua:
+    """Trechos (caminho, inicio, fim) em sequência, com um cabeçalho opcional na frente."""
+
+    __slots__ = ("cabecalho", "partes", "deslocamentos", "tamanho", "duracao",
+                 "extensao", "etag", "modificado")
+
+    def __init__(self, cabecalho, partes, duracao, extensao, identidades, mtime):
+        self.cabecalho = cabecalho
+        self.partes = partes
+        self.duracao = duracao
+        self.extensao = extensao
+        # deslocamentos[i] = posição virtual onde começa a parte i
+        self.deslocamentos = []
+        pos = len(cabecalho)
+        for _caminho, ini, fim in partes:
+            self.deslocamentos.append(pos)
+            pos += fim - ini
+        self.tamanho = pos
+        self.etag = hashlib.sha1(repr(identidades).encode("utf-8")).hexdigest()[:32]
+        self.modificado = datetime.fromtimestamp(int(mtime), timezone.utc)
+
+    def ler(self, inicio, fim):
+        """Bytes [inicio, fim) do recurso virtual, atravessando os arquivos."""
+        if inicio < len(self.cabecalho):
+            yield self.cabecalho[inicio:min(fim, len(self.cabecalho))]
+            inicio = len(self.cabecalho)
+        i = max(0, bisect_right(self.deslocamentos, inicio) - 1)
+        while inicio < fim and i < len(self.partes):
+            caminho, p_ini, p_fim = self.partes[i]
+            base = self.deslocamentos[i]
+            de = p_ini + (inicio - base)
+            ate = min(p_fim, p_ini + (fim - base))
+            if de < ate:
+                with open(caminho, "rb", buffering=0) as f:
+                    yield from ler_trecho(f, de, ate)
+            inicio = base + (p_fim - p_ini)
+            i += 1
+
+
+def montar_linha(indice, ini_epoch, fim_epoch):
+    """LinhaContinua do intervalo [ini_epoch, fim_epoch) a partir do índice da rádio.
+
+    Retorna None se não houver gravação; levanta ValueError se o intervalo for inválido.
+    """
+    if fim_epoch <= ini_epoch:
+        raise ValueError("O fim do intervalo deve ser depois do início.")
+    if fim_epoch - ini_epoch > MAX_INTERVALO_CONTINUO:
+        raise ValueError(f"Intervalo maior que {MAX_INTERVALO_CONTINUO // 3600} h.")
+
+    epochs = indice.epochs
+    lo = max(0, bisect_right(epochs, ini_epoch) - 1)  # a gravação em curso no início
+    hi = bisect_left(epochs, fim_epoch)
+    base_drive = get_media_drive_dir()
+
+    partes, identidades = [], []
+    duracao, extensao, fmt, mtime = 0.0, None, None, 0
+    for i in range(lo, hi):
+        subpath = indice.subpaths[i]
+        ext = os.path.splitext(subpath)[1].lower()
+        if extensao is None:
+            extensao = ext
+        if ext != extensao:
+            continue
+        caminho = os.path.join(base_drive, *subpath.split("/"))
+        # Corta no início da próxima gravação (evita repetir trechos sobrepostos)
+        limite = min(fim_epoch, epochs[i + 1]) if i + 1 < len(epochs) else fim_epoch
+        seg_ini = max(0, ini_epoch - epochs[i])
+        seg_fim = limite - epochs[i]
+        if seg_fim <= seg_ini:
+            continue
+        try:
+            st = os.stat(caminho)
+            if ext == ".mp3":
+                p_ini, p_fim, dur = trecho_mp3(caminho, seg_ini, seg_fim)
+            elif ext == ".wav":
+                fmt_arquivo = cabecalho_wav(caminho)[0]
+                if fmt is None:
+                    fmt = fmt_arquivo
+                elif fmt_arquivo != fmt:
+                    print(f"⚠️ [CONTÍNUO] {subpath} com formato diferente; ignorado.")
+                    continue
+                _cab, p_ini, tamanho, dur = trecho_wav(caminho, seg_ini, seg_fim)
+                p_fim = p_ini + tamanho
+            else:
+                continue
+        except (OSError, ValueError):
+            continue  # arquivo sumiu ou termina antes do intervalo (lacuna)
+        if p_fim <= p_ini:
+            continue
+        partes.append((caminho, p_ini, p_fim))
+        identidades.append((subpath, st.st_size, st.st_mtime_ns, p_ini, p_fim))
+        duracao += dur
+        mtime = max(mtime, st.st_mtime)
+
+    if not partes:
+        return None
+    cabecalho = b""
+    if extensao == ".wav":
+        cabecalho = montar_cabecalho_wav(fmt, sum(fim - ini for _c, ini, fim in partes))
+    return LinhaContinua(cabecalho, partes, duracao, extensao, identidades, mtime)
+
+
+def localizar(indice, epoch):
+    """Gravação que contém o instante `epoch`, com o offset em bytes e os segundos.
+
+    Se o instante cair numa lacuna, devolve o começo da gravação seguinte
+    (`exato` = False). Retorna None se não houver gravação a partir dele.
+    """
+    epochs = indice.epochs
+    i = bisect_right(epochs, epoch) - 1
+    segundos = epoch - epochs[i] if i >= 0 else 0
+    exato = i >= 0
+    i = max(i, 0)
+    while i < len(epochs):
+        caminho = os.path.join(get_media_drive_dir(), *indice.subpaths[i].split("/"))
+        try:
+            byte, exatos, duracao = posicao_no_tempo(caminho, segundos)
+        except (OSError, ValueError):
+            duracao = 0
+        if segundos < duracao:
+            item = indice.item(i)
+            return {
+                "subpath": item["subpath"],
+                "nome": item["nome"],
+                "datahora": item["datahora"],
+                "segundos": round(exatos, 3),
+                "byte": byte,
+                "duracao": round(duracao, 3),
+                "exato": exato,
+            }
+        i, segundos, exato = i + 1, 0, False  # lacuna: começo da gravação seguinte
+    return None
@@ -0,0 +1,129 @@
+# mod_radio/eventos.py
+"""Eventos do índice para as páginas abertas (Server-Sent Events).
+
+Cada troca do índice de uma rádio publica um evento `audio` por gravação
+nova e um `cache` com o resumo da mudança. Os eventos ficam num buffer
+circular por rádio, com ids crescentes: quem reconecta com
+`Last-Event-ID` recebe o que perdeu; se o id for de outro processo ou já
+tiver saído do buffer, recebe `recarregar` e busca a lista inteira.
+
+Os assinantes esperam numa única Condition por rádio — uma conexão
+ociosa não consome CPU além do comentário de keep-alive periódico, mas
+ocupa uma thread (ou greenlet) do servidor enquanto está aberta. Com
+muitas páginas abertas, use um worker assíncrono (`gunicorn -k gevent
+wsgi:app`) ou um worker com threads suficientes (`--threads`). Cada fluxo
+termina depois de MAX_DURACAO_FLUXO_SEG; o navegador reconecta sozinho
+(`retry:`) com o último id e recebe o que perdeu, e as threads presas em
+conexões mortas são liberadas.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+MAX_EVENTOS_RADIO = 500
+MAX_NOVOS_POR_TROCA = 200  # acima disso (ex.: primeira varredura) vai `recarregar`
+KEEPALIVE_SEG = 15
+RECONEXAO_MS = 5000
+MAX_DURACAO_FLUXO_SEG = int(os.getenv("EVENTOS_DURACAO_MAX_SEG", "300"))
+
+INSTANCIA_EVENTOS = uuid.uuid4().hex[:8]
+
+_LOCK = threading.Lock()
+_CONDICOES = {}  # radio_key -> Condition
+_EVENTOS = {}  # radio_key -> deque[(n, tipo, json)]
+_CONTADOR = {}  # radio_key -> último n publicado
+
+
+def _condicao(radio_key):
+    with _LOCK:
+        cond = _CONDICOES.get(radio_key)
+        if cond is None:
+            cond = _CONDICOES[radio_key] = threading.Condition()
+            _EVENTOS[radio_key] = deque(maxlen=MAX_EVENTOS_RADIO)
+            _CONTADOR[radio_key] = 0
+        return cond
+
+
+def publicar(radio_key, tipo, dados):
+    """Acrescenta um evento ao buffer da rádio e acorda os assinantes."""
+    cond = _condicao(radio_key)
+    with cond:
+        _CONTADOR[radio_key] += 1
+        _EVENTOS[radio_key].append((_CONTADOR[radio_key], tipo, json.dumps(dados, ensure_ascii=False)))
+        cond.notify_all()
+
+
+def publicar_troca(radio_key, anterior, novo, versao):
+    """Eventos de uma troca de índice: gravações novas e o resumo da mudança."""
+    if anterior is None:
+        novos, removidos = [], 0
+    else:
+        antes = set(anterior.subpaths)
+        depois = set(novo.subpaths)
+        novos = [i for i, s in enumerate(novo.subpaths) if s not in antes]
+        removidos = len(antes - depois)
+    if len(novos) <= MAX_NOVOS_POR_TROCA:
+        for i in novos:
+            publicar(radio_key, "audio", novo.item(i))
+    else:
+        publicar(radio_key, "recarregar", {})
+    publicar(radio_key, "cache", {"versao": versao, "total": len(novo),
+                                  "novos": len(novos), "removidos": removidos})
+
+
+def _ler_id(ultimo_id):
+    """Número do evento se o id for deste processo; None caso contrário."""
+    instancia, _, n = (ultimo_id or "").partition(".")
+    if instancia != INSTANCIA_EVENTOS or not n.isdigit():
+        return None
+    return int(n)
+
+
+def _formatar(n, tipo, dados):
+    return f"id: {INSTANCIA_EVENTOS}.{n}\nevent: {tipo}\ndata: {dados}\n\n"
+
+
+def assinar(radio_key, ultimo_id=None):
+    """Gerador do fluxo SSE da rádio, retomando depois de `ultimo_id` se possível.
+
+    Termina depois de MAX_DURACAO_FLUXO_SEG, enviando antes o id do último
+    evento visto para a reconexão continuar dali.
+    """
+    cond = _condicao(radio_key)
+    encerrar = time.monotonic() + MAX_DURACAO_FLUXO_SEG
+    yield f"retry: {RECONEXAO_MS}\n\n"
+    with cond:
+        buffer = _EVENTOS[radio_key]
+        visto = _CONTADOR[radio_key]
+        n = _ler_id(ultimo_id)
+        pendentes = []
+        if ultimo_id:
+            if n is not None and n <= visto and (n >= buffer[0][0] - 1 if buffer else n == visto):
+                pendentes = [e for e in buffer if e[0] > n]
+            else:
+                # id de outro processo ou já descartado: o cliente relê a lista
+                pendentes = [(visto, "recarregar", "{}")]
+    for evento in pendentes:
+        yield _formatar(*evento)
+
+    while True:
+        restante = encerrar - time.monotonic()
+        if restante <= 0:
+            yield f"id: {INSTANCIA_EVENTOS}.{visto}\n\n"  # só o id: nenhum evento é disparado
+            return
+        with cond:
+            if _CONTADOR[radio_key] == visto:
+                cond.wait(min(KEEPALIVE_SEG, restante))
+            buffer = _EVENTOS[radio_key]
+            if buffer and buffer[0][0] > visto + 1:  # assinante lento: eventos já descartados
+                novos = [(_CONTADOR[radio_key], "recarregar", "{}")]
+            else:
+                novos = [e for e in buffer if e[0] > visto]
+            visto = _CONTADOR[radio_key]
+        if not novos:
+            yield ": keep-alive\n\n"  # detecta conexões fechadas
+        for evento in novos:
+            yield _formatar(*evento)
@@ -0,0 +1,130 @@
+# mod_radio/exportacao.py
+"""Exportação em lote: vários recortes num ZIP enviado enquanto é montado.
+
+O ZIP é "stored" (sem recompressão — MP3 já é comprimido) e escrito num
+destino sem seek: cada recorte vai para a resposta bloco a bloco, com o
+descritor de dados depois do conteúdo. A memória fica limitada a um bloco
+de leitura mais o diretório central; nada é gravado em disco.
+
+Cada recorte só é localizado no arquivo (quadros MP3, cabeçalho WAV) quando
+chega a sua vez; um recorte que falhar nesse momento vira uma entrada
+`.erro.txt` no ZIP em vez de interromper o download.
+
+O andamento de cada exportação fica em memória, consultável pelo id da
+tarefa (gerado aqui) apenas pelo usuário que a iniciou.
+"""
+import threading
+import time
+import uuid
+import zipfile
+
+MAX_RECORTES_LOTE = 500
+TAREFAS_RETENCAO_SEG = 3600
+
+_LOCK = threading.Lock()
+_TAREFAS = {}  # id -> andamento (dict)
+
+
+class _SaidaSemSeek:
+    """Destino de escrita do ZipFile: acumula os bytes até a resposta buscá-los."""
+
+    def __init__(self):
+        self._blocos = []
+
+    def write(self, dados):
+        self._blocos.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def esvaziar(self):
+        blocos, self._blocos = self._blocos, []
+        return blocos
+
+
+# -------------------------------------------------------------------------
+# 📈 ANDAMENTO
+# -------------------------------------------------------------------------
+def nova_tarefa(total, dono):
+    """Registra uma exportação do usuário `dono` e devolve seu id."""
+    tarefa_id = uuid.uuid4().hex
+    agora = time.time()
+    with _LOCK:
+        for antiga, t in list(_TAREFAS.items()):
+            if agora - t["atualizado"] > TAREFAS_RETENCAO_SEG:
+                del _TAREFAS[antiga]
+        _TAREFAS[tarefa_id] = {
+            "total": total, "concluidos": 0, "bytes": 0, "atual": None, "falhas": [],
+            "finalizado": False, "erro": None, "atualizado": agora, "dono": dono,
+        }
+    return tarefa_id
+
+
+def _atualizar(tarefa_id, **campos):
+    with _LOCK:
+        tarefa = _TAREFAS.get(tarefa_id)
+        if tarefa is not None:
+            tarefa.update(campos, atualizado=time.time())
+
+
+def _falhou(tarefa_id, nome, erro):
+    with _LOCK:
+        tarefa = _TAREFAS.get(tarefa_id)
+        if tarefa is not None:
+            tarefa["falhas"] = tarefa["falhas"] + [{"nome": nome, "erro": erro}]
+
+
+def andamento(tarefa_id, dono):
+    """Cópia do andamento da exportação (None se desconhecida, expirada ou de outro usuário)."""
+    with _LOCK:
+        tarefa = _TAREFAS.get(tarefa_id)
+        if tarefa is None or tarefa["dono"] != dono:
+            return None
+        estado = dict(tarefa)
+    del estado["dono"]
+    return estado
+
+
+# -------------------------------------------------------------------------
+# 🗜️ ZIP EM FLUXO
+# -------------------------------------------------------------------------
+def gerar_zip(recortes, tarefa_id):
+    """Gera os bytes do ZIP; `recortes` = [(nome no zip, data_hora, preparar)].
+
+    `preparar()` devolve (corpo, tamanho) do recorte e é chamado só na vez dele.
+    """
+    saida = _SaidaSemSeek()
+    enviados = 0
+    try:
+        with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_STORED) as zf:
+            for i, (nome, data_hora, preparar) in enumerate(recortes):
+                _atualizar(tarefa_id, atual=nome)
+                try:
+                    corpo, tamanho = preparar()
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ [EXPORTAÇÃO] {nome}: {e}")
+                    _falhou(tarefa_id, nome, str(e))
+                    nome = f"{nome}.erro.txt"
+                    mensagem = f"{e}\n".encode("utf-8")
+                    corpo, tamanho = [mensagem], len(mensagem)
+                info = zipfile.ZipInfo(nome, date_time=data_hora)
+                info.file_size = tamanho
+                with zf.open(info, "w") as destino:
+                    for bloco in corpo:
+                        destino.write(bloco)
+                        for dados in saida.esvaziar():
+                            enviados += len(dados)
+                            yield dados
+                _atualizar(tarefa_id, concluidos=i + 1, bytes=enviados)
+        for dados in saida.esvaziar():
+            enviados += len(dados)
+            yield dados
+        _atualizar(tarefa_id, bytes=enviados, atual=None, finalizado=True)
+    except GeneratorExit:
+        _atualizar(tarefa_id, erro="Download interrompido.", finalizado=True)
+        raise
+    except Exception as e:
+        print("⚠️ [EXPORTAÇÃO] Falha ao montar o ZIP:", e)
+        _atualizar(tarefa_id, erro=str(e), finalizado=True)
+        raise
@@ -0,0 +1,165 @@
+# mod_radio/metadados.py
+"""Metadados de áudio (duração, bitrate, taxa, canais) lidos só dos cabeçalhos.
+
+- WAV: chunk `fmt ` e tamanho do chunk `data`.
+- MP3: primeiro quadro e, se houver, o quadro Xing/Info/VBRI com a contagem
+  de quadros (VBR); sem ele, a duração sai do tamanho e do bitrate (CBR).
+
+Na varredura, os arquivos novos ou alterados são lidos num pool de
+threads: o custo é a espera pela abertura e leitura de cada cabeçalho (disco
+ou rede), que libera o GIL; o parsing é curto. Um pool de processos exigiria
+reimportar a aplicação em cada filho. Lotes pequenos são lidos na própria
+thread.
+"""
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from mod_config.models import get_media_drive_dir
+from mod_radio.audio_indice import CAMPOS_META
+from mod_radio.recorte import cabecalho_wav, info_quadro_mp3, ler_quadro_mp3, _tamanho_id3v2
+
+METADADOS_WORKERS = int(os.getenv("METADADOS_WORKERS", "4"))
+MIN_ARQUIVOS_POOL = 64  # abaixo disso, o custo de usar o pool não compensa
+LEITURA_CABECALHO = 64 * 1024
+
+SEM_METADADOS = (0.0, 0, 0, 0)  # arquivo ilegível: registrado para não ser relido
+
+_POOL = None
+_LOCK = threading.Lock()
+
+
+# -------------------------------------------------------------------------
+# 🔍 LEITURA DOS CABEÇALHOS
+# -------------------------------------------------------------------------
+def _metadados_wav(caminho):
+    fmt, _inicio, tamanho, alinhamento, taxa = cabecalho_wav(caminho)
+    canais, _taxa, bytes_seg = struct.unpack("<HII", fmt[2:12])
+    if not bytes_seg or not alinhamento:
+        raise ValueError("Cabeçalho WAV inválido.")
+    return (tamanho // alinhamento) / taxa, bytes_seg * 8 // 1000, taxa, canais
+
+
+def _primeiro_quadro(dados, pos):
+    """Offset e dados do primeiro quadro seguido de outro quadro compatível."""
+    while pos + 4 <= len(dados):
+        quadro = ler_quadro_mp3(dados[pos], dados[pos + 1], dados[pos + 2])
+        if quadro:
+            prox = pos + quadro[0]
+            if prox + 3 > len(dados):  # único quadro dentro da leitura
+                return pos, quadro
+            seguinte = ler_quadro_mp3(dados[prox], dados[prox + 1], dados[prox + 2])
+            if seguinte and seguinte[3] == quadro[3]:
+                return pos, quadro
+        pos = dados.find(b"\xff", pos + 1)
+        if pos < 0:
+            break
+    raise ValueError("Nenhum quadro MPEG encontrado.")
+
+
+def _metadados_mp3(caminho):
+    with open(caminho, "rb") as f:
+        tamanho_arquivo = os.fstat(f.fileno()).st_size
+        inicio = _tamanho_id3v2(f.read(10))
+        f.seek(inicio)
+        dados = f.read(LEITURA_CABECALHO)
+        if tamanho_arquivo >= 128:
+            f.seek(tamanho_arquivo - 128)
+            if f.read(3) == b"TAG":  # ID3v1 no fim
+                tamanho_arquivo -= 128
+    pos, (_tamanho, amostras, taxa, _ass) = _primeiro_quadro(dados, 0)
+    kbps, canais = info_quadro_mp3(dados[pos + 1], dados[pos + 2], dados[pos + 3])
+
+    # Quadro Xing/Info (depois das "side info") ou VBRI (32 bytes após o cabeçalho)
+    mpeg1 = (dados[pos + 1] >> 3) & 3 == 3
+    lado = (32 if canais == 2 else 17) if mpeg1 else (17 if canais == 2 else 9)
+    crc = 0 if dados[pos + 1] & 1 else 2  # bit de proteção 0 = CRC de 2 bytes
+    quadros = None
+    xing = pos + 4 + crc + lado
+    if dados[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", dados[xing + 4:xing + 8])[0]
+        if flags & 1:
+            quadros = struct.unpack(">I", dados[xing + 8:xing + 12])[0]
+    elif dados[pos + 36:pos + 40] == b"VBRI":
+        quadros = struct.unpack(">I", dados[pos + 50:pos + 54])[0]
+
+    audio = tamanho_arquivo - (inicio + pos)
+    if quadros:
+        duracao = quadros * amostras / taxa
+        bitrate = round(audio * 8 / duracao / 1000) if duracao else kbps
+    else:
+        duracao = audio * 8 / (kbps * 1000)
+        bitrate = kbps
+    return duracao, bitrate, taxa, canais
+
+
+def ler_metadados(caminho):
+    """(duracao, bitrate kbps, taxa Hz, canais) do arquivo; SEM_METADADOS se ilegível."""
+    try:
+        if str(caminho).lower().endswith(".wav"):
+            duracao, bitrate, taxa, canais = _metadados_wav(caminho)
+        else:
+            duracao, bitrate, taxa, canais = _metadados_mp3(caminho)
+        return round(duracao, 3), int(bitrate), int(taxa), int(canais)
+    except (OSError, ValueError, struct.error, IndexError):
+        return SEM_METADADOS
+
+
+def _ler_lote(caminhos):
+    return [ler_metadados(c) for c in caminhos]
+
+
+# -------------------------------------------------------------------------
+# ⚙️ EXTRAÇÃO EM LOTE (pool de threads)
+# -------------------------------------------------------------------------
+def _pool():
+    global _POOL
+    with _LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=METADADOS_WORKERS, thread_name_prefix="metadados")
+        return _POOL
+
+
+def extrair(caminhos):
+    """Metadados de cada caminho, na mesma ordem."""
+    global _POOL
+    caminhos = list(caminhos)
+    if len(caminhos) < MIN_ARQUIVOS_POOL or METADADOS_WORKERS <= 1:
+        return _ler_lote(caminhos)
+    tamanho_lote = max(16, len(caminhos) // (METADADOS_WORKERS * 4))
+    lotes = [caminhos[i:i + tamanho_lote] for i in range(0, len(caminhos), tamanho_lote)]
+    try:
+        return [m for lote in _pool().map(_ler_lote, lotes) for m in lote]
+    except RuntimeError as e:  # pool encerrado (ex.: no desligamento): lê aqui mesmo
+        print("⚠️ [METADADOS] Pool indisponível, lendo na thread atual:", e)
+        with _LOCK:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+        return _ler_lote(caminhos)
+
+
+def preencher(itens, indice_anterior):
+    """Completa os itens da varredura com metadados.
+
+    Arquivos com o mesmo epoch e tamanho do índice anterior reaproveitam os
+    metadados já gravados; só os novos ou alterados são lidos. Retorna
+    quantos foram lidos.
+    """
+    posicoes = {s: i for i, s in enumerate(indice_anterior.subpaths)}
+    pendentes = []
+    for it in itens:
+        i = posicoes.get(it["subpath"])
+        if (i is not None and indice_anterior.metas[i] is not None
+                and indice_anterior.tamanhos[i] == it["bytes"] and indice_anterior.epochs[i] == it["epoch"]):
+            it.update(zip(CAMPOS_META, indice_anterior.metas[i]))
+        else:
+            pendentes.append(it)
+
+    if pendentes:
+        base_drive = get_media_drive_dir()
+        caminhos = (os.path.join(base_drive, *it["subpath"].split("/")) for it in pendentes)
+        for it, meta in zip(pendentes, extrair(caminhos)):
+            it.update(zip(CAMPOS_META, meta))
+    return len(pendentes)
@@ -0,0 +1,194 @@
+# mod_radio/metricas.py
+"""Métricas em memória (contadores, medidores e histogramas) dos caminhos quentes.
+
+Exportadas no formato texto do Prometheus em /metrics e resumidas na página
+de status do cache. Tudo é por processo: com vários workers, cada um expõe
+as próprias séries.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Limites (s) dos histogramas de duração: de requisições rápidas a varreduras longas
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_LOCK = threading.Lock()
+_METRICAS = {}  # nome -> métrica (na ordem de registro)
+
+
+def _rotulos(rotulos):
+    return tuple(sorted((k, str(v)) for k, v in rotulos.items()))
+
+
+def _escapar(valor):
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar_rotulos(chave, extra=()):
+    pares = list(chave) + list(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+# -------------------------------------------------------------------------
+# 📏 TIPOS DE MÉTRICA
+# -------------------------------------------------------------------------
+class Contador:
+    """Valor que só cresce (ex.: bytes enviados, arquivos varridos)."""
+    tipo = "counter"
+
+    def __init__(self, nome, ajuda):
+        self.nome, self.ajuda = nome, ajuda
+        self.valores = {}
+
+    def inc(self, valor=1, **rotulos):
+        chave = _rotulos(rotulos)
+        with _LOCK:
+            self.valores[chave] = self.valores.get(chave, 0) + valor
+
+    def linhas(self):
+        for chave, valor in self.valores.items():
+            yield f"{self.nome}{_formatar_rotulos(chave)} {_numero(valor)}"
+
+
+class Medidor(Contador):
+    """Valor que sobe e desce (ex.: streams ativos)."""
+    tipo = "gauge"
+
+    def dec(self, valor=1, **rotulos):
+        self.inc(-valor, **rotulos)
+
+
+class Histograma:
+    """Distribuição de valores em faixas cumulativas (`le`), com soma e contagem."""
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, buckets=BUCKETS_SEGUNDOS):
+        self.nome, self.ajuda = nome, ajuda
+        self.buckets = tuple(buckets)
+        self.series = {}  # rótulos -> [contagens por faixa (+Inf no fim), soma, total]
+
+    def observar(self, valor, **rotulos):
+        chave = _rotulos(rotulos)
+        with _LOCK:
+            serie = self.series.get(chave)
+            if serie is None:
+                serie = self.series[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][bisect_left(self.buckets, valor)] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def linhas(self):
+        for chave, (contagens, soma, total) in self.series.items():
+            acumulado = 0
+            for limite, n in zip(self.buckets + (float("inf"),), contagens):
+                acumulado += n
+                yield f"{self.nome}_bucket{_formatar_rotulos(chave, [('le', _numero(limite))])} {acumulado}"
+            yield f"{self.nome}_sum{_formatar_rotulos(chave)} {_numero(soma)}"
+            yield f"{self.nome}_count{_formatar_rotulos(chave)} {total}"
+
+    def quantil(self, chave, q):
+        """Estimativa do quantil `q` pelo limite superior da faixa (como no Prometheus)."""
+        contagens, _soma, total = self.series[chave]
+        alvo, acumulado = q * total, 0
+        for limite, n in zip(self.buckets + (float("inf"),), contagens):
+            acumulado += n
+            if acumulado >= alvo:
+                return limite
+        return float("inf")
+
+
+def _registrar(metrica):
+    _METRICAS[metrica.nome] = metrica
+    return metrica
+
+
+# -------------------------------------------------------------------------
+# 📊 MÉTRICAS DO SISTEMA
+# -------------------------------------------------------------------------
+VARREDURA_SEGUNDOS = _registrar(Histograma(
+    "radio_varredura_segundos", "Duração de listar_audios (varredura de pastas) por rádio."))
+VARREDURA_ARQUIVOS = _registrar(Contador(
+    "radio_varredura_arquivos_total", "Arquivos encontrados nas varreduras."))
+VARREDURA_PASTAS = _registrar(Contador(
+    "radio_varredura_pastas_total", "Pastas conferidas nas varreduras, por situação (relistada/reaproveitada)."))
+ATUALIZACAO_SEGUNDOS = _registrar(Histograma(
+    "radio_atualizar_cache_segundos", "Duração total de atualizar_cache por rádio."))
+SALVAR_SEGUNDOS = _registrar(Histograma(
+    "radio_salvar_cache_segundos", "Duração da gravação do índice (salvar_cache) por rádio."))
+SALVAR_ITENS = _registrar(Contador(
+    "radio_salvar_cache_itens_total", "Itens gravados no índice, por operação (gravado/removido)."))
+CACHE_CONSULTAS = _registrar(Contador(
+    "radio_cache_consultas_total", "Acessos ao cache em memória, por resultado (hit/miss)."))
+LISTAGEM_SEGUNDOS = _registrar(Histograma(
+    "radio_audios_data_segundos", "Duração das requisições de listagem (audios_data)."))
+STREAM_REQUISICOES = _registrar(Contador(
+    "radio_stream_requisicoes_total", "Requisições de mídia (servir_audio), por status HTTP."))
+STREAM_BYTES = _registrar(Contador(
+    "radio_stream_bytes_total", "Bytes de áudio entregues por servir_audio (Content-Length das respostas)."))
+STREAM_ATIVOS = _registrar(Medidor(
+    "radio_stream_ativos", "Streams de áudio em andamento."))
+STREAM_SEGUNDOS = _registrar(Histograma(
+    "radio_stream_segundos", "Duração das respostas de mídia, até o fim do envio."))
+
+
+@contextmanager
+def cronometrar(histograma, **rotulos):
+    """Observa no histograma o tempo gasto dentro do bloco."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        histograma.observar(time.perf_counter() - inicio, **rotulos)
+
+
+# -------------------------------------------------------------------------
+# 📤 EXPORTAÇÃO
+# -------------------------------------------------------------------------
+def exportar_texto():
+    """Todas as métricas no formato texto do Prometheus (version 0.0.4)."""
+    linhas = []
+    with _LOCK:
+        for m in _METRICAS.values():
+            linhas.append(f"# HELP {m.nome} {m.ajuda}")
+            linhas.append(f"# TYPE {m.nome} {m.tipo}")
+            linhas.extend(m.linhas())
+    return "\n".join(linhas) + "\n"
+
+
+def resumo_histogramas():
+    """Linhas para a página de status: contagem, média, p50 e p95 de cada série."""
+    resumo = []
+    with _LOCK:
+        for m in _METRICAS.values():
+            if not isinstance(m, Histograma):
+                continue
+            for chave, (_contagens, soma, total) in m.series.items():
+                if not total:
+                    continue
+                resumo.append({
+                    "metrica": m.nome,
+                    "rotulos": ", ".join(f"{k}={v}" for k, v in chave),
+                    "total": total,
+                    "media": soma / total,
+                    "p50": m.quantil(chave, 0.5),
+                    "p95": m.quantil(chave, 0.95),
+                })
+    return resumo
+
+
+def valores_contadores():
+    """{nome: {rótulos: valor}} de contadores e medidores (para a página de status)."""
+    with _LOCK:
+        return {
+            m.nome: {", ".join(f"{k}={v}" for k, v in chave): valor for chave, valor in m.valores.items()}
+            for m in _METRICAS.values() if isinstance(m, Contador)
+        }
@@ -0,0 +1,234 @@
+# mod_radio/observador_audios.py
+"""Observador de arquivos: novas gravações entram no cache assim que aparecem.
+
+Usa eventos do sistema de arquivos (watchdog/inotify) quando possível. Em
+montagens de rede (SMB/CIFS, NFS), onde o inotify não dispara, recorre a um
+polling barato que só confere o mtime das pastas recentes.
+
+Só o inotify avisa o fechamento do arquivo. Nos outros sistemas (Windows,
+macOS), a gravação criada fica em espera e só é registrada quando o tamanho
+e o mtime param de mudar entre duas conferências.
+"""
+import os
+import platform
+import posixpath
+import threading
+import time
+
+from mod_radio import audio_cache, picos
+from mod_radio.agendador_cache import solicitar_atualizacao
+from mod_config.models import carregar_radios_config, get_media_drive_dir
+
+# Opcional: se watchdog estiver instalado no ambiente
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except Exception:  # fallback se não houver watchdog
+    Observer = None
+    FileSystemEventHandler = object
+
+# Sistemas de arquivos de rede onde o inotify não dispara
+FS_REDE = {"cifs", "smb3", "smbfs", "nfs", "nfs4", "fuse.sshfs", "9p"}
+
+# "auto" (eventos, ou polling em montagens de rede), "polling" ou "0" (desligado)
+MODO_OBSERVADOR = os.getenv("CACHE_OBSERVADOR", "auto").lower()
+POLL_INTERVALO_SEG = int(os.getenv("CACHE_POLL_SEG", "30"))
+JANELA_PASTAS_QUENTES = 2 * 86400  # pastas alteradas há menos que isso são conferidas
+
+# on_closed só existe no backend inotify (Linux) do watchdog
+EVENTOS_FECHAMENTO = platform.system() == "Linux"
+ESTABILIZACAO_SEG = float(os.getenv("CACHE_ESTABILIZACAO_SEG", "5"))
+
+_OBSERVER = None
+_POLLING = {}  # radio_key -> pasta base observada por polling
+_LOCK = threading.Lock()
+_ESTABILIZANDO = {}  # caminho -> (manipulador, (tamanho, mtime) da última conferência)
+_LOCK_ESTABILIZANDO = threading.Lock()
+
+
+# -------------------------------------------------------------------------
+# 🧭 DETECÇÃO DO TIPO DE MONTAGEM
+# -------------------------------------------------------------------------
+def _tipo_fs(caminho):
+    """Tipo do sistema de arquivos de `caminho` segundo /proc/mounts (Linux)."""
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            montagens = [linha.split()[1:3] for linha in f if len(linha.split()) > 2]
+    except OSError:
+        return None
+
+    caminho = os.path.realpath(caminho)
+    melhor, tipo = "", None
+    for ponto, fs in montagens:
+        ponto = ponto.replace("\\040", " ")
+        if (caminho == ponto or caminho.startswith(ponto.rstrip("/") + "/")) and len(ponto) > len(melhor):
+            melhor, tipo = ponto, fs
+    return tipo
+
+
+def usa_polling(caminho):
+    """Indica se a pasta precisa de polling em vez de eventos."""
+    if MODO_OBSERVADOR == "polling" or Observer is None:
+        return True
+    if "windows" in platform.system().lower():
+        return caminho.startswith("\\\\")  # compartilhamento UNC
+    return _tipo_fs(caminho) in FS_REDE
+
+
+# -------------------------------------------------------------------------
+# 👂 EVENTOS (watchdog)
+# -------------------------------------------------------------------------
+class _ManipuladorRadio(FileSystemEventHandler):
+    """Repassa criação/fechamento/remoção de arquivos ao cache da rádio."""
+
+    def __init__(self, radio_key, parse_nome=None):
+        super().__init__()
+        self.radio_key = radio_key
+        self.parse_nome = parse_nome
+
+    def _registrar(self, caminho):
+        item = audio_cache.registrar_arquivo(self.radio_key, caminho, self.parse_nome)
+        if item:
+            picos.agendar([caminho])
+            print(f"👂 [OBSERVADOR] {self.radio_key}: {item['nome']} ({item['tamanho']} KB)")
+
+    def _acompanhar(self, caminho):
+        """Sem on_closed: espera o arquivo parar de crescer antes de registrar."""
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            return
+        with _LOCK_ESTABILIZANDO:
+            _ESTABILIZANDO[caminho] = (self, (st.st_size, st.st_mtime_ns))
+
+    def on_created(self, event):
+        if event.is_directory:
+            return
+        if EVENTOS_FECHAMENTO:
+            self._registrar(event.src_path)
+        else:
+            self._acompanhar(event.src_path)
+
+    def on_closed(self, event):
+        # Fim da gravação: atualiza o tamanho final do arquivo
+        if not event.is_directory:
+            self._registrar(event.src_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            with _LOCK_ESTABILIZANDO:
+                _ESTABILIZANDO.pop(event.src_path, None)
+            audio_cache.remover_arquivo(self.radio_key, event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            with _LOCK_ESTABILIZANDO:
+                _ESTABILIZANDO.pop(event.src_path, None)
+            audio_cache.remover_arquivo(self.radio_key, event.src_path)
+            self._registrar(event.dest_path)
+
+
+def _conferir_estabilizacao():
+    """Registra os arquivos em espera cujo tamanho e mtime não mudaram desde a última conferência."""
+    with _LOCK_ESTABILIZANDO:
+        pendentes = list(_ESTABILIZANDO.items())
+    for caminho, (manipulador, anterior) in pendentes:
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            atual = None  # removido antes de estabilizar
+        else:
+            atual = (st.st_size, st.st_mtime_ns)
+        with _LOCK_ESTABILIZANDO:
+            if _ESTABILIZANDO.get(caminho, (None, None))[1] != anterior:
+                continue  # removido ou renovado por outro evento nesse meio-tempo
+            if atual is None or atual == anterior:
+                del _ESTABILIZANDO[caminho]
+            else:
+                _ESTABILIZANDO[caminho] = (manipulador, atual)
+        if atual is not None and atual == anterior:
+            manipulador._registrar(caminho)
+
+
+def _ciclo_estabilizacao():
+    while True:
+        time.sleep(ESTABILIZACAO_SEG)
+        try:
+            _conferir_estabilizacao()
+        except Exception as e:
+            print(f"⚠️ [OBSERVADOR] Falha ao conferir gravações novas: {e}")
+
+
+# -------------------------------------------------------------------------
+# 🔁 POLLING (montagens de rede)
+# -------------------------------------------------------------------------
+def _pastas_quentes(radio_key, base_dir):
+    """Pastas recentes da rádio (e seus ancestrais), com o mtime conhecido."""
+    base_drive = get_media_drive_dir()
+    if radio_key not in audio_cache.CACHE_PASTAS:
+        audio_cache.obter_cache(radio_key)  # cache sob demanda: traz a rádio do índice
+    pastas = audio_cache.CACHE_PASTAS.get(radio_key) or {}
+    chave_base = os.path.relpath(base_dir, base_drive).replace(os.sep, "/")
+    limite = time.time() - JANELA_PASTAS_QUENTES
+
+    quentes = {chave_base}
+    for chave, info in pastas.items():
+        if info.get("mtime", 0) >= limite:
+            while chave and chave not in quentes and chave != chave_base:
+                quentes.add(chave)
+                chave = posixpath.dirname(chave)
+    return {
+        os.path.join(base_drive, *chave.split("/")): (pastas.get(chave) or {}).get("mtime")
+        for chave in quentes
+    }
+
+
+def _ciclo_polling():
+    while True:
+        time.sleep(POLL_INTERVALO_SEG)
+        for radio_key, base_dir in list(_POLLING.items()):
+            try:
+                for pasta, mtime in _pastas_quentes(radio_key, base_dir).items():
+                    if mtime is None or os.stat(pasta).st_mtime != mtime:
+                        solicitar_atualizacao(radio_key)
+                        break
+            except OSError as e:
+                print(f"⚠️ [OBSERVADOR] Falha ao conferir '{radio_key}': {e}")
+
+
+# -------------------------------------------------------------------------
+# 🚀 INICIALIZAÇÃO
+# -------------------------------------------------------------------------
+def iniciar_observador():
+    """Observa a pasta de cada rádio ativa (eventos ou polling)."""
+    global _OBSERVER
+    if MODO_OBSERVADOR == "0":
+        return
+
+    with _LOCK:
+        if _OBSERVER is not None or _POLLING:
+            return
+
+        radios_cfg = carregar_radios_config()
+        for radio_key, radio_cfg in radios_cfg.items():
+            base_dir = audio_cache.resolver_pasta_radio(radio_key, radio_cfg)
+            if not base_dir:
+                continue
+
+            if usa_polling(base_dir):
+                _POLLING[radio_key] = base_dir
+                print(f"🔁 [OBSERVADOR] {radio_key}: polling a cada {POLL_INTERVALO_SEG}s em {base_dir}")
+                continue
+
+            if _OBSERVER is None:
+                _OBSERVER = Observer()
+                _OBSERVER.daemon = True
+            _OBSERVER.schedule(_ManipuladorRadio(radio_key, radio_cfg.get("parse_nome")), base_dir, recursive=True)
+            print(f"👂 [OBSERVADOR] {radio_key}: eventos em {base_dir}")
+
+        if _OBSERVER is not None:
+            _OBSERVER.start()
+            if not EVENTOS_FECHAMENTO:
+                threading.Thread(target=_ciclo_estabilizacao, name="cache-estabilizacao", daemon=True).start()
+        if _POLLING:
+            threading.Thread(target=_ciclo_polling, name="cache-polling", daemon=True).start()
@@ -0,0 +1,118 @@
+# mod_radio/parsers_nome.py
+"""Interpretação do horário das gravações a partir do caminho do arquivo.
+
+Cada rádio grava com um padrão de nome diferente; o campo `parse_nome` da
+configuração escolhe o parser. Um parser recebe o `subpath` (relativo a
+media_drive, com "/") e devolve o epoch de parede da gravação, ou None se o
+nome não seguir o padrão — só então a varredura recorre ao mtime do arquivo.
+"""
+import posixpath
+import re
+import unicodedata
+from datetime import datetime
+from functools import lru_cache
+
+from mod_radio.audio_utils import datetime_para_epoch
+
+PARSERS = {}
+PARSER_PADRAO = "auto"  # rádios sem `parse_nome` (ou com um nome desconhecido)
+
+MESES = {
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "abril": 4, "maio": 5, "junho": 6,
+    "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
+}
+
+_RE_14_DIGITOS = re.compile(r"(\d{14})")
+_RE_DIA_HORA = re.compile(r"^(\d{2})-(\d{2})(\d{2})(\d{2})?(?:\D|$)")
+_RE_ANO = re.compile(r"(?<!\d)(\d{4})(?!\d)")
+
+
+def registrar_parser(nome):
+    """Decorador: registra o parser sob o nome usado em `parse_nome`."""
+    def decorador(func):
+        PARSERS[nome] = func
+        return func
+    return decorador
+
+
+def obter_parser(nome):
+    """Parser da rádio ("auto", se `nome` for vazio ou desconhecido)."""
+    parser = PARSERS.get((nome or "").strip().lower())
+    if parser is None and nome:
+        print(f"⚠️ [PARSER] parse_nome '{nome}' desconhecido; usando '{PARSER_PADRAO}'.")
+    return parser or PARSERS[PARSER_PADRAO]
+
+
+def nome_parser(nome):
+    """Nome efetivo do parser (o que é gravado no índice junto com a rádio)."""
+    nome = (nome or "").strip().lower()
+    return nome if nome in PARSERS else PARSER_PADRAO
+
+
+def _epoch(ano, mes, dia, hora, minuto, segundo=0):
+    try:
+        return datetime_para_epoch(datetime(ano, mes, dia, hora, minuto, segundo))
+    except ValueError:
+        return None
+
+
+# -------------------------------------------------------------------------
+# 📻 PARSERS REGISTRADOS
+# -------------------------------------------------------------------------
+@registrar_parser("clube")
+def parser_14_digitos(subpath):
+    """"20251021001622.mp3" → 21/10/2025 00:16:22."""
+    m = _RE_14_DIGITOS.search(posixpath.basename(subpath))
+    if not m:
+        return None
+    s = m.group(1)
+    return _epoch(int(s[0:4]), int(s[4:6]), int(s[6:8]), int(s[8:10]), int(s[10:12]), int(s[12:14]))
+
+
+@lru_cache(maxsize=1024)
+def _mes_da_pasta(pasta):
+    """(ano ou None, mês) a partir de ".../2025/Outubro" ou ".../Outubro"."""
+    partes = pasta.split("/")
+    nome = unicodedata.normalize("NFKD", partes[-1]).encode("ascii", "ignore").decode().lower()
+    mes = MESES.get(nome.strip())
+    if mes is None and nome.strip().isdigit() and 1 <= int(nome) <= 12:
+        mes = int(nome)
+    if mes is None:
+        return None
+    for parte in reversed(partes[:-1]):
+        m = _RE_ANO.search(parte)
+        if m:
+            return int(m.group(1)), mes
+    return None, mes
+
+
+@registrar_parser("massa")
+def parser_dia_hora_pasta_mensal(subpath):
+    """"Outubro/21-0640.wav" → 21/10 06:40 (ano da pasta ou o mais recente)."""
+    pasta, nome = posixpath.split(subpath)
+    m = _RE_DIA_HORA.match(nome)
+    if not m:
+        return None
+    ano_mes = _mes_da_pasta(pasta)
+    if ano_mes is None:
+        return None
+
+    ano, mes = ano_mes
+    dia, hora, minuto = int(m.group(1)), int(m.group(2)), int(m.group(3))
+    segundo = int(m.group(4) or 0)
+    if ano is None:
+        # Sem ano no caminho: a gravação mais recente possível que não esteja no futuro
+        hoje = datetime.now()
+        ano = hoje.year if (mes, dia) <= (hoje.month, hoje.day) else hoje.year - 1
+    return _epoch(ano, mes, dia, hora, minuto, segundo)
+
+
+@registrar_parser("auto")
+def parser_automatico(subpath):
+    """Tenta cada padrão conhecido, na ordem em que foram registrados."""
+    for parser in list(PARSERS.values()):
+        if parser is not parser_automatico:
+            epoch = parser(subpath)
+            if epoch is not None:
+                return epoch
+    return None
@@ -0,0 +1,346 @@
+# mod_radio/picos.py
+"""Picos (min/max) da forma de onda, pré-calculados para o wavesurfer.
+
+O navegador recebe alguns KB de picos em vez de baixar e decodificar o
+arquivo inteiro. Os picos ficam em disco, em `cache_picos/`, com a chave
+(subpath, tamanho, mtime): se o arquivo muda, a chave muda.
+
+WAV é lido direto do chunk `data`; outros formatos (MP3) são decodificados
+pelo ffmpeg em fluxo, a 8 kHz mono. O cálculo usa numpy (requirements.txt)
+e, sem ele, audioop/array (também em C, bloco a bloco).
+
+Sem ffmpeg no PATH, o MP3 (camada III) ainda tem picos: uma envoltória
+aproximada tirada do `global_gain` das "side info" de cada quadro, sem
+decodificar o áudio — suficiente para enxergar falas, música e silêncios.
+"""
+import mmap
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+import warnings
+from array import array
+from pathlib import Path
+
+from mod_config.models import get_media_drive_dir
+from mod_radio.audio_utils import numpy_opcional
+from mod_radio.busca_mp3 import tabela_mp3
+from mod_radio.recorte import cabecalho_wav, percorrer_quadros, _tamanho_id3v2
+
+# Opcional: audioop (removido no Python 3.13)
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except Exception:
+    audioop = None
+
+PASTA_PICOS = os.path.join(os.getcwd(), "cache_picos")
+PICOS_POR_SEGUNDO = 10
+TAXA_DECODIFICACAO = 8000  # Hz do PCM pedido ao ffmpeg
+ARQUIVO_ESTAVEL_SEG = 60  # arquivo sem alterações há esse tempo já terminou de gravar
+JANELA_PICOS = 2 * 86400  # só gravações recentes entram na fila automática
+
+_LOCK = threading.Lock()
+_EM_CALCULO = {}  # caminho do cache -> threading.Event (single-flight)
+_PENDENTES = {}  # caminho do áudio -> instante mínimo para processar
+_EVENTO = threading.Event()
+_ATIVO = threading.Event()
+
+
+def _arquivo_cache(caminho, st):
+    subpath = Path(os.path.relpath(caminho, get_media_drive_dir())).as_posix()
+    prefixo = hashlib.sha1(subpath.encode("utf-8")).hexdigest()[:20]
+    return os.path.join(PASTA_PICOS, f"{prefixo}-{st.st_size:x}-{st.st_mtime_ns:x}.json"), prefixo
+
+
+# -------------------------------------------------------------------------
+# 🧮 CÁLCULO
+# -------------------------------------------------------------------------
+def _minmax_blocos(blocos, largura, amostras_por_pico, flutuante=False):
+    """Percorre blocos de PCM intercalado e devolve [min, max, min, max, ...] em -1..1."""
+    picos = []
+    escala = 1.0 if flutuante else float(1 << (8 * largura - 1))
+    np = numpy_opcional()  # opcional: sem ele, cálculo em Python/audioop
+    for bloco in blocos:
+        if np is not None:
+            if flutuante:
+                amostras = np.frombuffer(bloco, dtype="<f4")
+            elif largura == 3:
+                b = np.frombuffer(bloco[:len(bloco) // 3 * 3], dtype=np.uint8).reshape(-1, 3)
+                amostras = (b[:, 0].astype(np.int32) | (b[:, 1].astype(np.int32) << 8)
+                            | (b[:, 2].astype(np.int8).astype(np.int32) << 16))
+            elif largura == 1:
+                amostras = np.frombuffer(bloco, dtype=np.uint8).astype(np.int16) - 128
+            else:
+                amostras = np.frombuffer(bloco[:len(bloco) // largura * largura], dtype=f"<i{largura}")
+            n = len(amostras) // amostras_por_pico * amostras_por_pico
+            grupos = [amostras[:n].reshape(-1, amostras_por_pico)] if n else []
+            if n < len(amostras):
+                grupos.append(amostras[n:].reshape(1, -1))
+            for g in grupos:
+                par = np.empty((len(g), 2), dtype=np.float64)
+                par[:, 0] = g.min(axis=1) / escala
+                par[:, 1] = g.max(axis=1) / escala
+                picos.extend(par.ravel().round(3).tolist())
+            continue
+
+        if flutuante:
+            raise ValueError("WAV em ponto flutuante exige numpy.")
+        passo = amostras_por_pico * largura
+        for i in range(0, len(bloco), passo):
+            trecho = bloco[i:i + passo]
+            trecho = trecho[:len(trecho) // largura * largura]
+            if not trecho:
+                continue
+            if audioop is not None:
+                if largura == 1:
+                    trecho = audioop.bias(trecho, 1, -128)
+                mn, mx = audioop.minmax(trecho, largura)
+            elif largura in (2, 4):
+                valores = array("h" if largura == 2 else "i", trecho)
+                mn, mx = min(valores), max(valores)
+            else:
+                raise ValueError(f"PCM de {8 * largura} bits exige numpy ou audioop.")
+            picos.extend((round(mn / escala, 3), round(mx / escala, 3)))
+    return picos
+
+
+def _blocos_arquivo(caminho, inicio, tamanho, bloco):
+    with open(caminho, "rb") as f:
+        f.seek(inicio)
+        while tamanho > 0:
+            dados = f.read(min(bloco, tamanho))
+            if not dados:
+                break
+            tamanho -= len(dados)
+            yield dados
+
+
+def _blocos_ffmpeg(caminho, bloco):
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise ValueError("ffmpeg indisponível para decodificar o arquivo.")
+    proc = subprocess.Popen(
+        [ffmpeg, "-v", "error", "-i", str(caminho), "-ac", "1", "-ar", str(TAXA_DECODIFICACAO),
+         "-f", "s16le", "-"],
+        stdout=subprocess.PIPE, stdin=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            dados = proc.stdout.read(bloco)
+            if not dados:
+                break
+            yield dados
+    finally:
+        proc.stdout.close()
+        proc.kill()
+        proc.wait()
+
+
+def _ganho_quadro(m, pos):
+    """Maior `global_gain` entre grânulos/canais do quadro (camada III) e se há áudio."""
+    b1, b3 = m[pos + 1], m[pos + 3]
+    mpeg1 = (b1 >> 3) & 3 == 3
+    canais = 1 if (b3 >> 6) == 3 else 2
+    inicio = pos + (4 if b1 & 1 else 6)  # bit de proteção 0 = CRC de 2 bytes
+    side = int.from_bytes(m[inicio:inicio + 32], "big")
+    bits_side = 8 * len(m[inicio:inicio + 32])
+    if mpeg1:
+        base, por_bloco, granulos = 9 + (5 if canais == 1 else 3) + 4 * canais, 59, 2
+    else:
+        base, por_bloco, granulos = 8 + canais, 63, 1
+    ganho, sinal = 0, False
+    for k in range(granulos * canais):
+        deslocamento = base + k * por_bloco
+        if deslocamento + 29 > bits_side:
+            break
+        campo = side >> (bits_side - deslocamento - 29)  # part2_3_length(12) big_values(9) global_gain(8)
+        big_values, global_gain = (campo >> 8) & 0x1FF, campo & 0xFF
+        if big_values:
+            sinal = True
+            ganho = max(ganho, global_gain)
+    return ganho, sinal
+
+
+def _envoltoria_mp3(caminho):
+    """Picos aproximados de um MP3 camada III sem decodificar (envoltória do global_gain)."""
+    with open(caminho, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("Arquivo vazio.")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            niveis, tempo = [], 0.0
+            for pos, _tamanho, amostras, taxa in percorrer_quadros(m, _tamanho_id3v2(m[:10]), len(m)):
+                if (m[pos + 1] >> 1) & 3 != 1:
+                    raise ValueError("Envoltória só para MPEG camada III.")
+                ganho, sinal = _ganho_quadro(m, pos)
+                i = int(tempo * PICOS_POR_SEGUNDO)
+                if i >= len(niveis):
+                    niveis.extend([None] * (i + 1 - len(niveis)))
+                # Cada 4 passos de global_gain dobram a amplitude (escala de 1,5 dB)
+                nivel = 2.0 ** (ganho / 4) if sinal else 0.0
+                niveis[i] = nivel if niveis[i] is None else max(niveis[i], nivel)
+                tempo += amostras / taxa
+    if not niveis:
+        raise ValueError("Nenhum quadro MPEG encontrado.")
+    maximo = max(n or 0.0 for n in niveis) or 1.0
+    picos = []
+    for n in niveis:
+        a = round((n or 0.0) / maximo, 3)
+        picos.extend((-a if a else 0.0, a))
+    return picos, tempo
+
+
+def ffmpeg_disponivel():
+    return shutil.which("ffmpeg") is not None
+
+
+def calcular_picos(caminho):
+    """Picos do arquivo: {"duracao", "picos_por_segundo", "picos": [min, max, ...]}."""
+    caminho = str(caminho)
+    if caminho.lower().endswith(".wav"):
+        fmt, inicio, tamanho, alinhamento, taxa = cabecalho_wav(caminho)
+        formato = int.from_bytes(fmt[0:2], "little")
+        largura = int.from_bytes(fmt[14:16], "little") // 8
+        if formato == 0xFFFE and len(fmt) >= 26:  # WAVE_FORMAT_EXTENSIBLE
+            formato = int.from_bytes(fmt[24:26], "little")
+        if formato not in (1, 3) or not largura:
+            raise ValueError("Formato WAV não suportado para picos.")
+        canais = alinhamento // largura
+        amostras_por_pico = max(1, taxa // PICOS_POR_SEGUNDO) * canais
+        blocos = _blocos_arquivo(caminho, inicio, tamanho, amostras_por_pico * largura * 256)
+        picos = _minmax_blocos(blocos, largura, amostras_por_pico, flutuante=formato == 3)
+        duracao = (tamanho // alinhamento) / taxa
+    elif caminho.lower().endswith(".mp3") and not ffmpeg_disponivel():
+        picos, duracao = _envoltoria_mp3(caminho)
+    else:
+        amostras_por_pico = TAXA_DECODIFICACAO // PICOS_POR_SEGUNDO
+        blocos = _blocos_ffmpeg(caminho, amostras_por_pico * 2 * 256)
+        picos = _minmax_blocos(blocos, 2, amostras_por_pico)
+        if caminho.lower().endswith(".mp3"):
+            duracao = tabela_mp3(caminho).duracao
+        else:
+            duracao = len(picos) / 2 / PICOS_POR_SEGUNDO
+
+    return {"duracao": round(duracao, 3), "picos_por_segundo": PICOS_POR_SEGUNDO, "picos": picos}
+
+
+# -------------------------------------------------------------------------
+# 💾 CACHE EM DISCO
+# -------------------------------------------------------------------------
+def obter_picos(caminho):
+    """Picos do cache em disco (calculados uma única vez por versão do arquivo).
+
+    Retorna (picos, chave); a chave identifica a versão e serve de ETag.
+    """
+    caminho = str(caminho)
+    st = os.stat(caminho)
+    destino, prefixo = _arquivo_cache(caminho, st)
+    chave = os.path.basename(destino)[:-5]
+
+    while True:
+        try:
+            with open(destino, "r", encoding="utf-8") as f:
+                return json.load(f), chave
+        except (OSError, ValueError):
+            pass
+
+        with _LOCK:
+            evento = _EM_CALCULO.get(destino)
+            dono = evento is None
+            if dono:
+                evento = _EM_CALCULO[destino] = threading.Event()
+        if not dono:
+            evento.wait()
+            if os.path.exists(destino):
+                continue
+            raise ValueError("Falha ao calcular os picos do arquivo.")
+
+        try:
+            picos = calcular_picos(caminho)
+            os.makedirs(PASTA_PICOS, exist_ok=True)
+            temporario = f"{destino}.{threading.get_ident()}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(picos, f, separators=(",", ":"))
+            os.replace(temporario, destino)
+
+            # Versões antigas do mesmo arquivo
+            for antigo in Path(PASTA_PICOS).glob(f"{prefixo}-*.json"):
+                if str(antigo) != destino:
+                    antigo.unlink(missing_ok=True)
+            return picos, chave
+        finally:
+            with _LOCK:
+                _EM_CALCULO.pop(destino, None)
+            evento.set()
+
+
+# -------------------------------------------------------------------------
+# 🔁 GERAÇÃO EM SEGUNDO PLANO
+# -------------------------------------------------------------------------
+def agendar(caminhos):
+    """Coloca arquivos na fila de pré-cálculo (só com o gerador ativo)."""
+    if not _ATIVO.is_set():
+        return
+    with _LOCK:
+        for caminho in caminhos:
+            _PENDENTES.setdefault(str(caminho), 0)
+    _EVENTO.set()
+
+
+def agendar_itens(itens):
+    """Agenda os itens do cache gravados recentemente."""
+    if not _ATIVO.is_set():
+        return
+    from mod_radio.audio_utils import datetime_para_epoch
+    from datetime import datetime
+
+    limite = datetime_para_epoch(datetime.now()) - JANELA_PICOS
+    base_drive = get_media_drive_dir()
+    agendar(os.path.join(base_drive, *it["subpath"].split("/"))
+            for it in itens if it.get("epoch", 0) >= limite)
+
+
+def _trabalhador():
+    while True:
+        _EVENTO.wait(timeout=ARQUIVO_ESTAVEL_SEG)
+        _EVENTO.clear()
+        agora = time.time()
+        with _LOCK:
+            prontos = [c for c, t in _PENDENTES.items() if t <= agora]
+
+        for caminho in prontos:
+            try:
+                st = os.stat(caminho)
+            except OSError:
+                with _LOCK:
+                    _PENDENTES.pop(caminho, None)
+                continue
+            # Ainda gravando: tenta de novo quando o arquivo parar de crescer
+            if agora - st.st_mtime < ARQUIVO_ESTAVEL_SEG:
+                with _LOCK:
+                    _PENDENTES[caminho] = st.st_mtime + ARQUIVO_ESTAVEL_SEG
+                continue
+
+            with _LOCK:
+                _PENDENTES.pop(caminho, None)
+            try:
+                obter_picos(caminho)
+            except Exception as e:
+                print(f"⚠️ [PICOS] Falha em {os.path.basename(caminho)}: {e}")
+
+
+def iniciar_gerador_picos():
+    """Inicia o trabalhador que pré-calcula os picos de novas gravações."""
+    if _ATIVO.is_set():
+        return
+    _ATIVO.set()
+    if not ffmpeg_disponivel():
+        print("⚠️ [PICOS] ffmpeg não encontrado no PATH: MP3 usa a envoltória aproximada "
+              "e as prévias ficam desativadas. Instale o ffmpeg para a forma de onda exata.")
+    if numpy_opcional() is None:
+        print("⚠️ [PICOS] numpy não instalado (ver requirements.txt): cálculo mais lento.")
+    threading.Thread(target=_trabalhador, name="picos", daemon=True).start()
@@ -0,0 +1,143 @@
+# mod_radio/previas.py
+"""Prévias em baixa taxa (MP3/Opus) para ouvir gravações sem baixar o original.
+
+Cada prévia é gerada uma única vez pelo ffmpeg, num pool de trabalhadores, e
+guardada em `cache_previas/` com a identidade do original (subpath, tamanho,
+mtime) no nome. O cache tem tamanho máximo e descarta as prévias menos
+usadas (LRU pelo atime, renovado a cada acesso sem mexer no mtime — que é
+a base do ETag/Last-Modified servidos). Prévias acessadas há pouco não são
+descartadas, para não sumirem no meio de uma reprodução. Pedidos simultâneos da
+mesma prévia esperam a mesma conversão. O original continua disponível para
+o recorte exato.
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from mod_config.models import get_media_drive_dir
+
+PASTA_PREVIAS = os.path.join(os.getcwd(), "cache_previas")
+PREVIA_CACHE_MB = int(os.getenv("PREVIA_CACHE_MB", "2048"))
+PREVIA_WORKERS = int(os.getenv("PREVIA_WORKERS", "2"))
+PREVIA_TIMEOUT_SEG = 120
+PREVIA_PROTECAO_SEG = 600  # acessadas há menos que isso ficam no cache
+
+# formato -> (extensão, mimetype, argumentos do ffmpeg)
+FORMATOS = {
+    "mp3": (".mp3", "audio/mpeg", ["-ac", "1", "-ar", "22050", "-c:a", "libmp3lame", "-b:a", "48k", "-f", "mp3"]),
+    "opus": (".opus", "audio/ogg", ["-ac", "1", "-c:a", "libopus", "-b:a", "24k", "-f", "ogg"]),
+}
+
+_POOL = None
+_LOCK = threading.Lock()
+_EM_CONVERSAO = {}  # destino -> Future (single-flight)
+
+
+def disponivel():
+    """Indica se há ffmpeg para gerar prévias."""
+    return shutil.which("ffmpeg") is not None
+
+
+def _pool():
+    """Pool de conversões, criado no primeiro uso (chamar com _LOCK adquirido)."""
+    global _POOL
+    if _POOL is None:
+        _POOL = ThreadPoolExecutor(max_workers=PREVIA_WORKERS, thread_name_prefix="previa")
+    return _POOL
+
+
+def _destino(caminho, formato):
+    st = os.stat(caminho)
+    subpath = Path(os.path.relpath(caminho, get_media_drive_dir())).as_posix()
+    prefixo = hashlib.sha1(subpath.encode("utf-8")).hexdigest()[:20]
+    nome = f"{prefixo}-{st.st_size:x}-{st.st_mtime_ns:x}{FORMATOS[formato][0]}"
+    return os.path.join(PASTA_PREVIAS, nome), prefixo
+
+
+# -------------------------------------------------------------------------
+# 🎛️ CONVERSÃO
+# -------------------------------------------------------------------------
+def _converter(caminho, destino, prefixo, formato):
+    os.makedirs(PASTA_PREVIAS, exist_ok=True)
+    temporario = f"{destino}.{threading.get_ident()}.tmp"
+    comando = [shutil.which("ffmpeg") or "ffmpeg", "-v", "error", "-y", "-i", str(caminho),
+               "-vn", *FORMATOS[formato][2], temporario]
+    try:
+        subprocess.run(comando, check=True, stdin=subprocess.DEVNULL,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=PREVIA_TIMEOUT_SEG)
+        os.replace(temporario, destino)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(e.stderr.decode("utf-8", "replace").strip() or "ffmpeg falhou") from e
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+    # Versões antigas do mesmo original, no mesmo formato
+    for antigo in Path(PASTA_PREVIAS).glob(f"{prefixo}-*{FORMATOS[formato][0]}"):
+        if str(antigo) != destino:
+            antigo.unlink(missing_ok=True)
+    _limitar_cache()
+    print(f"🎛️ [PRÉVIA] {os.path.basename(str(caminho))} → {formato} "
+          f"({os.path.getsize(destino) // 1024} KB)")
+    return destino
+
+
+def _tocar(destino):
+    """Marca o acesso (atime) preservando o mtime. FileNotFoundError se foi descartada."""
+    st = os.stat(destino)
+    os.utime(destino, ns=(time.time_ns(), st.st_mtime_ns))
+
+
+def _limitar_cache():
+    """Remove as prévias menos usadas até o cache caber no limite."""
+    limite = PREVIA_CACHE_MB * 1024 * 1024
+    protegidas = time.time() - PREVIA_PROTECAO_SEG
+    arquivos = []
+    total = 0
+    with os.scandir(PASTA_PREVIAS) as it:
+        for entry in it:
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                st = entry.stat()
+                arquivos.append((st.st_atime, st.st_size, entry.path))
+                total += st.st_size
+    for acesso, tamanho, caminho in sorted(arquivos):
+        if total <= limite or acesso >= protegidas:
+            break
+        try:
+            os.remove(caminho)
+            total -= tamanho
+        except OSError:
+            pass
+
+
+def obter_previa(caminho, formato="mp3"):
+    """Caminho da prévia pronta (gerada agora, se preciso) e seu mimetype.
+
+    Levanta ValueError para formato desconhecido ou sem ffmpeg. Se a prévia
+    for descartada entre esta chamada e o envio, quem serve recebe
+    FileNotFoundError e pode chamar de novo (ela é gerada outra vez).
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de prévia desconhecido: {formato}")
+    if not disponivel():
+        raise ValueError("ffmpeg indisponível para gerar prévias.")
+
+    destino, prefixo = _destino(caminho, formato)
+    try:
+        _tocar(destino)  # LRU: acesso recente
+        return destino, FORMATOS[formato][1]
+    except FileNotFoundError:
+        pass
+
+    with _LOCK:
+        futuro = _EM_CONVERSAO.get(destino)
+        if futuro is None:
+            futuro = _pool().submit(_converter, caminho, destino, prefixo, formato)
+            _EM_CONVERSAO[destino] = futuro
+            futuro.add_done_callback(lambda _f: _EM_CONVERSAO.pop(destino, None))
+    return futuro.result(timeout=PREVIA_TIMEOUT_SEG), FORMATOS[formato][1]
@@ -0,0 +1,254 @@
+# mod_radio/recorte.py
+"""Recorte de gravações sem decodificar o áudio.
+
+- MP3: o trecho é uma sequência de quadros inteiros do arquivo original.
+- WAV: um novo cabeçalho RIFF seguido da fatia de amostras do chunk `data`.
+
+Os dois casos só leem os bytes do trecho; o resultado é enviado em blocos,
+com memória constante. A conversão de formato (pydub/ffmpeg) é a exceção:
+decodifica apenas o trecho já recortado.
+"""
+import io
+import math
+import mmap
+import os
+import struct
+
+from mod_radio.streaming import ler_trecho
+
+EXTENSOES_RECORTE = (".mp3", ".wav")
+
+# -------------------------------------------------------------------------
+# 🎚️ CABEÇALHOS DE QUADRO MPEG
+# -------------------------------------------------------------------------
+_BITRATES = {  # (mpeg1?, camada) -> kbps por índice
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_TAXAS = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def ler_quadro_mp3(b0, b1, b2):
+    """(tamanho em bytes, amostras, taxa, assinatura) do quadro, ou None se inválido."""
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    versao, camada = (b1 >> 3) & 3, 4 - ((b1 >> 1) & 3)
+    i_bitrate, i_taxa, preenchimento = b2 >> 4, (b2 >> 2) & 3, (b2 >> 1) & 1
+    if versao == 1 or camada == 4 or i_bitrate in (0, 15) or i_taxa == 3:
+        return None  # reservado ou "free format"
+
+    mpeg1 = versao == 3
+    kbps = _BITRATES[(mpeg1, camada)][i_bitrate]
+    taxa = _TAXAS[versao][i_taxa]
+    if camada == 1:
+        return (12000 * kbps // taxa + preenchimento) * 4, 384, taxa, (versao, camada, taxa)
+    amostras = 1152 if (mpeg1 or camada == 2) else 576
+    return amostras // 8 * 1000 * kbps // taxa + preenchimento, amostras, taxa, (versao, camada, taxa)
+
+
+def info_quadro_mp3(b1, b2, b3):
+    """(kbps, canais) do cabeçalho de um quadro já validado por ler_quadro_mp3."""
+    versao, camada = (b1 >> 3) & 3, 4 - ((b1 >> 1) & 3)
+    kbps = _BITRATES[(versao == 3, camada)][b2 >> 4]
+    return kbps, 1 if (b3 >> 6) == 3 else 2
+
+
+def _tamanho_id3v2(dados):
+    if len(dados) >= 10 and dados[:3] == b"ID3":
+        s = dados[6:10]
+        tamanho = 10 + ((s[0] << 21) | (s[1] << 14) | (s[2] << 7) | s[3])
+        return tamanho + (10 if dados[5] & 0x10 else 0)  # rodapé
+    return 0
+
+
+def _quadro_informativo(m, pos, tamanho):
+    """Quadro Xing/Info/VBRI (sem áudio): não deve ir para o recorte."""
+    trecho = m[pos:pos + min(tamanho, 200)]
+    return b"Xing" in trecho or b"Info" in trecho or b"VBRI" in trecho
+
+
+def percorrer_quadros(m, pos, total, assinatura=None):
+    """Gera (offset, tamanho, amostras, taxa) de cada quadro de áudio em m[pos:total].
+
+    Sem `assinatura`, adota a do primeiro quadro e pula o quadro Xing/Info.
+    Bytes fora de sincronismo são ignorados até o próximo quadro válido.
+    """
+    primeiro = assinatura is None
+    while pos + 4 <= total:
+        quadro = ler_quadro_mp3(m[pos], m[pos + 1], m[pos + 2])
+        if quadro and (assinatura is None or quadro[3] == assinatura) and pos + quadro[0] <= total:
+            tamanho, amostras, taxa, assinatura = quadro
+            if primeiro:
+                primeiro = False
+                if _quadro_informativo(m, pos, tamanho):
+                    pos += tamanho
+                    continue
+            yield pos, tamanho, amostras, taxa
+            pos += tamanho
+            continue
+        if m[pos:pos + 3] == b"TAG":  # ID3v1 no fim
+            return
+        # Perdeu o sincronismo: procura o próximo 0xFF
+        proximo = m.find(b"\xff", pos + 1)
+        if proximo < 0:
+            return
+        pos = proximo
+
+
+def quadros_mp3(caminho):
+    """Offsets dos quadros de áudio do arquivo, com (amostras por quadro, taxa).
+
+    Percorre só os cabeçalhos de 4 bytes (via mmap), sem ler o áudio.
+    Retorna (offsets, fim_do_ultimo_quadro, amostras_por_quadro, taxa).
+    """
+    with open(caminho, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("Arquivo vazio.")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            offsets, fim, amostras, taxa = [], 0, 0, 0
+            for pos, tamanho, amostras, taxa in percorrer_quadros(m, _tamanho_id3v2(m[:10]), len(m)):
+                offsets.append(pos)
+                fim = pos + tamanho
+
+    if not offsets:
+        raise ValueError("Nenhum quadro MPEG encontrado.")
+    return offsets, fim, amostras, taxa
+
+
+def trecho_mp3(caminho, inicio_s, fim_s):
+    """Faixa de bytes [ini, fim) com os quadros que cobrem o intervalo e a duração real."""
+    from mod_radio.busca_mp3 import tabela_mp3
+
+    tabela = tabela_mp3(caminho)
+    seg_quadro = tabela.seg_quadro
+    if int(inicio_s / seg_quadro) >= tabela.quadros:
+        raise ValueError("O início do recorte está além do fim da gravação.")
+    q_ini = int(inicio_s / seg_quadro)
+    q_fim = min(max(q_ini + 1, math.ceil(fim_s / seg_quadro)), tabela.quadros)
+    return tabela.offset(caminho, q_ini), tabela.offset(caminho, q_fim), (q_fim - q_ini) * seg_quadro
+
+
+# -------------------------------------------------------------------------
+# 🌊 WAV (RIFF)
+# -------------------------------------------------------------------------
+def cabecalho_wav(caminho):
+    """(chunk fmt bruto, offset do áudio, bytes de áudio, block_align, taxa)."""
+    with open(caminho, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError("Arquivo WAV inválido.")
+        tamanho_arquivo = os.fstat(f.fileno()).st_size
+        fmt = None
+        while True:
+            cab = f.read(8)
+            if len(cab) < 8:
+                raise ValueError("Chunk 'data' não encontrado.")
+            nome, tamanho = cab[:4], struct.unpack("<I", cab[4:])[0]
+            if nome == b"fmt ":
+                fmt = f.read(tamanho)
+                if tamanho % 2:
+                    f.seek(1, 1)
+            elif nome == b"data":
+                if fmt is None or len(fmt) < 16:
+                    raise ValueError("Chunk 'fmt ' ausente.")
+                inicio = f.tell()
+                # Gravação em andamento: o tamanho no cabeçalho ainda não foi escrito
+                if tamanho in (0, 0xFFFFFFFF) or inicio + tamanho > tamanho_arquivo:
+                    tamanho = tamanho_arquivo - inicio
+                taxa, _bps, alinhamento = struct.unpack("<IIH", fmt[4:14])
+                return fmt, inicio, tamanho, alinhamento, taxa
+            else:
+                f.seek(tamanho + (tamanho % 2), 1)
+
+
+def trecho_wav(caminho, inicio_s, fim_s):
+    """(novo cabeçalho, offset inicial, bytes de áudio, duração real) do intervalo."""
+    fmt, inicio_dados, tamanho_dados, alinhamento, taxa = cabecalho_wav(caminho)
+    if not alinhamento or not taxa:
+        raise ValueError("Cabeçalho WAV inválido.")
+    quadros = tamanho_dados // alinhamento
+    if int(inicio_s * taxa) >= quadros:
+        raise ValueError("O início do recorte está além do fim da gravação.")
+    q_ini = int(inicio_s * taxa)
+    q_fim = min(max(q_ini + 1, int(round(fim_s * taxa))), quadros)
+    tamanho = (q_fim - q_ini) * alinhamento
+    return montar_cabecalho_wav(fmt, tamanho), inicio_dados + q_ini * alinhamento, tamanho, (q_fim - q_ini) / taxa
+
+
+def montar_cabecalho_wav(fmt, tamanho):
+    """Cabeçalho RIFF (fmt + início do chunk data) para `tamanho` bytes de áudio."""
+    fmt_chunk = b"fmt " + struct.pack("<I", len(fmt)) + fmt + (b"\0" if len(fmt) % 2 else b"")
+    data_chunk = b"data" + struct.pack("<I", tamanho)
+    total = 4 + len(fmt_chunk) + len(data_chunk) + tamanho
+    if total > 0xFFFFFFFF:
+        raise ValueError("Áudio longo demais para um único WAV.")
+    return b"RIFF" + struct.pack("<I", total) + b"WAVE" + fmt_chunk + data_chunk
+
+
+# -------------------------------------------------------------------------
+# 🎯 POSIÇÃO NO TEMPO
+# -------------------------------------------------------------------------
+def posicao_no_tempo(caminho, segundos):
+    """(offset em bytes, segundos exatos do offset, duração do arquivo) para `segundos`.
+
+    MP3: início do quadro que contém o instante. WAV: amostra do instante.
+    """
+    caminho = str(caminho)
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == ".mp3":
+        from mod_radio.busca_mp3 import tabela_mp3
+
+        tabela = tabela_mp3(caminho)
+        q = min(max(0, int(segundos / tabela.seg_quadro)), tabela.quadros - 1)
+        return tabela.offset(caminho, q), q * tabela.seg_quadro, tabela.duracao
+    if extensao == ".wav":
+        _fmt, inicio, tamanho, alinhamento, taxa = cabecalho_wav(caminho)
+        if not alinhamento or not taxa:
+            raise ValueError("Cabeçalho WAV inválido.")
+        quadros = tamanho // alinhamento
+        q = min(max(0, int(segundos * taxa)), max(0, quadros - 1))
+        return inicio + q * alinhamento, q / taxa, quadros / taxa
+    raise ValueError(f"Formato não suportado: {extensao}")
+
+
+# -------------------------------------------------------------------------
+# ✂️ RECORTE
+# -------------------------------------------------------------------------
+def recortar(caminho, inicio_s, fim_s):
+    """Recorte sem decodificar: (gerador de bytes, tamanho total, extensão, duração real)."""
+    caminho = str(caminho)
+    if inicio_s < 0 or fim_s <= inicio_s:
+        raise ValueError("Intervalo de recorte inválido.")
+    extensao = os.path.splitext(caminho)[1].lower()
+
+    if extensao == ".mp3":
+        ini, fim, duracao = trecho_mp3(caminho, inicio_s, fim_s)
+        cabecalho = b""
+    elif extensao == ".wav":
+        cabecalho, ini, tamanho, duracao = trecho_wav(caminho, inicio_s, fim_s)
+        fim = ini + tamanho
+    else:
+        raise ValueError(f"Formato não suportado para recorte: {extensao}")
+
+    def gerar():
+        if cabecalho:
+            yield cabecalho
+        with open(caminho, "rb", buffering=0) as f:
+            yield from ler_trecho(f, ini, fim)
+
+    return gerar(), len(cabecalho) + (fim - ini), extensao, duracao
+
+
+def converter(caminho, inicio_s, fim_s, formato):
+    """Recorte em outro formato (pydub): decodifica só o trecho já recortado."""
+    from pydub import AudioSegment
+
+    corpo, _tamanho, extensao, _duracao = recortar(caminho, inicio_s, fim_s)
+    trecho = AudioSegment.from_file(io.BytesIO(b"".join(corpo)), format=extensao.lstrip("."))
+    saida = io.BytesIO()
+    trecho.export(saida, format=formato)
+    return saida.getvalue()
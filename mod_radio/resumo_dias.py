@@ -0,0 +1,116 @@
+# mod_radio/resumo_dias.py
+"""Resumo por dia de cada rádio, para o calendário da listagem.
+
+Para cada dia com gravações: quantidade de arquivos, bytes, primeira e
+última gravação e número de lacunas. A cada troca do índice da rádio o
+resumo é refeito só nos dias cujo trecho mudou, no dia com gravações
+anterior e no seguinte a cada um deles (as lacunas da virada dependem da
+última gravação do dia anterior) e nos dias resumidos antes de terminar
+(janela cortada em `agora`, sem a lacuna final). O resultado é o mesmo de
+um resumo completo; o calendário de um mês é uma consulta direta por dia.
+"""
+import threading
+from bisect import bisect_left
+from datetime import datetime
+
+from mod_radio.audio_indice import SEGUNDOS_DIA
+from mod_radio.audio_utils import datetime_para_epoch, epoch_para_datetime
+from mod_radio.cobertura import lacunas_periodo
+
+RESUMOS = {}  # radio_key -> {dia: (arquivos, bytes, primeiro epoch, ultimo epoch, lacunas, fim da janela)}
+_LOCK = threading.Lock()
+
+
+def _dias(indice):
+    """{dia: (lo, hi)} das posições de cada dia com gravações (uma busca binária por dia)."""
+    epochs = indice.epochs
+    dias, lo = {}, 0
+    while lo < len(epochs):
+        dia = epochs[lo] // SEGUNDOS_DIA
+        hi = bisect_left(epochs, (dia + 1) * SEGUNDOS_DIA, lo)
+        dias[dia] = (lo, hi)
+        lo = hi
+    return dias
+
+
+def _mesmo_trecho(anterior, a, novo, b):
+    (a_lo, a_hi), (b_lo, b_hi) = a, b
+    return (a_hi - a_lo == b_hi - b_lo
+            and anterior.epochs[a_lo:a_hi] == novo.epochs[b_lo:b_hi]
+            and anterior.tamanhos[a_lo:a_hi] == novo.tamanhos[b_lo:b_hi]
+            and anterior.metas[a_lo:a_hi] == novo.metas[b_lo:b_hi])
+
+
+def _resumir(indice, dia, lo, hi, agora):
+    base = dia * SEGUNDOS_DIA
+    fim = min(base + SEGUNDOS_DIA, agora)
+    lacunas = len(lacunas_periodo(indice, base, fim)[0]) if fim > base else 0
+    return (hi - lo, sum(indice.tamanhos[lo:hi]), indice.epochs[lo], indice.epochs[hi - 1], lacunas, fim)
+
+
+def _vizinhos(dias, alterados):
+    """Dias com gravações imediatamente antes e depois de cada dia alterado."""
+    ordenados = sorted(dias)
+    extras = set()
+    for d in alterados:
+        i = bisect_left(ordenados, d)
+        if i > 0:
+            extras.add(ordenados[i - 1])
+        j = i + 1 if i < len(ordenados) and ordenados[i] == d else i
+        if j < len(ordenados):
+            extras.add(ordenados[j])
+    return extras
+
+
+def atualizar(radio_key, anterior, novo, agora=None):
+    """Refaz o resumo dos dias alterados entre o índice anterior e o novo."""
+    if agora is None:
+        agora = datetime_para_epoch(datetime.now())
+    dias_novo = _dias(novo)
+    with _LOCK:
+        resumos = RESUMOS.get(radio_key)
+    if anterior is None or resumos is None:
+        alterados = set(dias_novo)
+        resumos = {}
+    else:
+        dias_ant = _dias(anterior)
+        alterados = {
+            d for d in dias_ant.keys() | dias_novo.keys()
+            if d not in dias_ant or d not in dias_novo
+            or not _mesmo_trecho(anterior, dias_ant[d], novo, dias_novo[d])
+        }
+        alterados |= _vizinhos(dias_novo, alterados)
+        # Resumidos antes do fim do dia: a janela cresce até a meia-noite
+        alterados |= {d for d, r in resumos.items() if r[5] < (d + 1) * SEGUNDOS_DIA and d in dias_novo}
+        resumos = dict(resumos)  # cópia: leitores veem o resumo antigo ou o novo, inteiros
+
+    for dia in alterados:
+        if dia in dias_novo:
+            resumos[dia] = _resumir(novo, dia, *dias_novo[dia], agora)
+        else:
+            resumos.pop(dia, None)
+    with _LOCK:
+        RESUMOS[radio_key] = resumos
+    return len(alterados)
+
+
+def resumo_mes(radio_key, ano, mes):
+    """{"AAAA-MM-DD": resumo} dos dias do mês com gravações."""
+    with _LOCK:
+        resumos = RESUMOS.get(radio_key, {})
+    inicio = datetime_para_epoch(datetime(ano, mes, 1)) // SEGUNDOS_DIA
+    fim = datetime_para_epoch(datetime(ano + mes // 12, mes % 12 + 1, 1)) // SEGUNDOS_DIA
+    dias = {}
+    for dia in range(inicio, fim):
+        r = resumos.get(dia)
+        if r is None:
+            continue
+        arquivos, total_bytes, primeiro, ultimo, lacunas, _fim = r
+        dias[epoch_para_datetime(dia * SEGUNDOS_DIA).strftime("%Y-%m-%d")] = {
+            "arquivos": arquivos,
+            "bytes": total_bytes,
+            "primeiro": epoch_para_datetime(primeiro).strftime("%H:%M:%S"),
+            "ultimo": epoch_para_datetime(ultimo).strftime("%H:%M:%S"),
+            "lacunas": lacunas,
+        }
+    return dias
@@ -1,12 +1,24 @@
-from flask import Blueprint, render_template, request, jsonify, send_file, redirect, url_for, flash, abort, Response
+from flask import Blueprint, render_template, request, jsonify, send_file, redirect, url_for, flash, abort, Response, session
 from datetime import datetime
 import os
 import io
-from pydub import AudioSegment
+import json
+import math
+import base64
+import hashlib
+from functools import partial
+from time import perf_counter
+from werkzeug.exceptions import HTTPException
+from werkzeug.utils import secure_filename
 
 from mod_auth.utils import login_required, admin_required
-from .audio_utils import listar_audios
-from mod_radio.audio_cache import obter_cache, atualizar_cache
+from mod_radio import metricas
+from mod_radio.audio_cache import obter_cache, obter_cache_versionado
+from mod_radio.streaming import servir_arquivo, servir_virtual, MIMETYPES
+from mod_radio import recorte, picos, previas, continuo, exportacao, resumo_dias, eventos
+from mod_radio.agendador_cache import solicitar_atualizacao
+from mod_radio.audio_indice import SEGUNDOS_DIA, mesclar_radios
+from mod_radio.audio_utils import datetime_para_epoch
 from mod_config.models import carregar_radios_config, ConfigSistema
 
 from urllib.parse import unquote
@@ -25,45 +37,39 @@ bp_radio = Blueprint("radio", __name__, template_folder="templates")
 # -------------------------------------------------------------------------
 from datetime import datetime, time
 
-def _filtra_por_data_hora(itens, data_str, hora_ini, hora_fim):
-    """Filtra uma lista de áudios (em cache) pelos campos de data e hora."""
+def _faixas_por_data_hora(indice, data_str, hora_ini, hora_fim):
+    """Converte os filtros de data e hora em faixas [lo, hi) do índice da rádio."""
     if not (data_str or hora_ini or hora_fim):
-        return itens
+        return [(0, len(indice))]
 
     try:
-        data_alvo = datetime.strptime(data_str, "%Y-%m-%d").date() if data_str else None
+        data_alvo = datetime.strptime(data_str, "%Y-%m-%d") if data_str else None
     except Exception:
         data_alvo = None
 
     def parse_h(h, default):
         try:
-            return datetime.strptime(h, "%H:%M").time() if h else default
+            t = datetime.strptime(h, "%H:%M").time() if h else default
         except Exception:
-            return default
+            t = default
+        return t.hour * 3600 + t.minute * 60
 
-    t_ini = parse_h(hora_ini, time(0, 0))
-    t_fim = parse_h(hora_fim, time(23, 59))
+    seg_ini = parse_h(hora_ini, time(0, 0))
+    seg_fim = parse_h(hora_fim, time(23, 59)) + 59  # inclui o minuto final inteiro
 
-    filtrados = []
-    for it in itens:
-        try:
-            dt = datetime.strptime(it.get("datahora"), "%d/%m/%Y %H:%M:%S")
-        except Exception:
-            continue
-
-        if data_alvo and dt.date() != data_alvo:
-            continue
-        if not (t_ini <= dt.time() <= t_fim):
-            continue
-
-        filtrados.append(it)
-    return filtrados
+    dia = datetime_para_epoch(data_alvo) // SEGUNDOS_DIA if data_alvo else None
+    return indice.faixas_por_horario(seg_ini, seg_fim, dia)
 
 
 @bp_radio.route("/radio/audios/data")
 @login_required
 def audios_data():
     """Retorna lista de áudios (com paginação e filtros AJAX)."""
+    with metricas.cronometrar(metricas.LISTAGEM_SEGUNDOS):
+        return _audios_data()
+
+
+def _audios_data():
     radios_cfg = carregar_radios_config()
     radio_key = request.args.get("radio")
     radio = radios_cfg.get(radio_key)
@@ -75,32 +81,179 @@ def audios_data():
     hora_ini = request.args.get("hora_ini", "")
     hora_fim = request.args.get("hora_fim", "")
 
-    # Paginação
+    # Paginação: cursor (keyset) por padrão; ?page=N mantém o modo antigo por deslocamento
+    cursor = request.args.get("cursor", "")
+    por_offset = "page" in request.args and not cursor
     try:
         page = int(request.args.get("page", "1"))
         if page < 1:
             page = 1
     except ValueError:
         page = 1
+    try:
+        direcao, chave = _ler_cursor(cursor) if cursor else (None, None)
+    except ValueError:
+        return jsonify({"erro": "Cursor inválido."}), 400
 
     cfg = ConfigSistema.get()
     por_pagina = cfg.get("max_por_pagina", 50) if cfg else 50
 
-    cache = obter_cache(radio_key)
-    itens = cache.get("itens", [])
-    itens = _filtra_por_data_hora(itens, data, hora_ini, hora_fim)
-
-    total = len(itens)
-    inicio = (page - 1) * por_pagina
-    fim = inicio + por_pagina
-    pagina_itens = itens[inicio:fim]
+    # ETag = versão do índice persistente + consulta: igual em todos os processos,
+    # sem mudanças desde a última gravação → 304.
+    versao, indice = obter_cache_versionado(radio_key)
+    consulta = f"{radio_key}|{data}|{hora_ini}|{hora_fim}|{page if por_offset else cursor}|{por_pagina}"
+    etag = f"{versao}-{hashlib.sha1(consulta.encode('utf-8')).hexdigest()[:16]}"
+    if request.if_none_match.contains(etag):
+        resposta = Response(status=304)
+        resposta.set_etag(etag)
+        resposta.cache_control.private = True
+        resposta.cache_control.no_cache = True
+        return resposta
+
+    faixas = _faixas_por_data_hora(indice, data, hora_ini, hora_fim)
+
+    total = sum(hi - lo for lo, hi in faixas)
+    if por_offset:
+        inicio = (page - 1) * por_pagina
+        pagina_itens = indice.pagina(faixas, inicio, por_pagina)
+        mais_antigos, mais_recentes = inicio + len(pagina_itens) < total, page > 1
+    else:
+        pagina_itens, mais_antigos, mais_recentes = indice.pagina_cursor(
+            faixas, por_pagina,
+            antes=chave if direcao == "n" else None,
+            depois=chave if direcao == "p" else None,
+        )
 
-    return jsonify({
+    resposta = jsonify({
         "total": total,
-        "page": page,
+        "page": page if por_offset else None,
         "per_page": por_pagina,
-        "itens": pagina_itens
+        "itens": pagina_itens,
+        "next": _cursor("n", pagina_itens[-1]) if mais_antigos else None,
+        "prev": _cursor("p", pagina_itens[0]) if mais_recentes else None,
     })
+    resposta.set_etag(etag)
+    resposta.cache_control.private = True
+    resposta.cache_control.no_cache = True
+    return resposta
+
+
+def _cursor(direcao, item):
+    """Cursor opaco: direção ("n" = mais antigos, "p" = mais recentes, "m" = várias rádios) + chave do item."""
+    if direcao == "m":
+        texto = f"m:{item['epoch']}:{item['radio']}:{item['nome']}"
+    else:
+        texto = f"{direcao}:{item['epoch']}:{item['nome']}"
+    return base64.urlsafe_b64encode(texto.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _ler_cursor(cursor):
+    """(direção, chave) do cursor — (epoch, nome) ou, em "m", (epoch, nome, radio); ValueError se malformado."""
+    try:
+        texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        direcao, epoch, resto = texto.split(":", 2)
+        if direcao == "m":
+            radio, nome = resto.split(":", 1)
+            return direcao, (int(epoch), nome, radio)
+        if direcao in ("n", "p"):
+            return direcao, (int(epoch), resto)
+    except (ValueError, UnicodeDecodeError):
+        pass
+    raise ValueError("Cursor inválido.")
+
+
+@bp_radio.route("/radio/audios/multi")
+@login_required
+def audios_multi():
+    """Áudios de várias rádios num período de dias, intercalados por horário.
+
+    ?radios=clube,massa (ou ?radio= repetido) &data_ini=AAAA-MM-DD &data_fim=...
+    &hora_ini/&hora_fim (janela diária) &cursor= (campo "next" da página anterior).
+    """
+    with metricas.cronometrar(metricas.LISTAGEM_SEGUNDOS):
+        return _audios_multi()
+
+
+def _audios_multi():
+    radios_cfg = carregar_radios_config()
+    chaves = [k for v in request.args.getlist("radios") for k in v.split(",") if k.strip()]
+    chaves = sorted({k.strip() for k in chaves} | set(request.args.getlist("radio")))
+    if not chaves:
+        return jsonify({"erro": "Informe ao menos uma rádio."}), 400
+    desconhecidas = [k for k in chaves if k not in radios_cfg]
+    if desconhecidas:
+        return jsonify({"erro": f"Rádio não encontrada: {', '.join(desconhecidas)}"}), 404
+
+    data_ini = request.args.get("data_ini", "")
+    data_fim = request.args.get("data_fim", "") or data_ini
+    hora_ini = request.args.get("hora_ini", "")
+    hora_fim = request.args.get("hora_fim", "")
+    try:
+        dia_ini = datetime_para_epoch(datetime.strptime(data_ini, "%Y-%m-%d")) // SEGUNDOS_DIA if data_ini else None
+        dia_fim = datetime_para_epoch(datetime.strptime(data_fim, "%Y-%m-%d")) // SEGUNDOS_DIA if data_fim else None
+    except ValueError:
+        return jsonify({"erro": "Datas no formato AAAA-MM-DD."}), 400
+    if dia_ini is not None and dia_fim < dia_ini:
+        return jsonify({"erro": "A data final é anterior à inicial."}), 400
+
+    cursor = request.args.get("cursor", "")
+    try:
+        direcao, chave = _ler_cursor(cursor) if cursor else ("m", None)
+    except ValueError:
+        return jsonify({"erro": "Cursor inválido."}), 400
+    if direcao != "m":
+        return jsonify({"erro": "Cursor inválido."}), 400
+
+    cfg = ConfigSistema.get()
+    por_pagina = cfg.get("max_por_pagina", 50) if cfg else 50
+
+    versoes, indices = {}, {}
+    for k in chaves:
+        versoes[k], indices[k] = obter_cache_versionado(k)
+    versao = ",".join(versoes[k] for k in chaves)
+    consulta = f"{','.join(chaves)}|{data_ini}|{data_fim}|{hora_ini}|{hora_fim}|{cursor}|{por_pagina}"
+    etag = hashlib.sha1(f"{versao}|{consulta}".encode("utf-8")).hexdigest()[:32]
+    if request.if_none_match.contains(etag):
+        resposta = Response(status=304)
+        resposta.set_etag(etag)
+        resposta.cache_control.private = True
+        resposta.cache_control.no_cache = True
+        return resposta
+
+    def hora_em_seg(h, padrao):
+        try:
+            t = datetime.strptime(h, "%H:%M").time() if h else padrao
+        except ValueError:
+            t = padrao
+        return t.hour * 3600 + t.minute * 60
+
+    seg_ini = hora_em_seg(hora_ini, time(0, 0))
+    seg_fim = hora_em_seg(hora_fim, time(23, 59)) + 59
+
+    fontes, totais = [], {}
+    for k in chaves:
+        indice = indices[k]
+        if dia_ini is None and dia_fim is None and not (hora_ini or hora_fim):
+            faixas = [(0, len(indice))] if len(indice) else []
+        else:
+            faixas = indice.faixas_por_horario(seg_ini, seg_fim, dia_ini, dia_fim)
+        fontes.append((k, indice, faixas))
+        totais[k] = sum(hi - lo for lo, hi in faixas)
+
+    itens, proxima = mesclar_radios(fontes, por_pagina, antes=chave)
+
+    resposta = jsonify({
+        "radios": chaves,
+        "total": sum(totais.values()),
+        "totais": totais,
+        "per_page": por_pagina,
+        "itens": itens,
+        "next": _cursor("m", itens[-1]) if proxima else None,
+    })
+    resposta.set_etag(etag)
+    resposta.cache_control.private = True
+    resposta.cache_control.no_cache = True
+    return resposta
 
 
 # -------------------------------------------------------------------------
@@ -116,7 +269,8 @@ def selecionar_radio(radio_key):
         return redirect(url_for("radio.select_radio"))
 
     data_hoje = datetime.now().strftime("%Y-%m-%d")
-    return render_template("lista_audios.html", radio=radio, data_hoje=data_hoje)
+    return render_template("lista_audios.html", radio={"key": radio_key, **radio}, data_hoje=data_hoje,
+                           previa_disponivel=previas.disponivel())
 
 
 @bp_radio.route("/select_radio")
@@ -154,28 +308,195 @@ def recortar_audio(radio_key):
             return abort(404, "Arquivo não encontrado")
 
         nome_arquivo = arquivo.name
+        try:
+            duracao = recorte.posicao_no_tempo(arquivo, 0)[2]  # tabela de busca / cabeçalho WAV
+        except (OSError, ValueError):
+            duracao = None
         return render_template(
             "recortar_audio.html",
             radio={"key": radio_key, **radio},
             subpath=subpath,   # <- variável que o template usa
             nome_arquivo=nome_arquivo,
+            duracao=duracao,
+            posicao=request.args.get("t", type=float),  # segundos (busca por horário)
             filtros={"data": "", "hora_ini": "", "hora_fim": ""},
         )
 
-    # (Se houver POST para exportar/recortar, permanece como está. 
-    #  Caso leia "path" do form, adaptar para "subpath" futuramente.)
-    flash("Método não suportado nesta fase.", "warning")
-    return redirect(url_for("radio.selecionar_radio", radio_key=radio_key))
+    # Modo POST → exporta o trecho [inicio, fim] (segundos, "mm:ss" ou "hh:mm:ss")
+    return _exportar_recorte(request.values)
+
+
+def _segundos(valor):
+    """Converte "90", "90.5", "01:30" ou "00:01:30.5" em segundos."""
+    texto = str(valor or "").strip()
+    partes = texto.replace(",", ".").split(":")
+    try:
+        if not partes[0] or len(partes) > 3:
+            raise ValueError
+        segundos = 0.0
+        for parte in partes:
+            segundos = segundos * 60 + float(parte)
+        if not math.isfinite(segundos):  # float() aceita "inf" e "nan"
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"Tempo inválido: '{texto}'.")
+    return segundos
+
+
+def _exportar_recorte(form):
+    """Recorta sem decodificar; `formato` diferente do original converte via pydub."""
+    subpath = form.get("subpath", "")
+    base_dir = Path(os.getcwd()) / "media_drive"
+    arquivo = (base_dir / Path(*subpath.split("/"))).resolve()
+    try:
+        arquivo.relative_to(base_dir)
+    except ValueError:
+        return abort(403, "Acesso negado: caminho fora do diretório base")
+    if not subpath or not arquivo.is_file():
+        return abort(404, "Arquivo não encontrado")
+
+    try:
+        inicio, fim = _segundos(form.get("inicio")), _segundos(form.get("fim"))
+        extensao = arquivo.suffix.lower()
+        formato = (form.get("formato") or extensao).lower().lstrip(".")
+        nome = f"{arquivo.stem}_{inicio:.0f}-{fim:.0f}s.{formato}"
+        cabecalhos = {"Content-Disposition": f'attachment; filename="{nome}"'}
+
+        if formato == extensao.lstrip("."):
+            corpo, tamanho, _ext, _duracao = recorte.recortar(arquivo, inicio, fim)
+            rv = Response(corpo, mimetype=MIMETYPES.get(extensao), headers=cabecalhos)
+            rv.content_length = tamanho
+            return rv
+
+        try:
+            dados = recorte.converter(arquivo, inicio, fim, formato)
+        except Exception as e:  # pydub/ffmpeg ausente ou formato desconhecido
+            print(f"⚠️ [RECORTE] Falha ao converter para {formato}:", e)
+            return jsonify({"erro": f"Conversão para {formato} indisponível."}), 500
+        return Response(dados, mimetype=MIMETYPES.get(f".{formato}", "application/octet-stream"),
+                        headers=cabecalhos)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
 
 
 # -------------------------------------------------------------------------
-# 📡 SERVIR ÁUDIO POR SUBPATH — seguro + suporte a Range
+# 🗜️ EXPORTAÇÃO EM LOTE (vários recortes num ZIP em fluxo)
 # -------------------------------------------------------------------------
+def _preparar_recorte(arquivo, inicio, fim):
+    corpo, tamanho, _extensao, _duracao = recorte.recortar(arquivo, inicio, fim)
+    return corpo, tamanho
+
+
+@bp_radio.route("/radio/exportar", methods=["POST"])
+@login_required
+def exportar_lote():
+    """ZIP com vários recortes: {"itens": [{"subpath", "inicio", "fim"}, ...], "nome"?}.
+
+    O andamento fica em /radio/exportar/<tarefa> (id no cabeçalho X-Tarefa),
+    visível só para quem iniciou a exportação.
+    """
+    dados = request.get_json(silent=True)
+    if dados is None:
+        try:
+            dados = {"itens": json.loads(request.form.get("itens") or "[]"), "nome": request.form.get("nome")}
+        except ValueError:
+            return jsonify({"erro": "Campo 'itens' não é um JSON válido."}), 400
+    if not isinstance(dados, dict):
+        return jsonify({"erro": "Corpo deve ser um objeto JSON."}), 400
+    itens = dados.get("itens") or []
+    if not isinstance(itens, list) or not itens:
+        return jsonify({"erro": "Informe ao menos um recorte em 'itens'."}), 400
+    if len(itens) > exportacao.MAX_RECORTES_LOTE:
+        return jsonify({"erro": f"Máximo de {exportacao.MAX_RECORTES_LOTE} recortes por lote."}), 400
+
+    # Validação barata antes do primeiro byte (depois dele não há como dar 400);
+    # os quadros/amostras de cada recorte só são localizados na vez dele.
+    base_dir = Path(os.getcwd()) / "media_drive"
+    recortes = []
+    for n, it in enumerate(itens, start=1):
+        try:
+            subpath = str(it.get("subpath") or "")
+            arquivo = (base_dir / Path(*subpath.split("/"))).resolve()
+            if not arquivo.is_relative_to(base_dir):
+                return jsonify({"erro": f"Item {n}: acesso negado (caminho fora do diretório base)."}), 403
+            if not subpath or not arquivo.is_file():
+                raise ValueError("arquivo não encontrado.")
+            extensao = arquivo.suffix.lower()
+            if extensao not in recorte.EXTENSOES_RECORTE:
+                raise ValueError(f"formato não suportado para recorte: {extensao}")
+            inicio, fim = _segundos(it.get("inicio")), _segundos(it.get("fim"))
+            if inicio < 0 or fim <= inicio:
+                raise ValueError("intervalo de recorte inválido.")
+        except (AttributeError, ValueError) as e:
+            return jsonify({"erro": f"Item {n}: {e}"}), 400
+        nome = f"{n:03d}_{arquivo.stem}_{inicio:.0f}-{fim:.0f}s{extensao}"
+        data_hora = datetime.fromtimestamp(arquivo.stat().st_mtime).timetuple()[:6]
+        recortes.append((nome, data_hora, partial(_preparar_recorte, arquivo, inicio, fim)))
+
+    tarefa = exportacao.nova_tarefa(len(recortes), session["user"]["usuario"])
+    nome_zip = secure_filename(dados.get("nome") or "") or f"recortes_{datetime.now():%Y%m%d_%H%M%S}"
+    return Response(
+        exportacao.gerar_zip(recortes, tarefa),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{nome_zip}.zip"', "X-Tarefa": tarefa},
+    )
+
+
+@bp_radio.route("/radio/exportar/<tarefa>")
+@login_required
+def andamento_exportacao(tarefa):
+    """Andamento de uma exportação em lote (recortes concluídos, bytes enviados)."""
+    estado = exportacao.andamento(tarefa, session["user"]["usuario"])
+    if estado is None:
+        return jsonify({"erro": "Tarefa não encontrada."}), 404
+    return jsonify(estado)
+
+
+# -------------------------------------------------------------------------
+# 📡 SERVIR ÁUDIO POR SUBPATH — seguro + Range, ETag e zero-copy
+# -------------------------------------------------------------------------
+def _acompanhar_stream(resposta, inicio):
+    """Conta o stream como ativo até o fim do envio da resposta."""
+    metricas.STREAM_REQUISICOES.inc(status=resposta.status_code)
+    metricas.STREAM_ATIVOS.inc()
+
+    def _fim():
+        metricas.STREAM_ATIVOS.dec()
+        metricas.STREAM_BYTES.inc(resposta.content_length or 0)
+        metricas.STREAM_SEGUNDOS.observar(perf_counter() - inicio)
+
+    corpo = resposta.response
+    if resposta.direct_passthrough and hasattr(corpo, "close"):
+        # O file wrapper (sendfile) vai direto ao servidor, sem os callbacks
+        # de call_on_close: o fim do envio é o close() do próprio wrapper.
+        fechar = corpo.close
+
+        def _fechar():
+            try:
+                fechar()
+            finally:
+                _fim()
+
+        corpo.close = _fechar
+    else:
+        resposta.call_on_close(_fim)
+    return resposta
+
+
 @bp_radio.route("/media/<path:subpath>")
 @login_required
 def servir_audio(subpath):
-    """Serve arquivos MP3/WAV de dentro de media_drive com segurança, com suporte a Range."""
-    import re as _re
+    """Serve arquivos MP3/WAV de dentro de media_drive (Range, 304 e sendfile)."""
+    inicio = perf_counter()
+    try:
+        resposta = _servir_audio(subpath)
+    except HTTPException as e:
+        metricas.STREAM_REQUISICOES.inc(status=e.code)
+        raise
+    return _acompanhar_stream(resposta, inicio)
+
+
+def _servir_audio(subpath):
     base_dir = Path(os.getcwd()) / "media_drive"
     arquivo = (base_dir / Path(*subpath.split("/"))).resolve()
     try:
@@ -185,37 +506,156 @@ def servir_audio(subpath):
     if not arquivo.exists() or not arquivo.is_file():
         return abort(404)
 
-    file_size = arquivo.stat().st_size
-    range_header = request.headers.get("Range")
-    if range_header:
-        m = _re.match(r"bytes=(\d*)-(\d*)", range_header)
-        if m:
-            start = int(m.group(1)) if m.group(1) else 0
-            end = int(m.group(2)) if m.group(2) else file_size - 1
-            start = max(0, start); end = min(end, file_size - 1)
-            length = end - start + 1
-
-            def generate():
-                with open(arquivo, "rb") as f:
-                    f.seek(start)
-                    remaining = length
-                    chunk = 8192
-                    while remaining > 0:
-                        data = f.read(min(chunk, remaining))
-                        if not data:
-                            break
-                        remaining -= len(data)
-                        yield data
-
-            rv = Response(
-                generate(),
-                status=206,
-                mimetype="audio/mpeg" if arquivo.suffix.lower()==".mp3" else "audio/wav"
-            )
-            rv.headers.add("Content-Range", f"bytes {start}-{end}/{file_size}")
-            rv.headers.add("Accept-Ranges", "bytes")
-            rv.headers.add("Content-Length", str(length))
-            return rv
+    # ?previa=mp3|opus: versão em baixa taxa (o original segue para o recorte)
+    formato = request.args.get("previa")
+    if formato:
+        try:
+            try:
+                destino, mimetype = previas.obter_previa(arquivo, formato)
+                return servir_arquivo(destino, mimetype)
+            except FileNotFoundError:  # descartada do cache no meio do caminho: gera de novo
+                destino, mimetype = previas.obter_previa(arquivo, formato)
+                return servir_arquivo(destino, mimetype)
+        except ValueError as e:
+            if formato not in previas.FORMATOS:
+                return abort(400, description=str(e))
+            print(f"⚠️ [PRÉVIA] {e} Enviando o original.")
+        except Exception as e:
+            print(f"⚠️ [PRÉVIA] Falha em {arquivo.name}: {e}. Enviando o original.")
+
+    return servir_arquivo(arquivo)
+
+
+# -------------------------------------------------------------------------
+# 🎞️ LINHA DO TEMPO CONTÍNUA E BUSCA POR HORÁRIO DE TRANSMISSÃO
+# -------------------------------------------------------------------------
+@bp_radio.route("/radio/<radio_key>/continuo")
+@login_required
+def audio_continuo(radio_key):
+    """Intervalo de horário (?inicio=...&fim=..., ISO) tocado como um único áudio com Range."""
+    inicio = perf_counter()
+    if radio_key not in carregar_radios_config():
+        return jsonify({"erro": "Rádio não encontrada"}), 404
+    try:
+        ini = datetime_para_epoch(datetime.fromisoformat(request.args.get("inicio", "")))
+        fim = datetime_para_epoch(datetime.fromisoformat(request.args.get("fim", "")))
+    except ValueError:
+        return jsonify({"erro": "Informe inicio e fim como AAAA-MM-DDTHH:MM[:SS]."}), 400
+    try:
+        linha = continuo.montar_linha(obter_cache(radio_key), ini, fim)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    if linha is None:
+        return jsonify({"erro": "Nenhuma gravação no intervalo."}), 404
+
+    resposta = servir_virtual(linha.tamanho, linha.ler, MIMETYPES[linha.extensao],
+                              linha.etag, linha.modificado)
+    resposta.headers["X-Duracao"] = f"{linha.duracao:.3f}"
+    resposta.headers["X-Arquivos"] = str(len(linha.partes))
+    return _acompanhar_stream(resposta, inicio)
+
+
+@bp_radio.route("/radio/<radio_key>/posicao")
+@login_required
+def posicao_horario(radio_key):
+    """Horário de transmissão (?instante=ISO) → gravação, offset em bytes e segundos."""
+    if radio_key not in carregar_radios_config():
+        return jsonify({"erro": "Rádio não encontrada"}), 404
+    try:
+        instante = datetime.fromisoformat(request.args.get("instante", ""))
+        epoch = datetime_para_epoch(instante) + instante.microsecond / 1e6
+    except ValueError:
+        return jsonify({"erro": "Informe instante como AAAA-MM-DDTHH:MM[:SS]."}), 400
+
+    posicao = continuo.localizar(obter_cache(radio_key), epoch)
+    if posicao is None:
+        return jsonify({"erro": "Nenhuma gravação a partir desse horário."}), 404
+    posicao["url"] = url_for("radio.servir_audio", subpath=posicao["subpath"])
+    posicao["recortar"] = url_for("radio.recortar_audio", radio_key=radio_key,
+                                  subpath=posicao["subpath"], t=posicao["segundos"])
+    return jsonify(posicao)
+
+
+@bp_radio.route("/radio/<radio_key>/eventos")
+@login_required
+def eventos_radio(radio_key):
+    """Fluxo SSE com as gravações novas e as atualizações do cache da rádio.
+
+    Cada conexão ocupa uma thread do servidor até o fluxo terminar (ver
+    eventos.MAX_DURACAO_FLUXO_SEG): em produção, use worker gevent ou threads.
+    """
+    if radio_key not in carregar_radios_config():
+        return jsonify({"erro": "Rádio não encontrada"}), 404
+    obter_cache(radio_key)  # garante a rádio em memória antes de assinar
+    ultimo_id = request.headers.get("Last-Event-ID") or request.args.get("ultimo")
+    rv = Response(eventos.assinar(radio_key, ultimo_id), mimetype="text/event-stream")
+    rv.headers["Cache-Control"] = "no-cache"
+    rv.headers["X-Accel-Buffering"] = "no"  # proxy reverso (nginx) não deve acumular o fluxo
+    return rv
+
+
+@bp_radio.route("/radio/<radio_key>/calendario")
+@login_required
+def calendario_audios(radio_key):
+    """Resumo por dia do mês (?mes=AAAA-MM): arquivos, bytes, primeira/última gravação, lacunas."""
+    if radio_key not in carregar_radios_config():
+        return jsonify({"erro": "Rádio não encontrada"}), 404
+    mes = request.args.get("mes") or datetime.now().strftime("%Y-%m")
+    try:
+        inicio = datetime.strptime(mes, "%Y-%m")
+    except ValueError:
+        return jsonify({"erro": "Use ?mes=AAAA-MM."}), 400
+
+    versao, _indice = obter_cache_versionado(radio_key)  # carrega a rádio (e seu resumo) se preciso
+    rv = jsonify({"mes": mes, "dias": resumo_dias.resumo_mes(radio_key, inicio.year, inicio.month)})
+    rv.set_etag(f"{versao}-{mes}")
+    rv.cache_control.private = True
+    rv.cache_control.no_cache = True
+    return rv.make_conditional(request)
+
+
+# -------------------------------------------------------------------------
+# 🌊 PICOS DA FORMA DE ONDA (wavesurfer)
+# -------------------------------------------------------------------------
+@bp_radio.route("/radio/picos/<path:subpath>")
+@login_required
+def picos_audio(subpath):
+    """Picos min/max pré-calculados do arquivo (cache em disco por versão)."""
+    base_dir = Path(os.getcwd()) / "media_drive"
+    arquivo = (base_dir / Path(*subpath.split("/"))).resolve()
+    try:
+        arquivo.relative_to(base_dir)
+    except ValueError:
+        return abort(403)
+    if not arquivo.is_file():
+        return abort(404)
+
+    try:
+        dados, chave = picos.obter_picos(arquivo)
+    except ValueError as e:
+        # Sem picos (ex.: MP3 sem ffmpeg): o player decodifica no navegador
+        return jsonify({"erro": str(e)}), 404
+
+    rv = jsonify(dados)
+    rv.set_etag(chave)
+    rv.cache_control.private = True
+    rv.cache_control.no_cache = True
+    return rv.make_conditional(request)
+
+
+# -------------------------------------------------------------------------
+# 🔄 ATUALIZAÇÃO MANUAL DO CACHE (painel de status)
+# -------------------------------------------------------------------------
+@bp_radio.route("/radio/<radio_key>/atualizar-cache", methods=["POST"])
+@admin_required
+def atualizar_cache_manual(radio_key):
+    """Agenda a atualização do cache; `?completo=1` força a varredura completa."""
+    radios_cfg = carregar_radios_config()
+    if radio_key not in radios_cfg:
+        flash("Rádio não encontrada.", "danger")
+        return redirect(url_for("admin.status_cache"))
 
-    # Resposta completa (sem Range)
-    return send_file(str(arquivo), mimetype="audio/mpeg" if arquivo.suffix.lower()==".mp3" else "audio/wav")
+    completo = request.form.get("completo") in ("1", "true", "on")
+    solicitar_atualizacao(radio_key, radios_cfg[radio_key], completo=completo)
+    flash(f"Atualização do cache da rádio '{radio_key}' iniciada em segundo plano.", "info")
+    return redirect(url_for("admin.status_cache"))
@@ -0,0 +1,218 @@
+# mod_radio/streaming.py
+"""Envio de arquivos de áudio com Range, validação condicional e zero-copy.
+
+- ETag/Last-Modified em toda resposta; If-None-Match / If-Modified-Since → 304.
+- Range simples, sufixo (`bytes=-N`) e múltiplas faixas (multipart/byteranges);
+  If-Range; 416 quando nenhuma faixa cabe no arquivo.
+- Faixa única e arquivo inteiro vão pelo `wsgi.file_wrapper` do servidor: o
+  gunicorn usa sendfile() (o kernel copia direto do disco para o socket).
+  Sem wrapper, a leitura é em blocos grandes e alinhados.
+- `servir_virtual` aplica as mesmas regras a um recurso montado em tempo de
+  requisição (ex.: várias gravações em sequência), sem arquivo em disco.
+"""
+import os
+import uuid
+from datetime import datetime, timezone
+
+from flask import Response, request
+from werkzeug.http import is_resource_modified
+from werkzeug.wsgi import wrap_file
+
+BLOCO_LEITURA = 256 * 1024  # leituras alinhadas a este tamanho
+MAX_FAIXAS = 16  # pedidos com mais faixas recebem o arquivo inteiro
+
+MIMETYPES = {".mp3": "audio/mpeg", ".wav": "audio/wav"}
+
+
+class _TrechoArquivo:
+    """Arquivo limitado a [inicio, inicio + tamanho).
+
+    Expõe `fileno()` com a posição já em `inicio`: o sendfile do servidor
+    (que usa a posição atual e o Content-Length) envia exatamente o trecho.
+    As leituras terminam em múltiplos de BLOCO_LEITURA.
+    """
+
+    def __init__(self, caminho, inicio, tamanho):
+        self._f = open(caminho, "rb", buffering=0)
+        self._f.seek(inicio)
+        self._pos = inicio
+        self._restante = tamanho
+
+    def read(self, _n=-1):
+        if self._restante <= 0:
+            return b""
+        n = min(self._restante, BLOCO_LEITURA - self._pos % BLOCO_LEITURA)
+        dados = self._f.read(n)
+        self._pos += len(dados)
+        self._restante -= len(dados)
+        return dados
+
+    def fileno(self):
+        return self._f.fileno()
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        self._f.close()
+
+
+def ler_trecho(f, inicio, fim):
+    """Lê [inicio, fim) de `f` em blocos alinhados."""
+    pos = inicio
+    f.seek(inicio)
+    while pos < fim:
+        dados = f.read(min(fim - pos, BLOCO_LEITURA - pos % BLOCO_LEITURA))
+        if not dados:
+            break
+        pos += len(dados)
+        yield dados
+
+
+def etag_arquivo(st):
+    """ETag forte a partir de mtime (ns) e tamanho: muda quando o arquivo muda."""
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+# -------------------------------------------------------------------------
+# 🎯 FAIXAS (RFC 9110 §14)
+# -------------------------------------------------------------------------
+def _faixas_pedidas(cabecalho, tamanho):
+    """Lista de (inicio, fim) satisfazíveis, ordenadas e sem sobreposição.
+
+    Retorna None se o cabeçalho for inválido (ignora-se o Range) e [] se
+    nenhuma faixa couber no arquivo (416).
+    """
+    unidade, _, especificacao = (cabecalho or "").partition("=")
+    if unidade.strip().lower() != "bytes":
+        return None
+
+    faixas = []
+    for parte in especificacao.split(","):
+        ini, separador, fim = parte.strip().partition("-")
+        ini, fim = ini.strip(), fim.strip()
+        if not parte.strip():
+            continue
+        if not separador or not (ini or fim) or not (ini + fim).isdigit():
+            return None
+        if not ini:  # sufixo: os últimos N bytes
+            inicio, fim = max(0, tamanho - int(fim)), tamanho
+        else:
+            inicio = int(ini)
+            if fim and int(fim) < inicio:
+                return None
+            fim = min(int(fim) + 1, tamanho) if fim else tamanho
+        if inicio < fim:
+            faixas.append((inicio, fim))
+
+    faixas.sort()
+    unidas = []
+    for inicio, fim in faixas:
+        if unidas and inicio <= unidas[-1][1]:
+            unidas[-1] = (unidas[-1][0], max(unidas[-1][1], fim))
+        else:
+            unidas.append((inicio, fim))
+    return unidas
+
+
+def _multipart(ler, faixas, tamanho, mimetype, separador):
+    """Corpo multipart/byteranges e seu tamanho total (para o Content-Length)."""
+    cabecalhos = [
+        (f"--{separador}\r\nContent-Type: {mimetype}\r\n"
+         f"Content-Range: bytes {inicio}-{fim - 1}/{tamanho}\r\n\r\n").encode()
+        for inicio, fim in faixas
+    ]
+    rodape = f"\r\n--{separador}--\r\n".encode()
+    total = sum(len(c) + (fim - inicio) for c, (inicio, fim) in zip(cabecalhos, faixas))
+    total += 2 * (len(faixas) - 1) + len(rodape)
+
+    def gerar():
+        for i, (cab, (inicio, fim)) in enumerate(zip(cabecalhos, faixas)):
+            yield (b"\r\n" + cab) if i else cab
+            yield from ler(inicio, fim)
+        yield rodape
+
+    return gerar(), total
+
+
+# -------------------------------------------------------------------------
+# 📡 RESPOSTA
+# -------------------------------------------------------------------------
+def servir_arquivo(caminho, mimetype=None):
+    """Resposta HTTP para o arquivo, respeitando Range e cabeçalhos condicionais."""
+    caminho = str(caminho)
+    st = os.stat(caminho)
+    mimetype = mimetype or MIMETYPES.get(os.path.splitext(caminho)[1].lower(), "application/octet-stream")
+
+    def ler(inicio, fim):
+        with open(caminho, "rb", buffering=0) as f:
+            yield from ler_trecho(f, inicio, fim)
+
+    def direto(inicio, fim):
+        return wrap_file(request.environ, _TrechoArquivo(caminho, inicio, fim - inicio), BLOCO_LEITURA)
+
+    return _responder(st.st_size, ler, mimetype, etag_arquivo(st),
+                      datetime.fromtimestamp(int(st.st_mtime), timezone.utc), direto)
+
+
+def servir_virtual(tamanho, ler, mimetype, etag, modificado):
+    """Resposta para um recurso virtual de `tamanho` bytes lido por `ler(inicio, fim)`."""
+    return _responder(tamanho, ler, mimetype, etag, modificado)
+
+
+def _responder(tamanho, ler, mimetype, etag, modificado, direto=None):
+    """Range, If-Range e 304 comuns; `direto(inicio, fim)` dá um corpo zero-copy."""
+
+    def _corpo(inicio, fim):
+        if direto is not None:
+            return direto(inicio, fim), True
+        return ler(inicio, fim), False
+
+    def _resposta(corpo=None, status=200, **kw):
+        rv = Response(corpo, status=status, **kw)
+        rv.set_etag(etag)
+        rv.last_modified = modificado
+        rv.headers["Accept-Ranges"] = "bytes"
+        rv.cache_control.private = True
+        rv.cache_control.no_cache = True  # pode guardar, mas revalida (304)
+        return rv
+
+    # 304: o navegador já tem esta versão
+    if not is_resource_modified(request.environ, etag=etag, last_modified=modificado):
+        return _resposta(status=304)
+
+    faixas = None
+    if "Range" in request.headers and tamanho:
+        # If-Range com validador diferente: ignora o Range e envia tudo
+        if_range_ok = "If-Range" not in request.headers or not is_resource_modified(
+            request.environ, etag=etag, last_modified=modificado, ignore_if_range=False
+        )
+        if if_range_ok:
+            faixas = _faixas_pedidas(request.headers["Range"], tamanho)
+
+    if faixas == []:
+        rv = _resposta(status=416)
+        rv.headers["Content-Range"] = f"bytes */{tamanho}"
+        return rv
+    if faixas is not None and len(faixas) > MAX_FAIXAS:
+        faixas = None
+
+    if faixas is None:
+        corpo, passagem = _corpo(0, tamanho)
+        rv = _resposta(corpo, mimetype=mimetype, direct_passthrough=passagem)
+        rv.content_length = tamanho
+        return rv
+
+    if len(faixas) == 1:
+        inicio, fim = faixas[0]
+        corpo, passagem = _corpo(inicio, fim)
+        rv = _resposta(corpo, status=206, mimetype=mimetype, direct_passthrough=passagem)
+        rv.content_length = fim - inicio
+        rv.headers["Content-Range"] = f"bytes {inicio}-{fim - 1}/{tamanho}"
+        return rv
+
+    separador = uuid.uuid4().hex
+    corpo, total = _multipart(ler, faixas, tamanho, mimetype, separador)
+    rv = _resposta(corpo, status=206, content_type=f"multipart/byteranges; boundary={separador}")
+    rv.content_length = total
+    return rv
@@ -0,0 +1,74 @@
+# mod_radio/travas.py
+"""Travas entre processos por arquivo (ex.: vários workers do gunicorn).
+
+Uma trava `adquirir`-ida fica com o processo até ele terminar — o sistema
+operacional a libera junto com o arquivo, mesmo se o processo morrer.
+Processos criados por fork (ex.: `gunicorn --preload`) não herdam a posse:
+o arquivo aberto vem junto, mas a trava continua sendo do processo pai.
+"""
+import os
+from contextlib import contextmanager
+
+PASTA_TRAVAS = os.getcwd()
+
+_TRAVAS = {}  # nome -> arquivo aberto (mantém a trava viva)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_TRAVAS.clear)
+
+try:
+    import fcntl
+
+    def _travar(f):
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _soltar(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _travar(f):
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _soltar(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _abrir(nome):
+    return open(os.path.join(PASTA_TRAVAS, f".{nome}.lock"), "a+")
+
+
+def adquirir(nome):
+    """Tenta ficar com a trava `nome` até o fim do processo. True se conseguiu."""
+    if nome in _TRAVAS:
+        return True
+    f = _abrir(nome)
+    if not _travar(f):
+        f.close()
+        return False
+    _TRAVAS[nome] = f
+    return True
+
+
+@contextmanager
+def exclusivo(nome):
+    """Bloco executado por um processo de cada vez; produz False se outro já está nele."""
+    f = _abrir(nome)
+    try:
+        obtida = _travar(f)
+        try:
+            yield obtida
+        finally:
+            if obtida:
+                _soltar(f)
+    finally:
+        f.close()
@@ -0,0 +1,102 @@
+# tests/conftest.py
+"""Ambiente isolado para os testes: tudo que a aplicação grava vai para tmp_path."""
+import math
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from mod_radio import audio_cache, audio_db, picos, previas, resumo_dias, travas  # noqa: E402
+from mod_radio.audio_indice import IndiceAudios  # noqa: E402
+
+# MPEG-1 camada III, 128 kbps, 44100 Hz, estéreo: quadros de 417 bytes
+CABECALHO_MP3 = bytes([0xFF, 0xFB, 0x90, 0x64])
+TAMANHO_QUADRO = 417
+SEG_QUADRO = 1152 / 44100
+
+
+@pytest.fixture(autouse=True)
+def ambiente(tmp_path, monkeypatch):
+    """cwd, banco do índice e pastas de cache dentro de tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(audio_db, "INDEX_DB_PATH", str(tmp_path / "audio_index.db"))
+    monkeypatch.setattr(audio_db, "_BANCO_PRONTO", False)
+    monkeypatch.setattr(audio_cache, "CACHE_PATH", str(tmp_path / "cache_local.json"))
+    monkeypatch.setattr(previas, "PASTA_PREVIAS", str(tmp_path / "cache_previas"))
+    monkeypatch.setattr(picos, "PASTA_PICOS", str(tmp_path / "cache_picos"))
+    monkeypatch.setattr(travas, "PASTA_TRAVAS", str(tmp_path))
+    monkeypatch.setattr(resumo_dias, "RESUMOS", {})
+    # Estado em memória ligado ao banco de cada teste (outros módulos guardam referência)
+    memoria = (audio_cache.CACHE_AUDIOS, audio_cache.CACHE_TIMESTAMP, audio_cache.CACHE_PASTAS,
+               audio_cache.CACHE_VARREDURA, audio_cache.CACHE_VERSAO, audio_db._PREFIXOS)
+    for d in memoria:
+        d.clear()
+    (tmp_path / "media_drive").mkdir()
+    yield tmp_path
+    for d in memoria:
+        d.clear()
+
+
+@pytest.fixture
+def media(ambiente):
+    return ambiente / "media_drive"
+
+
+@pytest.fixture
+def radios(media, monkeypatch):
+    """Configuração com a rádio "clube" (pasta local media_drive/Radio_Clube)."""
+    from mod_radio import routes
+
+    pasta = media / "Radio_Clube"
+    pasta.mkdir()
+    config = {"clube": {"nome": "Rádio Clube", "pasta_base": str(pasta), "tipo_pasta": "local",
+                        "extensao": ".mp3", "parse_nome": "clube"}}
+    from mod_config import models
+
+    monkeypatch.setattr(models, "carregar_radios_config", lambda: config)
+    monkeypatch.setattr(audio_cache, "carregar_radios_config", lambda: config)
+    monkeypatch.setattr(routes, "carregar_radios_config", lambda: config)
+    monkeypatch.setattr(routes.ConfigSistema, "get", staticmethod(lambda: {"max_por_pagina": 50}))
+    return config
+
+
+@pytest.fixture
+def cliente():
+    """Cliente de teste com o blueprint da rádio e um usuário logado."""
+    from mod_radio.routes import bp_radio
+
+    app = Flask(__name__)
+    app.secret_key = "teste"
+    app.register_blueprint(bp_radio)
+    c = app.test_client()
+    with c.session_transaction() as s:
+        s["user"] = {"usuario": "teste", "tipo": "admin"}
+    return c
+
+
+def criar_mp3(caminho, quadros=200):
+    """MP3 sintético: `quadros` quadros CBR de áudio zerado."""
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_bytes((CABECALHO_MP3 + bytes(TAMANHO_QUADRO - 4)) * quadros)
+    return caminho
+
+
+def criar_wav(caminho, segundos=3, taxa=8000):
+    """WAV PCM 16 bits mono com uma senoide."""
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    dados = b"".join(struct.pack("<h", int(10000 * math.sin(i / 10))) for i in range(taxa * segundos))
+    fmt = struct.pack("<HHIIHH", 1, 1, taxa, taxa * 2, 2, 16)
+    caminho.write_bytes(b"RIFF" + struct.pack("<I", 36 + len(dados)) + b"WAVE"
+                        + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+                        + b"data" + struct.pack("<I", len(dados)) + dados)
+    return caminho
+
+
+def criar_indice(chaves, prefixo="r"):
+    """Índice a partir de pares (epoch, nome)."""
+    return IndiceAudios({"epoch": e, "nome": n, "bytes": 1, "subpath": f"{prefixo}/{n}"} for e, n in chaves)
@@ -0,0 +1,47 @@
+# tests/test_agendador.py
+"""Pedidos de atualização: varreduras compartilhadas e a completa pedida durante uma incremental."""
+import threading
+
+import pytest
+
+from mod_radio import agendador_cache, audio_cache
+
+
+@pytest.fixture
+def varreduras(monkeypatch):
+    """Substitui a varredura por uma que espera liberação e anota o modo."""
+    feitas, liberar, iniciou = [], threading.Event(), threading.Event()
+
+    def atualizar(radio_key, radio_cfg=None, completo=False):
+        iniciou.set()
+        liberar.wait(5)
+        feitas.append(completo)
+
+    monkeypatch.setattr(audio_cache, "atualizar_cache", atualizar)
+    monkeypatch.setattr(agendador_cache, "_EM_ANDAMENTO", {})
+    monkeypatch.setattr(agendador_cache, "_FILAS", {})
+    return feitas, liberar, iniciou
+
+
+def test_pedidos_concorrentes_compartilham_a_varredura(varreduras):
+    feitas, liberar, iniciou = varreduras
+    primeiro = agendador_cache.solicitar_atualizacao("teste-a")
+    iniciou.wait(5)
+    assert agendador_cache.solicitar_atualizacao("teste-a") is primeiro
+    liberar.set()
+    primeiro.result(5)
+    assert feitas == [False]
+
+
+def test_completa_durante_incremental_vai_para_a_fila(varreduras):
+    feitas, liberar, iniciou = varreduras
+    incremental = agendador_cache.solicitar_atualizacao("teste-b")
+    iniciou.wait(5)
+    completa = agendador_cache.solicitar_atualizacao("teste-b", completo=True)
+    assert completa is not incremental
+    # Novos pedidos (de qualquer tipo) aproveitam a completa já enfileirada
+    assert agendador_cache.solicitar_atualizacao("teste-b") is completa
+    assert agendador_cache.solicitar_atualizacao("teste-b", completo=True) is completa
+    liberar.set()
+    completa.result(5)
+    assert feitas == [False, True]
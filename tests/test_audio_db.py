@@ -0,0 +1,87 @@
+# tests/test_audio_db.py
+"""Índice em SQLite: gravação incremental, leitura ordenada e migração do JSON."""
+import json
+
+import pytest
+
+from mod_radio import audio_db
+
+
+def _item(subpath, epoch, tamanho=1000, meta=None):
+    item = {"nome": subpath.rsplit("/", 1)[-1], "epoch": epoch, "bytes": tamanho, "subpath": subpath}
+    if meta:
+        item.update(zip(("duracao", "bitrate", "taxa", "canais"), meta))
+    return item
+
+
+def _chaves(indice):
+    return [(it["epoch"], it["subpath"]) for it in reversed(list(indice))]
+
+
+def test_ida_e_volta():
+    itens = [_item("Clube/2025/10/b.mp3", 200, meta=(600.0, 128, 44100, 2)),
+             _item("Clube/2025/10/a.mp3", 100),
+             _item("Clube/2025/11/c.mp3", 200),
+             _item("raiz.mp3", 50)]
+    pastas = {"Clube/2025/10": {"mtime": 1.5, "subpastas": []}, "Clube": {"mtime": 2.0, "subpastas": ["2025"]}}
+    audio_db.salvar_radio("clube", itens, [], pastas, [], "21/10/2025 10:00:00", 1.25, "clube")
+
+    indice = audio_db.carregar_indice("clube")
+    assert _chaves(indice) == [(50, "raiz.mp3"), (100, "Clube/2025/10/a.mp3"),
+                               (200, "Clube/2025/10/b.mp3"), (200, "Clube/2025/11/c.mp3")]
+    b = indice.item(indice.posicao("Clube/2025/10/b.mp3"))
+    assert (b["duracao"], b["bitrate"], b["taxa"], b["canais"], b["bytes"]) == (600.0, 128, 44100, 2, 1000)
+    assert "duracao" not in indice.item(indice.posicao("raiz.mp3"))
+
+    assert audio_db.carregar_pastas("clube") == pastas
+    assert audio_db.carregar_status() == {"clube": "21/10/2025 10:00:00"}
+    assert audio_db.carregar_duracoes() == {"clube": 1.25}
+    assert audio_db.carregar_parsers() == {"clube": "clube"}
+    assert audio_db.contar_por_radio() == {"clube": 4}
+    assert audio_db.carregar_indice("outra").subpaths == []
+
+
+def test_gravacao_incremental():
+    audio_db.salvar_radio("r", [_item("p/a.mp3", 1), _item("p/b.mp3", 2)], [],
+                          {"p": {"mtime": 1, "subpastas": []}}, [], None)
+    # Só o que mudou: b cresce, a sai, c entra, a pasta p some e q aparece
+    audio_db.salvar_radio("r", [_item("p/b.mp3", 2, 5000), _item("q/c.mp3", 3)], ["p/a.mp3"],
+                          {"q": {"mtime": 2, "subpastas": []}}, ["p"], None)
+    indice = audio_db.carregar_indice("r")
+    assert _chaves(indice) == [(2, "p/b.mp3"), (3, "q/c.mp3")]
+    assert indice.item(0)["bytes"] == 5000
+    assert set(audio_db.carregar_pastas("r")) == {"q"}
+
+
+def test_transacao_desfeita_nao_deixa_prefixo_fantasma():
+    with pytest.raises(KeyError):
+        audio_db.salvar_radio("r", [_item("nova/a.mp3", 1), {"subpath": "nova/b.mp3"}], [], {}, [], None)
+    assert audio_db.carregar_indice("r").subpaths == []
+    # O prefixo em cache teria id de uma linha desfeita
+    audio_db.salvar_radio("r", [_item("nova/a.mp3", 1)], [], {}, [], None)
+    assert audio_db.carregar_indice("r").subpaths == ["nova/a.mp3"]
+
+
+def test_busca_mp3_removida_com_o_arquivo():
+    audio_db.salvar_radio("r", [_item("p/a.mp3", 1)], [], {}, [], None)
+    audio_db.salvar_busca_mp3("p/a.mp3", 10, 20, 1152, 44100, 5, 999, 38, b"x")
+    assert audio_db.carregar_busca_mp3("p/a.mp3")["quadros"] == 5
+    audio_db.salvar_radio("r", [], ["p/a.mp3"], {}, [], None)
+    assert audio_db.carregar_busca_mp3("p/a.mp3") is None
+
+
+def test_importar_json_legado(ambiente):
+    legado = ambiente / "cache_local.json"
+    legado.write_text(json.dumps({
+        "audios": {"clube": [
+            {"nome": "a.mp3", "datahora": "21/10/2025 00:16:22", "tamanho": 2.0, "subpath": "Clube/a.mp3"},
+            {"path": "C:\\x\\media_drive\\Clube\\b.mp3", "epoch": 10, "bytes": 7},
+            {"nome": "sem_data.mp3"},
+        ]},
+        "timestamp": {"clube": "21/10/2025 10:00:00"},
+    }), encoding="utf-8")
+    assert audio_db.importar_json_legado(str(legado)) == 2
+    indice = audio_db.carregar_indice("clube")
+    assert sorted(indice.subpaths) == ["Clube/a.mp3", "Clube/b.mp3"]
+    assert indice.item(indice.posicao("Clube/a.mp3"))["bytes"] == 2048
+    assert audio_db.importar_json_legado(str(legado)) == 0  # índice já preenchido
@@ -0,0 +1,77 @@
+# tests/test_busca_mp3.py
+"""Tabela de busca dos MP3: offsets exatos, persistência no banco e invalidação."""
+import os
+import random
+from collections import OrderedDict
+
+import pytest
+
+from mod_radio import busca_mp3
+from mod_radio.recorte import quadros_mp3
+
+from conftest import CABECALHO_MP3, SEG_QUADRO, TAMANHO_QUADRO
+
+# Mesmo quadro com o bit de padding: um byte a mais
+CABECALHO_PADDING = bytes([0xFF, 0xFB, 0x92, 0x64])
+
+
+@pytest.fixture(autouse=True)
+def memoria_limpa(monkeypatch):
+    monkeypatch.setattr(busca_mp3, "_MEMORIA", OrderedDict())
+
+
+def _mp3_irregular(caminho, quadros, semente=17):
+    """MP3 com quadros de 417 ou 418 bytes: os offsets não são múltiplos fixos."""
+    rnd = random.Random(semente)
+    partes = []
+    for _ in range(quadros):
+        if rnd.random() < 0.5:
+            partes.append(CABECALHO_PADDING + bytes(TAMANHO_QUADRO - 3))
+        else:
+            partes.append(CABECALHO_MP3 + bytes(TAMANHO_QUADRO - 4))
+    caminho.write_bytes(b"".join(partes))
+    return caminho
+
+
+def _antigo(caminho):
+    """Arquivo já fechado (mtime antigo): a tabela pode ir para o banco."""
+    os.utime(caminho, (1_600_000_000, 1_600_000_000))
+    return caminho
+
+
+def test_offset_de_cada_quadro(media):
+    caminho = _mp3_irregular(media / "a.mp3", 300)
+    offsets, fim, _amostras, _taxa = quadros_mp3(caminho)
+    tabela = busca_mp3.tabela_mp3(caminho)
+    assert tabela.quadros == 300 and tabela.passo == round(1 / SEG_QUADRO)
+    assert tabela.duracao == pytest.approx(300 * SEG_QUADRO)
+    assert [tabela.offset(caminho, q) for q in range(300)] == offsets
+    assert tabela.offset(caminho, 300) == tabela.offset(caminho, 10_000) == fim
+
+
+def test_tabela_gravada_no_banco_e_relida(media, monkeypatch):
+    caminho = _antigo(_mp3_irregular(media / "a.mp3", 200))
+    original = busca_mp3.tabela_mp3(caminho)
+
+    busca_mp3._MEMORIA.clear()
+    monkeypatch.setattr(busca_mp3, "_construir", lambda c: pytest.fail("deveria vir do banco"))
+    relida = busca_mp3.tabela_mp3(caminho)
+    assert relida is not original
+    assert list(relida.pontos) == list(original.pontos)
+    assert (relida.quadros, relida.fim, relida.passo) == (original.quadros, original.fim, original.passo)
+
+
+def test_arquivo_gravando_nao_vai_para_o_banco(media, monkeypatch):
+    caminho = _mp3_irregular(media / "a.mp3", 50)  # mtime de agora
+    busca_mp3.tabela_mp3(caminho)
+    busca_mp3._MEMORIA.clear()
+    construidas = []
+    monkeypatch.setattr(busca_mp3, "_construir", lambda c: construidas.append(c) or "nova")
+    assert busca_mp3.tabela_mp3(caminho) == "nova" and construidas
+
+
+def test_arquivo_alterado_reconstroi(media):
+    caminho = _antigo(_mp3_irregular(media / "a.mp3", 100))
+    assert busca_mp3.tabela_mp3(caminho).quadros == 100
+    _antigo(_mp3_irregular(caminho, 150, semente=3))
+    assert busca_mp3.tabela_mp3(caminho).quadros == 150
@@ -0,0 +1,108 @@
+# tests/test_cobertura.py
+"""Cobertura das gravações: lacunas, sobreposições e consistência entre períodos."""
+import random
+
+import pytest
+
+from mod_radio import cobertura
+from mod_radio.audio_indice import SEGUNDOS_DIA, IndiceAudios
+
+D = 20000  # um dia qualquer (número de dias desde 1970)
+T = D * SEGUNDOS_DIA
+
+
+def _indice(gravacoes):
+    """Índice a partir de pares (início, duração); duração None = sem metadados."""
+    itens = []
+    for ini, dur in gravacoes:
+        item = {"epoch": ini, "nome": f"{ini}.mp3", "bytes": 1, "subpath": f"r/{ini}.mp3"}
+        if dur is not None:
+            item.update(duracao=dur, bitrate=128, taxa=44100, canais=2)
+        itens.append(item)
+    return IndiceAudios(itens)
+
+
+def _uniao(inicios, duracoes):
+    """Segundos cobertos por pelo menos uma gravação (referência ingênua)."""
+    total, fim_atual = 0, None
+    for ini, fim in sorted((i, i + d) for i, d in zip(inicios, duracoes)):
+        if fim_atual is None or ini > fim_atual:
+            total += fim - ini
+            fim_atual = fim
+        elif fim > fim_atual:
+            total += fim - fim_atual
+            fim_atual = fim
+    return total
+
+
+def test_folgas_casos_simples():
+    # 0-10, 20-30 (lacuna 10-20), 25-40 (sobreposição 25-30), 35-38 dentro do anterior
+    lacunas, sobreposicoes, alcance = cobertura._folgas_python([0, 20, 25, 35], [10, 10, 15, 3], 0)
+    assert lacunas == [(10, 20)]
+    assert sobreposicoes == [(25, 30), (35, 38)]
+    assert alcance == 40
+    assert cobertura.folgas([], []) == ([], [], None)
+
+
+def test_folgas_tolerancia():
+    lacunas, sobreposicoes, _ = cobertura._folgas_python([0, 603, 1198], [600, 600, 600], 5)
+    assert lacunas == [] and sobreposicoes == []
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_lacunas_batem_com_a_uniao(semente):
+    rnd = random.Random(semente)
+    inicios = sorted(rnd.randrange(0, 20000) for _ in range(200))
+    duracoes = [rnd.choice([60, 300, 600, 3000]) for _ in inicios]
+    lacunas, _sob, alcance = cobertura._folgas_python(inicios, duracoes, 0)
+    vazio = sum(b - a for a, b in lacunas)
+    assert alcance - inicios[0] - vazio == _uniao(inicios, duracoes)
+
+
+def test_numpy_igual_ao_python():
+    np = pytest.importorskip("numpy")
+    rnd = random.Random(7)
+    inicios = sorted(rnd.randrange(0, 50000) for _ in range(500))
+    duracoes = [rnd.choice([60, 600, 900]) for _ in inicios]
+    assert cobertura._folgas_numpy(np, inicios, duracoes, 5) == cobertura._folgas_python(inicios, duracoes, 5)
+
+
+def test_relatorio_de_um_dia():
+    # Gravações de 10 min o dia todo, menos a das 12:00; sem metadados vale a cadência
+    indice = _indice([(T + s, None) for s in range(0, SEGUNDOS_DIA, 600) if s != 12 * 3600])
+    (dia,) = cobertura.relatorio(indice, D, D, agora=T + 2 * SEGUNDOS_DIA)
+    assert dia["arquivos"] == 143
+    assert dia["lacunas"] == [{"inicio": "12:00:00", "fim": "12:10:00", "segundos": 600.0}]
+    assert dia["sem_audio_seg"] == 600.0
+    assert dia["cobertura"] == round(100 * (SEGUNDOS_DIA - 600) / SEGUNDOS_DIA, 2)
+
+
+def test_relatorio_termina_em_agora():
+    indice = _indice([(T, 3600)])
+    dias = cobertura.relatorio(indice, D, D + 5, agora=T + 2 * 3600)
+    assert len(dias) == 1
+    assert dias[0]["esperado_seg"] == 2 * 3600
+    assert dias[0]["lacunas"] == [{"inicio": "01:00:00", "fim": "02:00:00", "segundos": 3600.0}]
+
+
+@pytest.mark.parametrize("ini, fim", [(D + 1, D), (D, D + cobertura.MAX_DIAS_COBERTURA)])
+def test_relatorio_periodo_invalido(ini, fim):
+    with pytest.raises(ValueError):
+        cobertura.relatorio(_indice([]), ini, fim, agora=T)
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_cada_dia_igual_ao_do_periodo_inteiro(semente):
+    # Gravações irregulares, inclusive longas que atravessam a meia-noite
+    rnd = random.Random(semente)
+    gravacoes, t = [], T - SEGUNDOS_DIA
+    while t < T + 5 * SEGUNDOS_DIA:
+        dur = rnd.choice([600, 600, 600, 300, 5 * 3600, None])
+        gravacoes.append((t, dur))
+        t += rnd.choice([60, 300, 600, 600, 2400, 6 * 3600])
+    indice = _indice(gravacoes)
+    agora = T + 5 * SEGUNDOS_DIA - 3 * 3600
+
+    inteiro = cobertura.relatorio(indice, D, D + 4, agora=agora)
+    por_dia = [cobertura.relatorio(indice, d, d, agora=agora)[0] for d in range(D, D + 5)]
+    assert por_dia == inteiro
@@ -0,0 +1,76 @@
+# tests/test_eventos.py
+"""Fluxo SSE: retomada pelo Last-Event-ID, `recarregar` e fim do fluxo."""
+import json
+import threading
+
+import pytest
+
+from mod_radio import eventos
+
+from conftest import criar_indice
+
+
+@pytest.fixture(autouse=True)
+def buffers_limpos(monkeypatch):
+    for nome in ("_CONDICOES", "_EVENTOS", "_CONTADOR"):
+        monkeypatch.setattr(eventos, nome, {})
+
+
+def _eventos(mensagens):
+    """(tipo, dados) de cada mensagem com `event:`."""
+    saida = []
+    for msg in mensagens:
+        campos = dict(linha.split(": ", 1) for linha in msg.strip().splitlines() if ": " in linha)
+        if "event" in campos:
+            saida.append((campos["event"], json.loads(campos["data"])))
+    return saida
+
+
+def _id(n):
+    return f"{eventos.INSTANCIA_EVENTOS}.{n}"
+
+
+def test_retoma_depois_do_ultimo_id(monkeypatch):
+    monkeypatch.setattr(eventos, "MAX_DURACAO_FLUXO_SEG", 0)
+    for i in range(3):
+        eventos.publicar("r", "audio", {"i": i})
+    mensagens = list(eventos.assinar("r", _id(1)))
+    assert mensagens[0].startswith("retry:")
+    assert _eventos(mensagens) == [("audio", {"i": 1}), ("audio", {"i": 2})]
+    assert mensagens[-1] == f"id: {_id(3)}\n\n"  # fim do fluxo: reconexão continua daqui
+
+
+@pytest.mark.parametrize("ultimo", ["outro.1", "lixo", _id(99)])
+def test_id_desconhecido_pede_recarregar(monkeypatch, ultimo):
+    monkeypatch.setattr(eventos, "MAX_DURACAO_FLUXO_SEG", 0)
+    eventos.publicar("r", "audio", {})
+    assert _eventos(eventos.assinar("r", ultimo)) == [("recarregar", {})]
+
+
+def test_id_ja_descartado_pede_recarregar(monkeypatch):
+    monkeypatch.setattr(eventos, "MAX_DURACAO_FLUXO_SEG", 0)
+    monkeypatch.setattr(eventos, "MAX_EVENTOS_RADIO", 2)
+    for i in range(5):
+        eventos.publicar("r", "audio", {"i": i})
+    assert _eventos(eventos.assinar("r", _id(1))) == [("recarregar", {})]
+    assert [d["i"] for _t, d in _eventos(eventos.assinar("r", _id(3)))] == [3, 4]
+
+
+def test_fluxo_entrega_eventos_novos(monkeypatch):
+    monkeypatch.setattr(eventos, "MAX_DURACAO_FLUXO_SEG", 60)
+    fluxo = eventos.assinar("r")
+    assert next(fluxo).startswith("retry:")
+    # Publicado enquanto o assinante espera na Condition
+    threading.Timer(0.1, eventos.publicar, ("r", "audio", {"nome": "a.mp3"})).start()
+    assert _eventos([next(fluxo)]) == [("audio", {"nome": "a.mp3"})]
+    fluxo.close()
+
+
+def test_publicar_troca():
+    anterior = criar_indice([(100, "a"), (200, "b")])
+    novo = criar_indice([(200, "b"), (300, "c")])
+    eventos.publicar_troca("r", anterior, novo, versao=7)
+    recebidos = [(tipo, json.loads(dados)) for _n, tipo, dados in eventos._EVENTOS["r"]]
+    assert recebidos[0][0] == "audio"
+    assert (recebidos[0][1]["epoch"], recebidos[0][1]["nome"]) == (300, "c")  # a página ordena por eles
+    assert recebidos[1] == ("cache", {"versao": 7, "total": 2, "novos": 1, "removidos": 1})
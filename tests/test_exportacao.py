@@ -0,0 +1,41 @@
+# tests/test_exportacao.py
+"""Exportação em lote: validação barata, ZIP em fluxo e andamento por usuário."""
+import io
+import zipfile
+
+import pytest
+
+from conftest import criar_mp3, criar_wav
+
+
+@pytest.mark.parametrize("corpo", [[1, 2], "texto", {"itens": [{"subpath": "r/a.mp3", "inicio": 0, "fim": "inf"}]},
+                                   {"itens": [{"subpath": "r/a.mp3", "inicio": 2, "fim": 1}]},
+                                   {"itens": [{"subpath": "r/nao-existe.mp3", "inicio": 0, "fim": 1}]}])
+def test_exportacao_rejeita_pedido_invalido(cliente, media, corpo):
+    criar_mp3(media / "r" / "a.mp3")
+    assert cliente.post("/radio/exportar", json=corpo).status_code == 400
+
+
+def test_exportacao_zip_e_andamento_do_dono(cliente, media):
+    criar_mp3(media / "r" / "a.mp3")
+    criar_wav(media / "r" / "b.wav", segundos=2)
+    itens = [{"subpath": "r/a.mp3", "inicio": "0", "fim": "1"},
+             {"subpath": "r/a.mp3", "inicio": "3600", "fim": "3601"},  # além do fim: só descoberto no envio
+             {"subpath": "r/b.wav", "inicio": "0:00.5", "fim": "1.5"}]
+    r = cliente.post("/radio/exportar", json={"itens": itens, "tarefa": "escolhida-pelo-cliente"})
+    assert r.status_code == 200
+    tarefa = r.headers["X-Tarefa"]
+    assert tarefa != "escolhida-pelo-cliente"
+
+    zf = zipfile.ZipFile(io.BytesIO(r.data))
+    assert zf.testzip() is None
+    nomes = zf.namelist()
+    assert nomes[0].endswith(".mp3") and nomes[1].endswith(".erro.txt") and nomes[2].endswith(".wav")
+    assert len(zf.read(nomes[2])) == 44 + 16000
+
+    estado = cliente.get(f"/radio/exportar/{tarefa}").get_json()
+    assert estado["finalizado"] and estado["concluidos"] == 3 and len(estado["falhas"]) == 1
+
+    with cliente.session_transaction() as s:
+        s["user"] = {"usuario": "outro", "tipo": "colaborador"}
+    assert cliente.get(f"/radio/exportar/{tarefa}").status_code == 404
@@ -0,0 +1,92 @@
+# tests/test_indice.py
+"""Paginação por chave do índice e cursores opacos."""
+import base64
+
+import pytest
+
+from mod_radio.routes import _cursor, _ler_cursor
+
+from conftest import criar_indice as _indice
+
+
+def _chaves(itens):
+    return [(it["epoch"], it["nome"]) for it in itens]
+
+
+# Empates de epoch de propósito: a ordem é (epoch, nome)
+CHAVES = [(100, "a"), (100, "b"), (100, "c"), (200, "a"), (300, "a"), (300, "b"), (400, "a")]
+
+
+def test_posicao_chave():
+    indice = _indice(CHAVES)
+    assert indice.posicao_chave(100, "a") == 0
+    assert indice.posicao_chave(100, "b") == 1
+    assert indice.posicao_chave(100, "bb") == 2
+    assert indice.posicao_chave(150, "") == 3
+    assert indice.posicao_chave(999, "") == len(CHAVES)
+
+
+def test_pagina_cursor_percorre_tudo_para_tras():
+    indice = _indice(CHAVES)
+    faixas = [indice.faixa()]
+    vistos, antes = [], None
+    while True:
+        itens, mais_antigos, _ = indice.pagina_cursor(faixas, 2, antes=antes)
+        vistos += _chaves(itens)
+        if not mais_antigos:
+            break
+        antes = vistos[-1]
+    assert vistos == sorted(CHAVES, reverse=True)
+
+
+def test_pagina_cursor_para_frente_e_limites():
+    indice = _indice(CHAVES)
+    faixas = [indice.faixa()]
+    itens, mais_antigos, mais_recentes = indice.pagina_cursor(faixas, 2, depois=(100, "b"))
+    assert _chaves(itens) == [(200, "a"), (100, "c")]
+    assert mais_antigos and mais_recentes
+
+    itens, mais_antigos, mais_recentes = indice.pagina_cursor(faixas, 3)
+    assert _chaves(itens) == [(400, "a"), (300, "b"), (300, "a")]
+    assert mais_antigos and not mais_recentes
+
+    assert indice.pagina_cursor(faixas, 2, antes=(100, "a")) == ([], False, False)
+
+
+def test_pagina_cursor_estavel_com_arquivo_novo():
+    indice = _indice(CHAVES)
+    primeira, _, _ = indice.pagina_cursor([indice.faixa()], 3)
+    novo = indice.com_item({"epoch": 500, "nome": "z", "bytes": 1, "subpath": "r/z"})
+    segunda, _, _ = novo.pagina_cursor([novo.faixa()], 3, antes=_chaves(primeira)[-1])
+    assert _chaves(segunda) == [(200, "a"), (100, "c"), (100, "b")]
+
+
+def test_pagina_cursor_com_faixas_por_dia():
+    dia = 86400
+    indice = _indice([(dia * d + h, f"{d}-{h}") for d in range(3) for h in (10, 20, 30)])
+    faixas = indice.faixas_por_horario(15, 25)
+    itens, mais_antigos, mais_recentes = indice.pagina_cursor(faixas, 2)
+    assert [it["nome"] for it in itens] == ["2-20", "1-20"]
+    assert mais_antigos and not mais_recentes
+    itens, mais_antigos, _ = indice.pagina_cursor(faixas, 2, antes=_chaves(itens)[-1])
+    assert [it["nome"] for it in itens] == ["0-20"]
+    assert not mais_antigos
+
+
+@pytest.mark.parametrize("direcao, item, chave", [
+    ("n", {"epoch": 100, "nome": "a:b.mp3"}, (100, "a:b.mp3")),
+    ("p", {"epoch": 0, "nome": "ç.wav"}, (0, "ç.wav")),
+    ("m", {"epoch": 7, "nome": "x:y.mp3", "radio": "clube"}, (7, "x:y.mp3", "clube")),
+])
+def test_cursor_ida_e_volta(direcao, item, chave):
+    assert _ler_cursor(_cursor(direcao, item)) == (direcao, chave)
+
+
+def _b64(texto):
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", _b64("x:1:a"), _b64("n:abc:a"), _b64("m:1:semnome"), "/w"])
+def test_cursor_invalido(cursor):
+    with pytest.raises(ValueError):
+        _ler_cursor(cursor)
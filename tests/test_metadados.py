@@ -0,0 +1,48 @@
+# tests/test_metadados.py
+"""Metadados lidos só dos cabeçalhos: WAV, MP3 CBR e MP3 VBR (Xing)."""
+import struct
+
+import pytest
+
+from mod_radio import metadados
+
+from conftest import CABECALHO_MP3, SEG_QUADRO, TAMANHO_QUADRO, criar_mp3, criar_wav
+
+
+def test_wav(media):
+    caminho = criar_wav(media / "a.wav", segundos=3, taxa=8000)
+    assert metadados.ler_metadados(caminho) == (3.0, 128, 8000, 1)
+
+
+def test_mp3_cbr(media):
+    caminho = criar_mp3(media / "a.mp3", quadros=200)
+    duracao, bitrate, taxa, canais = metadados.ler_metadados(caminho)
+    assert duracao == pytest.approx(200 * TAMANHO_QUADRO * 8 / 128000, abs=1e-3)
+    assert (bitrate, taxa, canais) == (128, 44100, 2)
+
+
+@pytest.mark.parametrize("crc", [False, True])
+def test_mp3_vbr_xing(media, crc):
+    # O quadro Xing declara 1000 quadros; o arquivo tem só 20 (a contagem manda)
+    cabecalho = bytes([0xFF, 0xFA, 0x90, 0x64]) if crc else CABECALHO_MP3
+    xing = cabecalho + bytes(2 if crc else 0) + bytes(32) + b"Xing" + struct.pack(">II", 1, 1000)
+    caminho = media / "vbr.mp3"
+    caminho.write_bytes(xing + bytes(TAMANHO_QUADRO - len(xing))
+                        + (cabecalho + bytes(TAMANHO_QUADRO - 4)) * 20)
+    duracao, _bitrate, taxa, canais = metadados.ler_metadados(caminho)
+    assert duracao == round(1000 * SEG_QUADRO, 3)
+    assert (taxa, canais) == (44100, 2)
+
+
+def test_arquivo_ilegivel(media):
+    caminho = media / "lixo.mp3"
+    caminho.write_bytes(bytes(500))
+    assert metadados.ler_metadados(caminho) == metadados.SEM_METADADOS
+
+
+def test_extrair_em_lote_mantem_a_ordem(media, monkeypatch):
+    monkeypatch.setattr(metadados, "MIN_ARQUIVOS_POOL", 2)
+    caminhos = [criar_mp3(media / f"{i}.mp3", quadros=10 * (i + 1)) for i in range(6)]
+    esperado = [metadados.ler_metadados(c) for c in caminhos]
+    assert metadados.extrair(caminhos) == esperado
+    assert len(set(esperado)) == 6
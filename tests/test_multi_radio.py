@@ -0,0 +1,28 @@
+# tests/test_multi_radio.py
+"""Página única de várias rádios intercaladas por horário (mesclar_radios)."""
+from mod_radio.audio_indice import mesclar_radios
+
+from conftest import criar_indice as _indice
+
+
+def test_mesclar_radios_paginas_sem_repetir():
+    fontes = {
+        "clube": _indice([(100, "a"), (200, "a"), (300, "a"), (300, "b")], "clube"),
+        "massa": _indice([(100, "a"), (250, "a"), (300, "a")], "massa"),
+    }
+    esperado = sorted(((e, n, r) for r, ind in fontes.items() for e, n in zip(ind.epochs, ind.nomes)),
+                      reverse=True)
+
+    vistos, antes = [], None
+    while True:
+        itens, antes = mesclar_radios([(r, ind, [ind.faixa()]) for r, ind in fontes.items()], 2, antes)
+        vistos += [(it["epoch"], it["nome"], it["radio"]) for it in itens]
+        if antes is None:
+            break
+    assert vistos == esperado
+
+
+def test_mesclar_radios_ultima_pagina_exata():
+    indice = _indice([(100, "a"), (200, "a")])
+    itens, proxima = mesclar_radios([("r", indice, [indice.faixa()])], 2)
+    assert len(itens) == 2 and proxima is None
@@ -0,0 +1,62 @@
+# tests/test_observador.py
+"""Observador: registro imediato com on_closed e espera pela estabilização sem ele."""
+from types import SimpleNamespace
+
+import pytest
+
+from mod_radio import audio_cache, observador_audios as obs
+
+
+@pytest.fixture
+def registrados(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(audio_cache, "registrar_arquivo",
+                        lambda radio, caminho, parse: chamadas.append((radio, caminho)) or None)
+    monkeypatch.setattr(audio_cache, "remover_arquivo", lambda radio, caminho: None)
+    monkeypatch.setattr(obs, "_ESTABILIZANDO", {})
+    return chamadas
+
+
+def _evento(caminho, **extra):
+    return SimpleNamespace(is_directory=False, src_path=str(caminho), **extra)
+
+
+def test_com_on_closed_registra_na_criacao(media, registrados, monkeypatch):
+    monkeypatch.setattr(obs, "EVENTOS_FECHAMENTO", True)
+    caminho = media / "a.mp3"
+    caminho.write_bytes(b"x")
+    obs._ManipuladorRadio("clube").on_created(_evento(caminho))
+    assert registrados == [("clube", str(caminho))]
+    assert not obs._ESTABILIZANDO
+
+
+def test_sem_on_closed_espera_o_arquivo_parar_de_crescer(media, registrados, monkeypatch):
+    monkeypatch.setattr(obs, "EVENTOS_FECHAMENTO", False)
+    caminho = media / "a.mp3"
+    caminho.write_bytes(b"x")
+    obs._ManipuladorRadio("clube").on_created(_evento(caminho))
+    assert registrados == []
+
+    with open(caminho, "ab") as f:
+        f.write(b"y" * 1000)  # ainda gravando
+    obs._conferir_estabilizacao()
+    assert registrados == []
+
+    obs._conferir_estabilizacao()  # mesmo tamanho e mtime da conferência anterior
+    assert registrados == [("clube", str(caminho))]
+    assert not obs._ESTABILIZANDO
+
+
+def test_sem_on_closed_descarta_arquivo_removido(media, registrados, monkeypatch):
+    monkeypatch.setattr(obs, "EVENTOS_FECHAMENTO", False)
+    manipulador = obs._ManipuladorRadio("clube")
+    a, b = media / "a.mp3", media / "b.mp3"
+    a.write_bytes(b"x")
+    b.write_bytes(b"x")
+    manipulador.on_created(_evento(a))
+    manipulador.on_created(_evento(b))
+
+    manipulador.on_deleted(_evento(a))
+    b.unlink()
+    obs._conferir_estabilizacao()
+    assert registrados == [] and not obs._ESTABILIZANDO
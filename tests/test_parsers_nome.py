@@ -0,0 +1,66 @@
+# tests/test_parsers_nome.py
+"""Horário das gravações a partir do caminho, por padrão de nome."""
+from datetime import datetime
+
+import pytest
+
+from mod_radio import parsers_nome
+from mod_radio.audio_utils import datetime_para_epoch, epoch_para_datetime
+
+
+def _ep(*args):
+    return datetime_para_epoch(datetime(*args))
+
+
+@pytest.mark.parametrize("subpath, esperado", [
+    ("Radio_Clube/2025/10/20251021001622.mp3", _ep(2025, 10, 21, 0, 16, 22)),
+    ("Radio_Clube/gravacao_20251021001622_fm.mp3", _ep(2025, 10, 21, 0, 16, 22)),
+    ("Radio_Clube/20251332001622.mp3", None),  # mês 13
+    ("Radio_Clube/sem_data.mp3", None),
+])
+def test_parser_clube(subpath, esperado):
+    assert parsers_nome.obter_parser("clube")(subpath) == esperado
+
+
+@pytest.mark.parametrize("subpath, esperado", [
+    ("Massa/2024/Outubro/21-0640.wav", _ep(2024, 10, 21, 6, 40)),
+    ("Massa/2024/Março/05-235930.wav", _ep(2024, 3, 5, 23, 59, 30)),
+    ("Massa/Gravacoes 2023/07/01-1200.wav", _ep(2023, 7, 1, 12, 0)),
+    ("Massa/2024/Outubro/gravacao.wav", None),
+    ("Massa/2024/Qualquer/21-0640.wav", None),
+    ("Massa/2023/Fevereiro/30-0640.wav", None),  # dia inexistente
+])
+def test_parser_massa(subpath, esperado):
+    assert parsers_nome.obter_parser("massa")(subpath) == esperado
+
+
+def test_parser_massa_sem_ano_nunca_fica_no_futuro():
+    agora = datetime.now()
+    epoch = parsers_nome.obter_parser("massa")("Massa/Janeiro/01-0000.wav")
+    assert epoch is not None and epoch <= datetime_para_epoch(agora)
+    assert epoch_para_datetime(epoch).year in (agora.year, agora.year - 1)
+
+
+def test_auto_tenta_cada_padrao():
+    auto = parsers_nome.obter_parser("auto")
+    assert auto("x/20251021001622.mp3") == _ep(2025, 10, 21, 0, 16, 22)
+    assert auto("x/2024/Outubro/21-0640.wav") == _ep(2024, 10, 21, 6, 40)
+    assert auto("x/nada.mp3") is None
+
+
+@pytest.mark.parametrize("nome", [None, "", "  CLUBE ", "desconhecido"])
+def test_obter_e_nome_parser(nome):
+    esperado = "clube" if nome and nome.strip().lower() == "clube" else parsers_nome.PARSER_PADRAO
+    assert parsers_nome.nome_parser(nome) == esperado
+    assert parsers_nome.obter_parser(nome) is parsers_nome.PARSERS[esperado]
+
+
+def test_registrar_parser(monkeypatch):
+    monkeypatch.setattr(parsers_nome, "PARSERS", dict(parsers_nome.PARSERS))
+
+    @parsers_nome.registrar_parser("fixo")
+    def _fixo(subpath):
+        return 42 if subpath.endswith(".ogg") else None
+
+    assert parsers_nome.obter_parser("fixo")("a.ogg") == 42
+    assert parsers_nome.obter_parser("auto")("a.ogg") == 42  # o automático também tenta o novo
@@ -0,0 +1,78 @@
+# tests/test_picos.py
+"""Picos da forma de onda: WAV, envoltória do MP3 sem ffmpeg e cache em disco."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mod_radio import picos
+
+from conftest import CABECALHO_MP3, SEG_QUADRO, TAMANHO_QUADRO, criar_mp3, criar_wav
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importar_rotas_nao_carrega_numpy(tmp_path):
+    # Um "numpy" falso no caminho: se alguém importá-lo no topo, aparece em sys.modules
+    (tmp_path / "numpy").mkdir()
+    (tmp_path / "numpy" / "__init__.py").write_text("")
+    codigo = ("import sys; import mod_radio.routes, mod_radio.picos, mod_radio.cobertura; "
+              "print('numpy' in sys.modules)")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(tmp_path), RAIZ]))
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=tmp_path, env=env,
+                           capture_output=True, text=True, check=True).stdout
+    assert saida.strip().splitlines()[-1] == "False"
+
+
+@pytest.mark.parametrize("com_numpy", [False, True])
+def test_picos_wav(media, monkeypatch, com_numpy):
+    if com_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(picos, "numpy_opcional", lambda: None)
+    resultado = picos.calcular_picos(criar_wav(media / "a.wav", segundos=3))
+    assert resultado["duracao"] == 3.0
+    assert len(resultado["picos"]) == 2 * 3 * picos.PICOS_POR_SEGUNDO
+    assert max(resultado["picos"]) == pytest.approx(10000 / 32768, abs=1e-3)
+    assert min(resultado["picos"]) == pytest.approx(-10000 / 32768, abs=1e-3)
+
+
+def _quadro_com_ganho(ganho):
+    """Quadro MPEG-1 estéreo cujo primeiro grânulo tem big_values=1 e o global_gain dado."""
+    campo = (1 << 8) | ganho  # big_values(9) global_gain(8) no fim de um campo de 29 bits
+    side = campo << (256 - 20 - 29)  # main_data_begin(9) private(3) scfsi(8) = 20 bits antes
+    return CABECALHO_MP3 + side.to_bytes(32, "big") + bytes(TAMANHO_QUADRO - 36)
+
+
+def test_envoltoria_mp3_sem_ffmpeg(media, monkeypatch):
+    monkeypatch.setattr(picos, "ffmpeg_disponivel", lambda: False)
+    caminho = criar_mp3(media / "a.mp3", quadros=100)  # ~2,6 s de silêncio
+    with open(caminho, "ab") as f:
+        f.write(_quadro_com_ganho(180) * 100)
+    resultado = picos.calcular_picos(caminho)
+    assert resultado["duracao"] == round(200 * SEG_QUADRO, 3)
+    valores = resultado["picos"]
+    assert set(valores[:2 * 2 * picos.PICOS_POR_SEGUNDO]) == {0.0}
+    assert valores[-2:] == [-1.0, 1.0]
+
+
+def test_envoltoria_rejeita_arquivo_sem_quadros(media, monkeypatch):
+    monkeypatch.setattr(picos, "ffmpeg_disponivel", lambda: False)
+    caminho = media / "vazio.mp3"
+    caminho.write_bytes(bytes(1000))
+    with pytest.raises(ValueError):
+        picos.calcular_picos(caminho)
+
+
+def test_obter_picos_usa_cache_e_troca_com_o_arquivo(media):
+    caminho = criar_wav(media / "a.wav", segundos=1)
+    primeiro, chave = picos.obter_picos(caminho)
+    assert picos.obter_picos(caminho) == (primeiro, chave)
+    assert len(os.listdir(picos.PASTA_PICOS)) == 1
+
+    criar_wav(caminho, segundos=2)
+    os.utime(caminho, ns=(0, 10**18))
+    segundo, outra = picos.obter_picos(caminho)
+    assert outra != chave and segundo["duracao"] == 2.0
+    assert os.listdir(picos.PASTA_PICOS) == [outra + ".json"]
@@ -0,0 +1,94 @@
+# tests/test_previas.py
+"""Prévias: validadores estáveis entre acessos, LRU pelo atime e descarte concorrente."""
+import os
+import time
+
+import pytest
+
+from mod_radio import previas
+
+from conftest import criar_mp3
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="ffmpeg falso é um script sh")
+
+URL = "/media/r/a.mp3?previa=mp3"
+
+
+@pytest.fixture
+def ffmpeg_falso(ambiente, monkeypatch):
+    """ffmpeg que grava 5000 bytes fixos no último argumento (o destino)."""
+    pasta = ambiente / "bin"
+    pasta.mkdir()
+    script = pasta / "ffmpeg"
+    script.write_text('#!/bin/sh\nfor a; do ultimo="$a"; done\nhead -c 5000 /dev/zero > "$ultimo"\n')
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{pasta}{os.pathsep}{os.environ.get('PATH', '')}")
+
+
+@pytest.fixture
+def audio(media):
+    return criar_mp3(media / "r" / "a.mp3")
+
+
+def test_validadores_estaveis_entre_acessos(cliente, ffmpeg_falso, audio):
+    r = cliente.get(URL)
+    assert r.status_code == 200 and len(r.data) == 5000
+    destino, _ = previas.obter_previa(audio, "mp3")
+    mtime = os.stat(destino).st_mtime_ns
+
+    os.utime(destino, ns=(os.stat(destino).st_atime_ns - 10**10, mtime))
+    r2 = cliente.get(URL)
+    assert os.stat(destino).st_mtime_ns == mtime
+    assert r2.headers["ETag"] == r.headers["ETag"]
+    assert r2.headers["Last-Modified"] == r.headers["Last-Modified"]
+
+    assert cliente.get(URL, headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+    r3 = cliente.get(URL, headers={"Range": "bytes=0-99", "If-Range": r.headers["ETag"]})
+    assert r3.status_code == 206 and len(r3.data) == 100
+
+
+def test_acesso_renova_atime(ffmpeg_falso, audio):
+    destino, _ = previas.obter_previa(audio, "mp3")
+    antigo = time.time_ns() - 3600 * 10**9
+    os.utime(destino, ns=(antigo, antigo))
+    previas.obter_previa(audio, "mp3")
+    st = os.stat(destino)
+    assert st.st_mtime_ns == antigo
+    assert st.st_atime_ns > antigo
+
+
+def test_limite_descarta_menos_usadas_e_protege_recentes(ffmpeg_falso, media, monkeypatch):
+    destinos = [previas.obter_previa(criar_mp3(media / "r" / f"{n}.mp3"), "mp3")[0] for n in "abc"]
+    agora = time.time()
+    os.utime(destinos[0], (agora - 7200, agora - 7200))
+    os.utime(destinos[1], (agora - 3600, agora - 7200))
+    monkeypatch.setattr(previas, "PREVIA_CACHE_MB", 0)
+    previas._limitar_cache()
+    assert [os.path.exists(d) for d in destinos] == [False, False, True]
+
+
+def test_previa_descartada_durante_o_pedido(cliente, ffmpeg_falso, audio, monkeypatch):
+    original = previas.obter_previa
+    chamadas = []
+
+    def descartando(*args):
+        destino, mimetype = original(*args)
+        chamadas.append(destino)
+        if len(chamadas) == 1:
+            os.remove(destino)  # o descarte ganhou a corrida
+        return destino, mimetype
+
+    monkeypatch.setattr(previas, "obter_previa", descartando)
+    r = cliente.get(URL)
+    assert r.status_code == 200 and len(r.data) == 5000
+    assert len(chamadas) == 2
+
+
+def test_formato_desconhecido(cliente, ffmpeg_falso, audio):
+    assert cliente.get("/media/r/a.mp3?previa=flac").status_code == 400
+
+
+def test_sem_ffmpeg_envia_o_original(cliente, audio, monkeypatch):
+    monkeypatch.setattr(previas.shutil, "which", lambda _nome: None)
+    r = cliente.get(URL)
+    assert r.status_code == 200 and r.data == audio.read_bytes()
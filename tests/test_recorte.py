@@ -0,0 +1,83 @@
+# tests/test_recorte.py
+"""Recorte sem decodificar (quadros MP3 e fatias WAV) e a leitura dos tempos."""
+import struct
+
+import pytest
+
+from mod_radio import recorte
+from mod_radio.routes import _segundos
+
+from conftest import CABECALHO_MP3, SEG_QUADRO, TAMANHO_QUADRO, criar_mp3, criar_wav
+
+
+def test_quadros_mp3(media):
+    caminho = criar_mp3(media / "a.mp3", quadros=50)
+    offsets, fim, amostras, taxa = recorte.quadros_mp3(caminho)
+    assert offsets == [i * TAMANHO_QUADRO for i in range(50)]
+    assert fim == 50 * TAMANHO_QUADRO
+    assert (amostras, taxa) == (1152, 44100)
+
+
+def test_recorte_mp3_em_quadros_inteiros(media):
+    caminho = criar_mp3(media / "a.mp3", quadros=200)
+    corpo, tamanho, extensao, duracao = recorte.recortar(caminho, 1.0, 2.0)
+    dados = b"".join(corpo)
+    assert extensao == ".mp3"
+    assert len(dados) == tamanho and tamanho % TAMANHO_QUADRO == 0
+    assert dados[:4] == CABECALHO_MP3
+    quadros = tamanho // TAMANHO_QUADRO
+    assert duracao == pytest.approx(quadros * SEG_QUADRO)
+    assert 1.0 <= duracao <= 1.0 + 2 * SEG_QUADRO
+
+
+def test_recorte_mp3_alem_do_fim(media):
+    caminho = criar_mp3(media / "a.mp3", quadros=10)
+    with pytest.raises(ValueError):
+        recorte.recortar(caminho, 60, 70)
+
+
+def test_recorte_wav(media):
+    caminho = criar_wav(media / "a.wav", segundos=3, taxa=8000)
+    original = caminho.read_bytes()
+    corpo, tamanho, extensao, duracao = recorte.recortar(caminho, 0.5, 1.5)
+    dados = b"".join(corpo)
+    assert extensao == ".wav"
+    assert len(dados) == tamanho == 44 + 16000
+    assert duracao == pytest.approx(1.0)
+    assert dados[:4] == b"RIFF" and struct.unpack("<I", dados[40:44])[0] == 16000
+    assert dados[44:] == original[44 + 8000:44 + 24000]
+
+
+def test_recorte_wav_curtissimo_nao_fica_vazio(media):
+    # Intervalo menor que meia amostra: arredondaria para zero amostras
+    caminho = criar_wav(media / "a.wav", segundos=1, taxa=8000)
+    corpo, tamanho, _extensao, duracao = recorte.recortar(caminho, 0.5, 0.50001)
+    assert tamanho == len(b"".join(corpo)) == 44 + 2
+    assert duracao == pytest.approx(1 / 8000)
+
+
+@pytest.mark.parametrize("inicio, fim", [(-1, 1), (2, 2), (2, 1)])
+def test_recorte_intervalo_invalido(media, inicio, fim):
+    caminho = criar_wav(media / "a.wav", segundos=1)
+    with pytest.raises(ValueError):
+        recorte.recortar(caminho, inicio, fim)
+
+
+def test_recorte_formato_nao_suportado(media):
+    caminho = media / "a.ogg"
+    caminho.write_bytes(b"OggS")
+    with pytest.raises(ValueError):
+        recorte.recortar(caminho, 0, 1)
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("90", 90), ("90.5", 90.5), ("1,5", 1.5), ("01:30", 90), ("00:01:30.5", 90.5), (12, 12),
+])
+def test_segundos(valor, esperado):
+    assert _segundos(valor) == esperado
+
+
+@pytest.mark.parametrize("valor", ["", None, "abc", "1:2:3:4", ":30", "inf", "nan", "-inf", "1e999"])
+def test_segundos_invalidos(valor):
+    with pytest.raises(ValueError):
+        _segundos(valor)
@@ -0,0 +1,81 @@
+# tests/test_resumo_dias.py
+"""Resumo por dia: o incremental tem de bater com um resumo completo."""
+import random
+
+import pytest
+
+from mod_radio import resumo_dias
+from mod_radio.audio_indice import SEGUNDOS_DIA
+
+from conftest import criar_indice
+
+D = 20000 * SEGUNDOS_DIA  # um dia qualquer (meia-noite)
+H = 3600
+
+
+@pytest.fixture(autouse=True)
+def resumos_limpos(monkeypatch):
+    monkeypatch.setattr(resumo_dias, "RESUMOS", {})
+
+
+def _completo(indice, agora):
+    resumo_dias.atualizar("completo", None, indice, agora)
+    return resumo_dias.RESUMOS["completo"]
+
+
+def _arquivos(ini, fim, passo=600):
+    return [(t, f"{t}.mp3") for t in range(ini, fim, passo)]
+
+
+def test_dia_resumido_antes_de_terminar_ganha_a_lacuna_final():
+    # Gravações de 00:00 a 09:50, resumo às 10:00; o gravador só volta em D+2
+    manha = criar_indice(_arquivos(D, D + 10 * H))
+    resumo_dias.atualizar("r", None, manha, agora=D + 10 * H)
+    assert resumo_dias.RESUMOS["r"][D // SEGUNDOS_DIA][4] == 0
+
+    depois = criar_indice(_arquivos(D, D + 10 * H) + _arquivos(D + 2 * SEGUNDOS_DIA, D + 2 * SEGUNDOS_DIA + H))
+    agora = D + 2 * SEGUNDOS_DIA + H
+    resumo_dias.atualizar("r", manha, depois, agora)
+    assert resumo_dias.RESUMOS["r"][D // SEGUNDOS_DIA][4] == 1
+    assert resumo_dias.RESUMOS["r"] == _completo(depois, agora)
+
+
+def test_dia_seguinte_depende_do_ultimo_dia_com_gravacoes():
+    # Sem gravações em D+1: a lacuna de D+2 começa no fim da última de D
+    dia_d, dia_d2 = _arquivos(D, D + SEGUNDOS_DIA), _arquivos(D + 2 * SEGUNDOS_DIA, D + 3 * SEGUNDOS_DIA)
+    anterior = criar_indice(dia_d + dia_d2)
+    agora = D + 5 * SEGUNDOS_DIA
+    resumo_dias.atualizar("r", None, anterior, agora)
+
+    # Some a última gravação de D: a lacuna antes de D+2 passa a começar às 23:50 de D
+    novo = criar_indice(dia_d[:-1] + dia_d2)
+    resumo_dias.atualizar("r", anterior, novo, agora)
+    assert resumo_dias.RESUMOS["r"] == _completo(novo, agora)
+
+
+def test_sequencia_aleatoria_igual_ao_completo():
+    rnd = random.Random(24)
+    chaves = set(_arquivos(D, D + 4 * SEGUNDOS_DIA, 1800))
+    indice, agora = None, D + 6 * H
+    for _passo in range(60):
+        for _ in range(rnd.randint(1, 4)):
+            if chaves and rnd.random() < 0.4:
+                chaves.discard(rnd.choice(sorted(chaves)))
+            else:
+                t = D + rnd.randrange(0, 6 * SEGUNDOS_DIA, 600)
+                chaves.add((t, f"{t}.mp3"))
+        agora += rnd.randrange(0, 8 * H)
+        novo = criar_indice(sorted(chaves))
+        resumo_dias.atualizar("r", indice, novo, agora)
+        assert resumo_dias.RESUMOS["r"] == _completo(novo, agora)
+        indice = novo
+
+
+def test_resumo_mes():
+    indice = criar_indice(_arquivos(D, D + 2 * H))
+    resumo_dias.atualizar("r", None, indice, agora=D + SEGUNDOS_DIA)
+    data = resumo_dias.epoch_para_datetime(D)
+    dias = resumo_dias.resumo_mes("r", data.year, data.month)
+    dia = dias[data.strftime("%Y-%m-%d")]
+    assert dia["arquivos"] == 12 and dia["primeiro"] == "00:00:00" and dia["ultimo"] == "01:50:00"
+    assert dia["lacunas"] == 1  # de 02:00 até a meia-noite
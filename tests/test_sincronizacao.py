@@ -0,0 +1,30 @@
+# tests/test_sincronizacao.py
+"""Processos sem o agendador acompanham o índice gravado por outro processo."""
+from mod_radio import audio_cache, audio_db
+
+
+def _item(nome, epoch):
+    return {"subpath": f"r/{nome}", "nome": nome, "epoch": epoch, "bytes": 10}
+
+
+def test_gravacoes_no_mesmo_segundo_sao_percebidas():
+    audio_db.salvar_radio("r", [_item("a.mp3", 100)], [], {}, [], "2025-10-21 10:00:00")
+    assert len(audio_cache.obter_cache("r")) == 1
+
+    # Outro processo grava duas vezes no mesmo segundo
+    audio_db.salvar_radio("r", [_item("b.mp3", 200)], [], {}, [], "2025-10-21 10:00:00")
+    assert audio_cache.sincronizar_do_indice() == 1
+    assert len(audio_cache.obter_cache("r")) == 2
+
+    audio_db.salvar_radio("r", [_item("c.mp3", 300)], [], {}, [], "2025-10-21 10:00:00")
+    assert audio_cache.sincronizar_do_indice() == 1
+    assert audio_cache.obter_cache("r").nomes == ["a.mp3", "b.mp3", "c.mp3"]
+    assert audio_cache.versao_cache("r") == "3"
+
+    assert audio_cache.sincronizar_do_indice() == 0  # nada novo
+
+
+def test_radios_nao_carregadas_ficam_para_a_carga_sob_demanda():
+    audio_db.salvar_radio("r", [_item("a.mp3", 100)], [], {}, [], "x")
+    assert audio_cache.sincronizar_do_indice() == 0
+    assert "r" not in audio_cache.CACHE_AUDIOS
@@ -0,0 +1,91 @@
+# tests/test_streaming.py
+"""Range, If-Range, multipart/byteranges e 304 de servir_arquivo."""
+import pytest
+from flask import Flask
+
+from mod_radio.streaming import servir_arquivo
+
+CONTEUDO = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def cliente(ambiente):
+    caminho = ambiente / "audio.mp3"
+    caminho.write_bytes(CONTEUDO)
+    app = Flask(__name__)
+    app.add_url_rule("/arquivo", "arquivo", lambda: servir_arquivo(caminho))
+    return app.test_client()
+
+
+def test_arquivo_inteiro(cliente):
+    r = cliente.get("/arquivo")
+    assert r.status_code == 200
+    assert r.data == CONTEUDO
+    assert r.headers["Accept-Ranges"] == "bytes"
+    assert r.headers["Content-Type"] == "audio/mpeg"
+    assert r.headers["ETag"] and r.headers["Last-Modified"]
+
+
+@pytest.mark.parametrize("faixa, inicio, fim", [
+    ("bytes=0-99", 0, 100),
+    ("bytes=10000-", 10000, 10240),
+    ("bytes=-40", 10200, 10240),
+    ("bytes=10200-99999", 10200, 10240),
+])
+def test_faixa_unica(cliente, faixa, inicio, fim):
+    r = cliente.get("/arquivo", headers={"Range": faixa})
+    assert r.status_code == 206
+    assert r.data == CONTEUDO[inicio:fim]
+    assert r.headers["Content-Range"] == f"bytes {inicio}-{fim - 1}/{len(CONTEUDO)}"
+    assert int(r.headers["Content-Length"]) == fim - inicio
+
+
+def test_faixa_fora_do_arquivo(cliente):
+    r = cliente.get("/arquivo", headers={"Range": "bytes=20000-"})
+    assert r.status_code == 416
+    assert r.headers["Content-Range"] == f"bytes */{len(CONTEUDO)}"
+
+
+def test_faixa_invalida_envia_tudo(cliente):
+    r = cliente.get("/arquivo", headers={"Range": "bytes=abc"})
+    assert r.status_code == 200
+    assert r.data == CONTEUDO
+
+
+def test_multipart(cliente):
+    r = cliente.get("/arquivo", headers={"Range": "bytes=0-9, 100-109"})
+    assert r.status_code == 206
+    assert r.mimetype == "multipart/byteranges"
+    separador = r.mimetype_params["boundary"].encode()
+    vazio, *partes, rodape = r.data.split(b"--" + separador)
+    assert vazio == b"" and rodape == b"--\r\n" and len(partes) == 2
+    for parte, (inicio, fim) in zip(partes, [(0, 10), (100, 110)]):
+        cabecalhos, corpo = parte.split(b"\r\n\r\n", 1)
+        assert f"Content-Range: bytes {inicio}-{fim - 1}/{len(CONTEUDO)}".encode() in cabecalhos
+        assert corpo == CONTEUDO[inicio:fim] + b"\r\n"
+    assert int(r.headers["Content-Length"]) == len(r.data)
+
+
+def test_faixas_sobrepostas_sao_unidas(cliente):
+    r = cliente.get("/arquivo", headers={"Range": "bytes=0-49, 20-99"})
+    assert r.status_code == 206
+    assert r.data == CONTEUDO[:100]
+
+
+def test_304_e_if_range(cliente):
+    etag = cliente.get("/arquivo").headers["ETag"]
+    assert cliente.get("/arquivo", headers={"If-None-Match": etag}).status_code == 304
+
+    r = cliente.get("/arquivo", headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert r.status_code == 206 and r.data == CONTEUDO[:10]
+
+    r = cliente.get("/arquivo", headers={"Range": "bytes=0-9", "If-Range": '"outra-versao"'})
+    assert r.status_code == 200 and r.data == CONTEUDO
+
+
+def test_etag_muda_com_o_arquivo(cliente, ambiente):
+    etag = cliente.get("/arquivo").headers["ETag"]
+    (ambiente / "audio.mp3").write_bytes(CONTEUDO + b"x")
+    r = cliente.get("/arquivo", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
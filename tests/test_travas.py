@@ -0,0 +1,41 @@
+# tests/test_travas.py
+"""Travas entre processos: um único dono, inclusive depois de fork."""
+import os
+
+import pytest
+
+from mod_radio import travas
+
+
+@pytest.fixture(autouse=True)
+def sem_travas():
+    yield
+    for f in travas._TRAVAS.values():
+        f.close()
+    travas._TRAVAS.clear()
+
+
+def test_exclusivo_recusa_segundo_dono():
+    with travas.exclusivo("teste") as primeiro:
+        with travas.exclusivo("teste") as segundo:
+            assert primeiro and not segundo
+    with travas.exclusivo("teste") as depois:
+        assert depois
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="sem fork nesta plataforma")
+def test_processo_filho_nao_herda_a_trava():
+    assert travas.adquirir("servicos-teste")
+    assert travas.adquirir("servicos-teste")  # o mesmo processo continua dono
+
+    leitura, escrita = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # filho: como um worker do gunicorn --preload
+        try:
+            os.write(escrita, b"1" if travas.adquirir("servicos-teste") else b"0")
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    os.close(escrita)
+    assert os.read(leitura, 1) == b"0"
+    os.close(leitura)
@@ -0,0 +1,132 @@
+# tests/test_varredura.py
+"""Varredura incremental por mtime de pasta: o resultado tem de bater com o completo."""
+import os
+import threading
+import time
+
+from mod_radio import audio_cache, audio_db, audio_utils
+from mod_radio.audio_utils import listar_audios_incremental
+
+from conftest import criar_mp3
+
+ANTIGO = time.time() - 3600  # fora da janela de pastas recentes
+
+
+def _envelhecer(*pastas, deslocamento=0):
+    for pasta in pastas:
+        os.utime(pasta, (ANTIGO + deslocamento, ANTIGO + deslocamento))
+
+
+def _arvore(base):
+    """Radio_Clube/2025/{10,11,12} com duas gravações por mês, tudo com mtime antigo."""
+    for mes in (10, 11, 12):
+        for hora in (1, 2):
+            criar_mp3(base / "2025" / str(mes) / f"2025{mes}01{hora:02d}0000.mp3", quadros=5)
+    _envelhecer(*(base / "2025" / str(m) for m in (10, 11, 12)), base / "2025", base)
+
+
+def _cfg(base):
+    return {"pasta_base": str(base), "parse_nome": "clube", "chave": "clube"}
+
+
+def test_incremental_reaproveita_pastas_inalteradas(media):
+    base = media / "Radio_Clube"
+    _arvore(base)
+    audios, pastas, estat = listar_audios_incremental(_cfg(base))
+    assert len(audios) == 6 and estat["relistadas"] == estat["pastas"] == 5
+    assert [a["epoch"] for a in audios] == sorted((a["epoch"] for a in audios), reverse=True)
+
+    de_novo, pastas2, estat = listar_audios_incremental(_cfg(base), pastas, audios)
+    assert estat["relistadas"] == 0
+    assert de_novo == audios and pastas2 == pastas
+
+
+def test_incremental_igual_ao_completo_depois_de_mudancas(media):
+    base = media / "Radio_Clube"
+    _arvore(base)
+    audios, pastas, _ = listar_audios_incremental(_cfg(base))
+
+    criar_mp3(base / "2025" / "11" / "20251101030000.mp3", quadros=7)
+    (base / "2025" / "10" / "20251001010000.mp3").unlink()
+    _envelhecer(base / "2025" / "10", base / "2025" / "11", deslocamento=10)
+
+    incremental, pastas_inc, estat = listar_audios_incremental(_cfg(base), pastas, audios)
+    completo, pastas_comp, _ = listar_audios_incremental(_cfg(base))
+    assert estat["relistadas"] == 2
+    assert incremental == completo and pastas_inc == pastas_comp
+
+
+def test_pasta_recente_e_sempre_relistada(media):
+    # Gravação em andamento (começou agora): cresce sem mudar o mtime da pasta
+    base = media / "Radio_Clube"
+    caminho = criar_mp3(base / f"{time.strftime('%Y%m%d%H%M%S')}.mp3", quadros=5)
+    audios, pastas, _ = listar_audios_incremental(_cfg(base))
+    with open(caminho, "ab") as f:
+        f.write(bytes(1000))
+    os.utime(base, (pastas["Radio_Clube"]["mtime"],) * 2)
+
+    audios, _, estat = listar_audios_incremental(_cfg(base), pastas, audios)
+    assert estat["relistadas"] == 1
+    assert audios[0]["bytes"] == caminho.stat().st_size
+
+
+def test_atualizar_cache_incremental_igual_ao_completo(radios, media):
+    base = media / "Radio_Clube"
+    _arvore(base)
+    audio_cache.atualizar_cache("clube", radios["clube"])
+
+    criar_mp3(base / "2025" / "12" / "20251201030000.mp3", quadros=9)
+    (base / "2025" / "11" / "20251101020000.mp3").unlink()
+    _envelhecer(base / "2025" / "11", base / "2025" / "12", deslocamento=10)
+    audio_cache.atualizar_cache("clube", radios["clube"])
+    incremental = list(audio_cache.obter_cache("clube"))
+    assert audio_cache.CACHE_VARREDURA["clube"]["relistadas"] == 2
+    assert list(audio_db.carregar_indice("clube")) == incremental
+
+    audio_cache.atualizar_cache("clube", radios["clube"], completo=True)
+    assert list(audio_cache.obter_cache("clube")) == incremental
+    assert len(incremental) == 6
+
+
+# -------------------------------------------------------------------------
+# Motor paralelo: limite de concorrência por montagem
+# -------------------------------------------------------------------------
+def test_ler_limites(tmp_path):
+    texto = f" {tmp_path}/a=2, {tmp_path}/b = 3 ,invalido"
+    assert audio_utils._ler_limites(texto) == {
+        os.path.realpath(f"{tmp_path}/a"): 2, os.path.realpath(f"{tmp_path}/b"): 3,
+    }
+
+
+def test_semaforo_compartilhado_por_montagem(media, monkeypatch):
+    monkeypatch.setattr(audio_utils, "_SEMAFOROS", {})
+    (media / "a").mkdir()
+    (media / "b").mkdir()
+    assert audio_utils._semaforo(media / "a") is audio_utils._semaforo(media / "b")
+
+
+def test_varredura_respeita_limite_da_montagem(media, monkeypatch):
+    base = media / "Radio_Clube"
+    for dia in range(1, 9):
+        criar_mp3(base / "2025" / "10" / f"{dia:02d}" / f"202510{dia:02d}010000.mp3", quadros=2)
+
+    monkeypatch.setattr(audio_utils, "_SEMAFOROS", {})
+    monkeypatch.setattr(audio_utils, "SCAN_LIMITES", {audio_utils.ponto_de_montagem(str(base)): 2})
+    ativas, maximo, lock = [0], [0], threading.Lock()
+    original = audio_utils._listar_pasta
+
+    def listar_devagar(*args, **kwargs):
+        with lock:
+            ativas[0] += 1
+            maximo[0] = max(maximo[0], ativas[0])
+        try:
+            time.sleep(0.02)
+            return original(*args, **kwargs)
+        finally:
+            with lock:
+                ativas[0] -= 1
+
+    monkeypatch.setattr(audio_utils, "_listar_pasta", listar_devagar)
+    audios, _, estat = listar_audios_incremental(_cfg(base))
+    assert len(audios) == 8 and estat["pastas"] == 11
+    assert maximo[0] == 2  # em paralelo, mas nunca acima do limite
@@ -0,0 +1,59 @@
+# tests/test_versao_indice.py
+"""Versão persistente do índice: ETags iguais em todos os processos e 304 no polling."""
+from mod_radio import audio_cache, audio_db
+
+from conftest import criar_mp3
+
+URL = "/radio/audios/data?radio=clube"
+
+
+def _outro_processo():
+    """Esquece o estado em memória, como um worker que ainda não leu a rádio."""
+    for d in (audio_cache.CACHE_AUDIOS, audio_cache.CACHE_VERSAO, audio_cache.CACHE_PASTAS):
+        d.clear()
+
+
+def test_versao_so_muda_com_alteracoes():
+    item = {"subpath": "r/a.mp3", "nome": "a.mp3", "epoch": 100, "bytes": 10}
+    assert audio_db.salvar_radio("r", [item], [], {}, [], "2025-01-01 00:00:00") == 1
+    assert audio_db.salvar_radio("r", [], [], {"r": {"mtime": 1.0, "subpastas": []}}, [], "x") == 1
+    assert audio_db.salvar_radio("r", [], ["r/a.mp3"], {}, [], "y") == 2
+    assert audio_db.carregar_versoes() == {"r": 2}
+    assert audio_db.versao_radio("r") == 2 and audio_db.versao_radio("outra") == 0
+
+
+def test_mesma_etag_em_processos_diferentes(cliente, radios, media):
+    criar_mp3(media / "Radio_Clube" / "20251021000622.mp3")
+    audio_cache.atualizar_cache("clube", radios["clube"], completo=True)
+    etag = cliente.get(URL).headers["ETag"]
+
+    _outro_processo()
+    r = cliente.get(URL, headers={"If-None-Match": etag})  # primeiro pedido, com carga sob demanda
+    assert r.status_code == 304
+    assert cliente.get(URL).headers["ETag"] == etag
+
+
+def test_etag_muda_com_arquivo_novo_e_nao_com_varredura_vazia(cliente, radios, media):
+    criar_mp3(media / "Radio_Clube" / "20251021000622.mp3")
+    audio_cache.atualizar_cache("clube", radios["clube"], completo=True)
+    etag = cliente.get(URL).headers["ETag"]
+
+    audio_cache.atualizar_cache("clube", radios["clube"], completo=True)
+    assert cliente.get(URL, headers={"If-None-Match": etag}).status_code == 304
+
+    criar_mp3(media / "Radio_Clube" / "20251021001622.mp3")
+    audio_cache.atualizar_cache("clube", radios["clube"], completo=True)
+    r = cliente.get(URL, headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.get_json()["total"] == 2
+
+    _outro_processo()
+    assert cliente.get(URL, headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+
+
+def test_calendario_usa_a_mesma_versao(cliente, radios, media):
+    criar_mp3(media / "Radio_Clube" / "20251021000622.mp3")
+    audio_cache.atualizar_cache("clube", radios["clube"], completo=True)
+    url = "/radio/clube/calendario?mes=2025-10"
+    etag = cliente.get(url).headers["ETag"]
+    _outro_processo()
+    assert cliente.get(url, headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,11 @@
+# wsgi.py
+"""Entrypoint de produção: `gunicorn wsgi:app`.
+
+Cada worker chama `iniciar_servicos()`; só um deles (o que pega a trava)
+varre e observa as pastas das rádios, os outros acompanham o índice.
+Com `--preload` este módulo roda só no processo mestre: chame
+`iniciar_servicos()` também no hook `post_fork` do gunicorn.
+"""
+from app import app, iniciar_servicos
+
+iniciar_servicos()